@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.conf import global_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -87,7 +90,74 @@ DATABASES = {
         'USER': os.environ['DB_USER'],
         'PASSWORD': os.environ['DB_PASSWORD'],
         'HOST': os.environ['DB_HOST'],
-        'PORT': os.environ['DB_PORT']
+        'PORT': os.environ['DB_PORT'],
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': (
+            os.environ.get('DB_CONN_HEALTH_CHECKS', '').lower()
+            in ('1', 'true')
+        ),
+    }
+}
+
+# Connection pool of the core.backends.postgresql engine. Pooled
+# connections are returned after every request, so DB_CONN_MAX_AGE must
+# stay 0 with it.
+if DATABASES['default']['ENGINE'] == 'core.backends.postgresql':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'max_lifetime': float(
+                os.environ.get('DB_POOL_MAX_LIFETIME', 3600)
+            ),
+            'check': (
+                os.environ.get('DB_POOL_CHECK', 'true').lower()
+                in ('1', 'true')
+            ),
+        },
+    }
+
+# Read replicas, see core.routers. DB_REPLICA_HOSTS is a comma separated
+# list of hosts; the other settings default to those of the primary. To try
+# it with SQLite, give any host and a DB_REPLICA_NAME copy of the database.
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')),
+    start=1,
+):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.environ.get('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.environ.get(
+            'DB_REPLICA_PASSWORD',
+            DATABASES['default']['PASSWORD'],
+        ),
+        'HOST': host.strip(),
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# After a write, the reads of the client stay on the primary this long.
+DATABASE_REPLICA_STICKY = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5)),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+        },
     }
 }
 
@@ -110,6 +180,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hasher of new passwords: pbkdf2 (Django's default), scrypt, about four
+# times faster to check, or argon2 (needs argon2-cffi). Passwords hashed by
+# another one are rehashed on the next login.
+PASSWORD_HASHER = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}[os.environ.get('PASSWORD_HASHER', 'pbkdf2')]
+
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in global_settings.PASSWORD_HASHERS
+    if hasher != PASSWORD_HASHER
+]
+
+# Threads of core.passwords hashing and checking passwords. Logins and
+# signups past MAX_PENDING more waiting get a 503.
+PASSWORD_HASHING_POOL = {
+    'MAX_WORKERS': int(
+        os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1)
+    ),
+    'MAX_PENDING': int(os.environ.get('PASSWORD_HASHING_MAX_PENDING', 64)),
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -137,4 +230,40 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-}
\ No newline at end of file
+}
+
+# Token authentication cache used by core.authentication. Set
+# TOKEN_AUTH_CACHE_ALIAS to a shared cache (e.g. Redis) to let workers reuse
+# each other's lookups.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_MAX_SIZE', 1024)),
+    'TIMEOUT': int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 60)),
+    'CACHE_ALIAS': os.environ.get('TOKEN_AUTH_CACHE_ALIAS') or None,
+}
+
+# Serve the todo endpoints, signup and login with the async views of
+# todo.async_views and user.async_views. Only worth it under ASGI; under
+# WSGI every async view runs in its own event loop.
+ASYNC_API = os.environ.get('ASYNC_API', '').lower() in ('1', 'true')
+
+# Rendered JSON of the todo list endpoints, see todo.cache.
+TODO_RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('TODO_RESPONSE_CACHE_TIMEOUT', 300)),
+    'MAX_ENTRY_SIZE': int(
+        os.environ.get('TODO_RESPONSE_CACHE_MAX_ENTRY_SIZE', 1024 * 1024)
+    ),
+}
+
+# Tasks deleted per transaction when a todo list is deleted. The request
+# deletes one batch; the purge_todo_lists command deletes the rest.
+TODO_LIST_DELETE_BATCH_SIZE = int(
+    os.environ.get('TODO_LIST_DELETE_BATCH_SIZE', 1000)
+)
+
+# Days tombstones of deleted todo lists and tasks are kept for the sync
+# feed, see the purge_tombstones command. Clients that have not synced for
+# longer have to sync in full.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(
+    os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+)
@@ -18,9 +18,12 @@ from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
 )
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from todo.views import SyncView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -29,6 +32,14 @@ urlpatterns = [
         SpectacularSwaggerView.as_view(url_name='api-schema'),
         name='api-docs'
     ),
-    path('api/users/', include('user.urls')),
-    path('api/todo_lists/', include('todo.urls')),
+    path('api/', include('core.urls')),
+    path(
+        'api/users/',
+        include('user.async_urls' if settings.ASYNC_API else 'user.urls')
+    ),
+    path('api/sync', SyncView.as_view(), name='sync'),
+    path(
+        'api/todo_lists/',
+        include('todo.async_urls' if settings.ASYNC_API else 'todo.urls')
+    ),
 ]
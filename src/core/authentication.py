@@ -0,0 +1,238 @@
+"""
+Authentication for the API
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import authentication, exceptions
+
+
+class TokenCache:
+    """
+    Bounded LRU of authenticated tokens with an optional shared tier.
+
+    Entries live in this process for `timeout` seconds. When `cache_alias`
+    names a Django cache, entries are also written there so other workers
+    can skip the database on their first lookup of a token.
+    """
+    key_prefix = 'auth-token:'
+
+    def __init__(self, max_size=1024, timeout=60, cache_alias=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        """Return the shared Django cache, or None when disabled."""
+        if self.cache_alias is None:
+            return None
+        return caches[self.cache_alias]
+
+    def get(self, key):
+        """Return the cached token for key, or None."""
+        token = self._get_local(key)
+        if token is not None:
+            return token
+        shared = self.shared
+        token = shared.get(self.key_prefix + key) if shared else None
+        return self._got_shared(key, token)
+
+    async def aget(self, key):
+        """Async version of get, awaiting the shared tier."""
+        token = self._get_local(key)
+        if token is not None:
+            return token
+        shared = self.shared
+        token = await shared.aget(self.key_prefix + key) if shared else None
+        return self._got_shared(key, token)
+
+    def set(self, key, token):
+        """Cache token under key in both tiers."""
+        with self._lock:
+            self._store(key, token)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, token, self.timeout)
+
+    async def aset(self, key, token):
+        """Async version of set."""
+        with self._lock:
+            self._store(key, token)
+        if self.shared is not None:
+            await self.shared.aset(self.key_prefix + key, token, self.timeout)
+
+    def invalidate(self, *keys):
+        """Drop keys from both tiers."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self.key_prefix + key for key in keys])
+
+    def clear(self):
+        """Drop every entry held by this process and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        """Return the hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': (
+                    (self.hits + self.shared_hits) / lookups
+                    if lookups else 0.0
+                ),
+            }
+
+    def _get_local(self, key):
+        """Return the token held by this process for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return token
+            del self._entries[key]
+            return None
+
+    def _got_shared(self, key, token):
+        """Count a shared tier lookup and keep its token locally."""
+        with self._lock:
+            if token is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._store(key, token)
+        return token
+
+    def _store(self, key, token):
+        """Insert into the local LRU, evicting the oldest entries."""
+        self._entries[key] = (token, time.monotonic() + self.timeout)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    """Return the process wide token cache configured by settings."""
+    global _token_cache
+    if _token_cache is None:
+        options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+        _token_cache = TokenCache(
+            max_size=options.get('MAX_SIZE', 1024),
+            timeout=options.get('TIMEOUT', 60),
+            cache_alias=options.get('CACHE_ALIAS'),
+        )
+    return _token_cache
+
+
+@receiver(setting_changed)
+def reset_token_cache(setting, **kwargs):
+    """Rebuild the token cache when its settings are overridden."""
+    global _token_cache
+    if setting == 'TOKEN_AUTH_CACHE':
+        _token_cache = None
+
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    Token authentication that remembers token to user lookups.
+
+    Entries are dropped when the token is deleted or its user is changed,
+    see `core.signals`. Workers that did not make the change only notice
+    it once their local entry times out.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        return self.hand_out(token)
+
+    def hand_out(self, token):
+        """Return (user, token) copies of a cached token."""
+        # Hand out copies so requests never share mutable instances.
+        user = copy.copy(token.user)
+        token = copy.copy(token)
+        token.user = user
+        return (user, token)
+
+
+class AsyncTokenAuthentication(CachedTokenAuthentication):
+    """
+    Cached token authentication for async views.
+
+    It shares the token cache of `CachedTokenAuthentication`, so a token
+    seen by either kind of view is cached for both.
+    """
+
+    async def aauthenticate(self, request):
+        """Async version of authenticate for a Django request."""
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _('Invalid token header. '
+                    'Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. '
+                    'Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        """Async version of authenticate_credentials."""
+        token_cache = get_token_cache()
+        token = await token_cache.aget(key)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related('user').aget(
+                    key=key
+                )
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _('User inactive or deleted.')
+                )
+            await token_cache.aset(key, token)
+        return self.hand_out(token)
@@ -0,0 +1,110 @@
+"""
+PostgreSQL database backend taking its connections from a psycopg pool
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+
+from psycopg_pool import ConnectionPool
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_stats():
+    """Return the statistics of every open pool, by database alias."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {alias: pool.get_stats() for (alias, _), pool in pools}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend with pooled connections.
+
+    With `OPTIONS['pool']` set, connections are checked out of a
+    psycopg_pool.ConnectionPool shared by all threads of the process, and
+    closing a connection (e.g. at the end of a request) puts it back. The
+    pool options are passed to ConnectionPool; `check: True` tests every
+    connection before handing it out. Without it, this is the stock
+    backend.
+    """
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        if self.pool_options and self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured(
+                'Pooled connections are returned after every request, '
+                'set CONN_MAX_AGE to 0 when OPTIONS["pool"] is set.'
+            )
+
+    @property
+    def pool_options(self):
+        """Return the options of the pool, or None without pooling."""
+        return self.settings_dict['OPTIONS'].get('pool')
+
+    @property
+    def pool(self):
+        """Return the pool of this database, opening it if needed."""
+        options = self.pool_options
+        if not options:
+            return None
+
+        # The test runner renames the database, so key by name as well.
+        key = (self.alias, self.settings_dict['NAME'])
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = dict(options)
+                check = options.pop('check', False)
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    check=ConnectionPool.check_connection if check else None,
+                    name=f'django-{self.alias}',
+                    open=False,
+                    **options,
+                )
+                pool.open()
+                _pools[key] = pool
+        return pool
+
+    def close_pool(self):
+        """Close the pool of this database and its connections."""
+        key = (self.alias, self.settings_dict['NAME'])
+        with _pools_lock:
+            pool = _pools.pop(key, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        connection = pool.getconn()
+        if isolation_level is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            self.isolation_level = IsolationLevel(isolation_level)
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                # The pool rolls back what is left open and keeps the
+                # connection if it is still usable.
+                return self.pool.putconn(self.connection)
+        return super()._close()
@@ -0,0 +1,293 @@
+"""
+Django command to bulk import tasks from NDJSON or CSV.
+"""
+import contextlib
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from rest_framework import serializers
+
+from core.models import ChangeCounter, TodoList, Task
+from todo.cache import get_response_cache, todo_list_scope, user_scope
+from todo.serializers import TaskImportSerializer
+
+
+COPY_COLUMNS = [
+    'todo_list_id', 'name', 'content', 'completed', 'deadline',
+    'change_seq', 'position', 'created_at', 'updated_at',
+]
+
+
+class Command(BaseCommand):
+    """Django command to bulk import tasks."""
+    help = (
+        'Import tasks from NDJSON or CSV rows with the columns email, '
+        'todo_list, name, content, completed and deadline. Todo lists are '
+        'looked up by owner and label and created when missing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="File to read, or '-' for stdin.")
+        parser.add_argument(
+            '--format',
+            choices=['ndjson', 'csv'],
+            help='Input format, guessed from the file extension by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows validated and written per transaction.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording the rows done so far; an interrupted '
+                 'import run again with it resumes after them. It is '
+                 'written after each commit, so a crash in between repeats '
+                 'at most that one batch.',
+        )
+
+    def handle(self, *args, **options):
+        """Import the rows batch by batch."""
+        path = options['input']
+        input_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'ndjson'
+        )
+        checkpoint = options['checkpoint']
+        done = self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f'Resuming after {done} rows...')
+
+        self.imported = self.invalid = 0
+        started = time.monotonic()
+        with self.open_input(path) as stream:
+            rows = itertools.islice(
+                self.read_rows(stream, input_format),
+                done,
+                None,
+            )
+            while batch := list(itertools.islice(rows, options['batch_size'])):
+                self.import_batch(batch, first_row=done + 1)
+                done += len(batch)
+                self.write_checkpoint(checkpoint, done)
+                self.report(done, started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.imported} tasks, skipped {self.invalid} '
+            f'invalid rows ({self.rate(started):.0f} rows/s).'
+        ))
+
+    def open_input(self, path):
+        """Return a context manager giving the input stream."""
+        if path == '-':
+            return contextlib.nullcontext(sys.stdin)
+        try:
+            return open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+    def read_rows(self, stream, input_format):
+        """Yield the rows of stream as dicts."""
+        if input_format == 'csv':
+            for row in csv.DictReader(stream):
+                # Empty cells stand for missing values, e.g. no deadline.
+                yield {k: v for k, v in row.items() if v != ''}
+            return
+
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise CommandError(f'Invalid JSON on line {number}: {e}')
+
+    def import_batch(self, batch, first_row):
+        """Validate batch and write its valid rows in one transaction."""
+        serializer = TaskImportSerializer()
+        valid = []
+        for number, row in enumerate(batch, start=first_row):
+            try:
+                valid.append((number, serializer.run_validation(row)))
+            except serializers.ValidationError as e:
+                self.reject(number, e.detail)
+
+        with transaction.atomic():
+            users = self.resolve_users(valid)
+            known = []
+            for number, attrs in valid:
+                if users[attrs['email']] is None:
+                    self.reject(number, {'email': ['Unknown user.']})
+                else:
+                    known.append((number, attrs))
+            valid = known
+            # One change number per user covers all of its rows.
+            change_seqs = ChangeCounter.next_values(
+                users[attrs['email']] for _, attrs in valid
+            )
+            todo_lists = self.resolve_todo_lists(valid, users, change_seqs)
+            tasks = [
+                Task(
+                    todo_list_id=todo_lists[users[attrs['email']],
+                                            attrs['todo_list']],
+                    name=attrs['name'],
+                    content=attrs.get('content'),
+                    completed=attrs.get('completed', False),
+                    deadline=attrs.get('deadline'),
+                    change_seq=change_seqs[users[attrs['email']]],
+                )
+                for _, attrs in valid
+            ]
+            self.set_positions(tasks)
+            self.insert_tasks(tasks)
+            self.touch(todo_lists, tasks, change_seqs)
+
+        self.imported += len(tasks)
+
+    def reject(self, number, errors):
+        """Report an invalid row."""
+        self.invalid += 1
+        self.stderr.write(f'Row {number}: {json.dumps(errors)}')
+
+    def resolve_users(self, valid):
+        """Map the emails of the rows to user ids."""
+        normalize = get_user_model().objects.normalize_email
+        emails = {}
+        for _, attrs in valid:
+            attrs['email'] = normalize(attrs['email'])
+            emails[attrs['email']] = None
+        emails.update(
+            get_user_model().objects.filter(
+                email__in=emails,
+            ).values_list('email', 'id')
+        )
+        return emails
+
+    def resolve_todo_lists(self, valid, users, change_seqs):
+        """Map (user id, label) of the rows to todo list ids."""
+        keys = {(users[attrs['email']], attrs['todo_list'])
+                for _, attrs in valid}
+        todo_lists = self.find_todo_lists(keys)
+        missing = keys - todo_lists.keys()
+        if missing:
+            TodoList.objects.bulk_create(
+                TodoList(
+                    user_id=user_id,
+                    label=label,
+                    change_seq=change_seqs[user_id],
+                )
+                for user_id, label in missing
+            )
+            todo_lists.update(self.find_todo_lists(missing))
+        return todo_lists
+
+    def find_todo_lists(self, keys):
+        """Return the oldest todo list id of each (user id, label)."""
+        # Newest first, so the oldest list of a label is stored last.
+        rows = TodoList.objects.filter(
+            user_id__in={user_id for user_id, _ in keys},
+            label__in={label for _, label in keys},
+        ).order_by('-id').values_list('user_id', 'label', 'id')
+        return {
+            (user_id, label): pk for user_id, label, pk in rows
+            if (user_id, label) in keys
+        }
+
+    def set_positions(self, tasks):
+        """Put the tasks first in their lists, the last row on top."""
+        tasks_by_list = defaultdict(list)
+        for task in tasks:
+            tasks_by_list[task.todo_list_id].append(task)
+        for todo_list_id, list_tasks in tasks_by_list.items():
+            new_positions = Task.new_positions(todo_list_id, len(list_tasks))
+            for task, position in zip(list_tasks, new_positions):
+                task.position = position
+
+    def insert_tasks(self, tasks):
+        """Write tasks with COPY on PostgreSQL, else batched INSERTs."""
+        if connection.vendor != 'postgresql':
+            Task.objects.bulk_create(tasks, batch_size=1000)
+            return
+
+        now = timezone.now()
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            quote(Task._meta.db_table),
+            ', '.join(quote(column) for column in COPY_COLUMNS),
+        )
+        with connection.cursor() as cursor:
+            with cursor.copy(sql) as copy:
+                for task in tasks:
+                    copy.write_row((
+                        task.todo_list_id, task.name, task.content,
+                        task.completed, task.deadline, task.change_seq,
+                        task.position, now, now,
+                    ))
+
+    def touch(self, todo_lists, tasks, change_seqs):
+        """Bump updated_at, counters and cached responses of the lists."""
+        if not tasks:
+            return
+        added, completed = Counter(), Counter()
+        for task in tasks:
+            added[task.todo_list_id] += 1
+            completed[task.todo_list_id] += task.completed
+
+        def delta(counts):
+            return Case(
+                *(When(pk=pk, then=Value(n)) for pk, n in counts.items() if n),
+                default=Value(0),
+            )
+
+        TodoList.objects.filter(pk__in=added).update(
+            updated_at=timezone.now(),
+            task_count=F('task_count') + delta(added),
+            completed_count=F('completed_count') + delta(completed),
+            change_seq=Case(*(
+                When(user_id=user_id, then=Value(change_seq))
+                for user_id, change_seq in change_seqs.items()
+            )),
+        )
+        get_response_cache().bump(
+            *{user_scope(user_id) for user_id, _ in todo_lists},
+            *(todo_list_scope(pk) for pk in added),
+        )
+
+    def read_checkpoint(self, path):
+        """Return the number of rows done by a previous run."""
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['rows']
+
+    def write_checkpoint(self, path, done):
+        """Record that the first `done` rows have been imported."""
+        if not path:
+            return
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': done}, f)
+        os.replace(tmp_path, path)
+
+    def report(self, done, started):
+        """Write the progress so far."""
+        self.stdout.write(
+            f'{done} rows done, {self.imported} imported '
+            f'({self.rate(started):.0f} rows/s)'
+        )
+
+    def rate(self, started):
+        """Return the rows imported per second since started."""
+        elapsed = time.monotonic() - started
+        return self.imported / elapsed if elapsed else 0.0
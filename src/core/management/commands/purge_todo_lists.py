@@ -0,0 +1,39 @@
+"""
+Django command to delete the todo lists hidden for deletion.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import TodoList
+
+
+class Command(BaseCommand):
+    """Django command to purge hidden todo lists."""
+    help = (
+        'Delete the tasks of every todo list hidden for deletion in '
+        'batches, then the list. An interrupted run is resumed by running '
+        'it again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TODO_LIST_DELETE_BATCH_SIZE,
+            help='Tasks deleted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Purge the hidden lists, oldest first."""
+        todo_lists = TodoList.all_objects.filter(
+            deleted_at__isnull=False,
+        ).order_by('deleted_at')
+        purged = 0
+        for todo_list in todo_lists.iterator():
+            pk = todo_list.pk
+            count = todo_list.purge(options['batch_size'])
+            purged += 1
+            self.stdout.write(f'Todo list {pk}: {count} tasks')
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged} todo lists.'
+        ))
@@ -0,0 +1,72 @@
+"""
+Django command to purge the tombstones past the sync retention window.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.models import ChangeCounter, Tombstone
+
+
+class Command(BaseCommand):
+    """Django command to purge old tombstones."""
+    help = (
+        'Delete the tombstones of todo lists and tasks deleted longer ago '
+        'than the retention window. Sync tokens older than a purged '
+        'tombstone are rejected from then on.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Days tombstones are kept.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tombstones deleted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """Delete the expired tombstones a batch at a time."""
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        purged = 0
+        while count := self.purge_batch(cutoff, options['batch_size']):
+            purged += count
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged} tombstones.'
+        ))
+
+    def purge_batch(self, cutoff, batch_size):
+        """Delete a batch of tombstones older than cutoff, return how many."""
+        with transaction.atomic():
+            rows = list(
+                Tombstone.objects.filter(deleted_at__lt=cutoff)
+                .order_by('deleted_at')
+                .values_list('pk', 'user_id', 'change_seq')[:batch_size]
+            )
+            if not rows:
+                return 0
+            purged_seqs = {}
+            for _, user_id, change_seq in rows:
+                purged_seqs[user_id] = max(
+                    purged_seqs.get(user_id, 0),
+                    change_seq,
+                )
+            # Raised with the delete, so no sync can miss the tombstones.
+            ChangeCounter.objects.filter(pk__in=purged_seqs).update(
+                purged_seq=Greatest(F('purged_seq'), Case(*(
+                    When(pk=user_id, then=Value(change_seq))
+                    for user_id, change_seq in purged_seqs.items()
+                ))),
+            )
+            Tombstone.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        return len(rows)
@@ -0,0 +1,38 @@
+"""
+Django command to rebalance the task positions of todo lists.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import TodoList
+
+
+class Command(BaseCommand):
+    """Django command to rebalance task positions."""
+    help = (
+        'Give the tasks of every todo list whose task positions grew long '
+        'short positions again, keeping their order.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tasks updated per statement.',
+        )
+
+    def handle(self, *args, **options):
+        """Rebalance the flagged lists, one transaction each."""
+        todo_lists = TodoList.objects.filter(
+            needs_rebalance=True,
+        ).order_by('id')
+        rebalanced = 0
+        for todo_list in todo_lists.iterator():
+            with transaction.atomic():
+                count = todo_list.rebalance_positions(options['batch_size'])
+            rebalanced += 1
+            self.stdout.write(f'Todo list {todo_list.pk}: {count} tasks')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebalanced {rebalanced} todo lists.'
+        ))
@@ -0,0 +1,102 @@
+"""
+Django command to detect and repair drifted task counters of todo lists.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (
+    Case, Count, F, OuterRef, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import ChangeCounter, TodoList, Task
+from todo.cache import get_response_cache, todo_list_scope, user_scope
+
+
+def count_tasks(**filters):
+    """Return a subquery counting the tasks of the outer todo list."""
+    return Coalesce(Subquery(
+        Task.objects.filter(todo_list=OuterRef('pk'), **filters)
+        .order_by().values('todo_list')
+        .annotate(count=Count('*')).values('count')
+    ), 0)
+
+
+class Command(BaseCommand):
+    """Django command to repair task counters."""
+    help = (
+        'Compare task_count and completed_count of every todo list with '
+        'its tasks and fix the lists that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Todo lists checked per query.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report the drifted lists.',
+        )
+
+    def handle(self, *args, **options):
+        """Check the todo lists a batch of ids at a time."""
+        checked = drifted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                TodoList.objects.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            rows = TodoList.objects.filter(pk__in=ids).annotate(
+                actual_tasks=count_tasks(),
+                actual_completed=count_tasks(completed=True),
+            ).exclude(
+                task_count=F('actual_tasks'),
+                completed_count=F('actual_completed'),
+            ).values_list(
+                'pk', 'user_id', 'task_count', 'actual_tasks',
+                'completed_count', 'actual_completed',
+            )
+            for pk, _, tasks, actual_tasks, completed, actual in rows:
+                drifted += 1
+                self.stdout.write(
+                    f'Todo list {pk}: {completed}/{tasks} counted, '
+                    f'{actual}/{actual_tasks} actual'
+                )
+            if rows and not options['dry_run']:
+                self.repair(rows)
+
+        action = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {drifted} drifted of {checked} todo lists.'
+        ))
+
+    def repair(self, rows):
+        """Recount the tasks of the drifted lists."""
+        with transaction.atomic():
+            change_seqs = ChangeCounter.next_values(row[1] for row in rows)
+            # Recount while writing, so changes made since are not lost.
+            TodoList.objects.filter(pk__in=[row[0] for row in rows]).update(
+                task_count=count_tasks(),
+                completed_count=count_tasks(completed=True),
+                change_seq=Case(*(
+                    When(user_id=user_id, then=Value(change_seq))
+                    for user_id, change_seq in change_seqs.items()
+                )),
+                # QuerySet.update() skips auto_now, and clients revalidate
+                # the list against updated_at.
+                updated_at=timezone.now(),
+            )
+            get_response_cache().bump(
+                *{user_scope(row[1]) for row in rows},
+                *(todo_list_scope(row[0]) for row in rows),
+            )
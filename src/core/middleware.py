@@ -0,0 +1,99 @@
+"""
+Middleware for the API
+"""
+import hashlib
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+from core.routers import read_replica
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow reads from the replicas for safe requests.
+
+    A safe request makes all of its reads from one replica picked at
+    random, so they never mix replicas lagging by different amounts.
+    After a successful unsafe request, the client is marked in the cache
+    for `DATABASE_REPLICA_STICKY['TIMEOUT']` seconds, during which all of
+    its reads go to the primary so it reads its own writes despite the
+    replication lag. Clients are told apart by their Authorization header
+    or session cookie; with several workers the cache must be shared.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def cache(self):
+        """Return the cache holding the markers."""
+        return caches[settings.DATABASE_REPLICA_STICKY['CACHE_ALIAS']]
+
+    def marker_key(self, request):
+        """Return the cache key marking the client, or None."""
+        credentials = (
+            request.META.get('HTTP_AUTHORIZATION')
+            or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        if not credentials:
+            return None
+        digest = hashlib.md5(
+            credentials.encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return f'replica-sticky:{digest}'
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        key = self.marker_key(request)
+        safe = request.method in SAFE_METHODS
+        replica = None
+        if safe and not (key and self.cache.get(key)):
+            replica = random.choice(settings.DATABASE_REPLICAS)
+        token = read_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+
+        if not safe and key and response.status_code < 400:
+            self.cache.set(key, True, self.timeout)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        key = self.marker_key(request)
+        safe = request.method in SAFE_METHODS
+        replica = None
+        if safe and not (key and await self.cache.aget(key)):
+            replica = random.choice(settings.DATABASE_REPLICAS)
+        token = read_replica.set(replica)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_replica.reset(token)
+
+        if not safe and key and response.status_code < 400:
+            await self.cache.aset(key, True, self.timeout)
+        return response
+
+    @property
+    def timeout(self):
+        """Return how long the reads of a client stick to the primary."""
+        return settings.DATABASE_REPLICA_STICKY['TIMEOUT']
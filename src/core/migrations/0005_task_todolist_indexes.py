@@ -0,0 +1,37 @@
+# Generated by Django 4.2.3 on 2026-10-18 19:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_task_created_at_task_updated_at_todolist_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['todo_list', '-id'], name='task_todo_list_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('deadline__isnull', False)), fields=['todo_list', 'deadline'], name='task_open_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todolist',
+            index=models.Index(fields=['user', '-id'], name='todolist_user_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='todo_list',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.todolist'),
+        ),
+        migrations.AlterField(
+            model_name='todolist',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
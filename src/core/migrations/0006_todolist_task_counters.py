@@ -0,0 +1,55 @@
+# Generated by Django 4.2.3 on 2026-10-18 19:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+BATCH_SIZE = 10000
+
+
+def backfill_task_counters(apps, schema_editor):
+    """Count the tasks of every todo list, a range of ids at a time."""
+    TodoList = apps.get_model('core', 'TodoList')
+    Task = apps.get_model('core', 'Task')
+
+    def count_tasks(**filters):
+        return Coalesce(Subquery(
+            Task.objects.filter(todo_list=OuterRef('pk'), **filters)
+            .order_by().values('todo_list')
+            .annotate(count=Count('*')).values('count')
+        ), 0)
+
+    last_id = TodoList.objects.aggregate(last_id=models.Max('id'))['last_id']
+    for start in range(0, (last_id or 0) + 1, BATCH_SIZE):
+        TodoList.objects.filter(
+            id__gte=start,
+            id__lt=start + BATCH_SIZE,
+        ).update(
+            task_count=count_tasks(),
+            completed_count=count_tasks(completed=True),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_task_todolist_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todolist',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='todolist',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            backfill_task_counters,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,93 @@
+from django.db import migrations
+
+
+# PostgreSQL keeps a weighted tsvector of name and content in a stored
+# generated column, so every write (COPY included) updates it.
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE core_task ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX task_search_vector_idx ON core_task
+    USING GIN (search_vector)
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX task_search_vector_idx',
+    'ALTER TABLE core_task DROP COLUMN search_vector',
+]
+
+# SQLite indexes name and content in an external content FTS5 table kept in
+# sync by triggers. A migration rebuilding core_task drops the triggers, so
+# it has to recreate them.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_task_fts USING fts5(
+        name, content,
+        content='core_task', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_task_fts_insert AFTER INSERT ON core_task BEGIN
+        INSERT INTO core_task_fts (rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_fts_delete AFTER DELETE ON core_task BEGIN
+        INSERT INTO core_task_fts (core_task_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_task_fts_update AFTER UPDATE OF name, content
+    ON core_task BEGIN
+        INSERT INTO core_task_fts (core_task_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+        INSERT INTO core_task_fts (rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+    "INSERT INTO core_task_fts (core_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER core_task_fts_update',
+    'DROP TRIGGER core_task_fts_delete',
+    'DROP TRIGGER core_task_fts_insert',
+    'DROP TABLE core_task_fts',
+]
+
+
+def run_for_vendor(statements):
+    """Return a RunPython function executing statements of the vendor."""
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({
+                'postgresql': POSTGRESQL_FORWARD,
+                'sqlite': SQLITE_FORWARD,
+            }),
+            run_for_vendor({
+                'postgresql': POSTGRESQL_BACKWARD,
+                'sqlite': SQLITE_BACKWARD,
+            }),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Adding change_seq rebuilds core_task on SQLite, which drops the triggers
+# keeping core_task_fts in sync (see 0008), so they are created again if
+# missing. Whether a reverse rebuilds the table depends on the SQLite
+# version, hence the same on the way back.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_insert
+    AFTER INSERT ON core_task BEGIN
+        INSERT INTO core_task_fts (rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_delete
+    AFTER DELETE ON core_task BEGIN
+        INSERT INTO core_task_fts (core_task_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_task_fts_update
+    AFTER UPDATE OF name, content ON core_task BEGIN
+        INSERT INTO core_task_fts (core_task_fts, rowid, name, content)
+        VALUES ('delete', old.id, old.name, old.content);
+        INSERT INTO core_task_fts (rowid, name, content)
+        VALUES (new.id, new.name, new.content);
+    END
+    """,
+]
+
+
+def create_sqlite_triggers(apps, schema_editor):
+    """Create the full-text search triggers of core_task on SQLite."""
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_task_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+                ('purged_seq', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('todo_list', 'Todo list'), ('task', 'Task')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            create_sqlite_triggers,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='todolist',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['todo_list', 'change_seq'], name='task_change_seq_idx'),
+        ),
+        migrations.RunPython(
+            create_sqlite_triggers,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='todolist',
+            index=models.Index(fields=['user', 'change_seq'], name='todolist_change_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'change_seq'], name='tombstone_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
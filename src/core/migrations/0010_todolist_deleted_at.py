@@ -0,0 +1,22 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_sync_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todolist',
+            name='deleted_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='todolist',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='todolist_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:44
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+from core import positions
+
+
+# Adding position rebuilds core_task on SQLite, see 0009.
+create_sqlite_triggers = import_module(
+    'core.migrations.0009_sync_changes',
+).create_sqlite_triggers
+
+
+def set_positions(apps, schema_editor):
+    """Give the tasks of every list positions in their default order."""
+    TodoList = apps.get_model('core', 'TodoList')
+    Task = apps.get_model('core', 'Task')
+    db_alias = schema_editor.connection.alias
+    for todo_list_id in TodoList.objects.using(db_alias).values_list(
+        'id',
+        flat=True,
+    ).iterator():
+        ids = list(
+            Task.objects.using(db_alias).filter(
+                todo_list_id=todo_list_id,
+            ).order_by('-id').values_list('id', flat=True)
+        )
+        Task.objects.using(db_alias).bulk_update(
+            [
+                Task(id=pk, position=position)
+                for pk, position in zip(
+                    ids,
+                    positions.keys_between(None, None, len(ids)),
+                )
+            ],
+            ['position'],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_todolist_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop,
+            create_sqlite_triggers,
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='position',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(
+            create_sqlite_triggers,
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(set_positions, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='todolist',
+            name='needs_rebalance',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['todo_list', 'position', 'id'], name='task_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todolist',
+            index=models.Index(condition=models.Q(('needs_rebalance', True)), fields=['id'], name='todolist_needs_rebalance_idx'),
+        ),
+    ]
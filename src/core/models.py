@@ -2,13 +2,19 @@
 Database models
 """
 from django.conf import settings
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
+from core import positions
+from core.passwords import get_hashing_pool, password_must_update
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -24,6 +30,17 @@ class UserManager(BaseUserManager):
 
         return user
 
+    async def acreate_user(self, email, password=None, **extra_fields):
+        """Async create_user, awaiting the password hashing pool."""
+        if not email:
+            raise ValueError('User must have an email address.')
+
+        user = self.model(email=self.normalize_email(email), **extra_fields)
+        user.password = await get_hashing_pool().arun(make_password, password)
+        await user.asave(using=self._db)
+
+        return user
+
     def create_superuser(self, email, password, **extra_fields):
         """Create, save and return a new superuser."""
         user = self.create_user(email=email, password=password, **extra_fields)
@@ -45,26 +62,469 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    def set_password(self, raw_password):
+        """Set the password, hashed in the password hashing pool."""
+        if raw_password is None:
+            return super().set_password(raw_password)
+        self.password = get_hashing_pool().run(make_password, raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Return whether raw_password is correct, checked in the hashing pool.
+
+        A correct password hashed otherwise than with the first of
+        PASSWORD_HASHERS and its current parameters is rehashed and saved.
+        """
+        pool = get_hashing_pool()
+        if not pool.run(check_password, raw_password, self.password):
+            return False
+        if password_must_update(self.password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return True
+
+    async def acheck_password(self, raw_password):
+        """Async check_password, awaiting the hashing pool."""
+        pool = get_hashing_pool()
+        if not await pool.arun(check_password, raw_password, self.password):
+            return False
+        if password_must_update(self.password):
+            self.password = await pool.arun(make_password, raw_password)
+            await self.asave(update_fields=['password'])
+        return True
+
+
+class ChangeCounter(models.Model):
+    """
+    Sequence numbering the changes to the todo lists and tasks of a user.
+
+    Taking a number updates the user's row, which stays locked until the
+    transaction ends. Changes of a user are therefore committed in the
+    order of their numbers, so a client that synced up to a number can
+    never miss a change numbered lower that was still in flight.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    value = models.BigIntegerField(default=0)
+    # Highest number of the tombstones purged so far.
+    purged_seq = models.BigIntegerField(default=0)
+
+    @classmethod
+    def next_values(cls, user_ids):
+        """Return the next number of every user id, in one statement."""
+        # UPDATE ... RETURNING needs PostgreSQL or SQLite 3.35+.
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return {}
+        using = router.db_for_write(cls)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        sql = (
+            'UPDATE {table} SET {value} = {value} + 1 '
+            'WHERE {user} IN ({ids}) RETURNING {user}, {value}'
+        ).format(
+            table=quote(cls._meta.db_table),
+            value=quote('value'),
+            user=quote('user_id'),
+            ids=', '.join(['%s'] * len(user_ids)),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, user_ids)
+            values = dict(cursor.fetchall())
+
+        missing = [user_id for user_id in user_ids if user_id not in values]
+        if missing:
+            cls.objects.using(using).bulk_create(
+                [cls(user_id=user_id) for user_id in missing],
+                ignore_conflicts=True,
+            )
+            values.update(cls.next_values(missing))
+        return values
+
+    @classmethod
+    def next_value(cls, user_id):
+        """Return the next number of the user."""
+        return cls.next_values([user_id])[user_id]
+
+
+class Tombstone(models.Model):
+    """Record of a deleted todo list or task, served by the sync feed."""
+    TODO_LIST = 'todo_list'
+    TASK = 'task'
+    KIND_CHOICES = [
+        (TODO_LIST, 'Todo list'),
+        (TASK, 'Task'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='tombstone_change_seq_idx',
+            ),
+            models.Index(
+                fields=['deleted_at'],
+                name='tombstone_deleted_at_idx',
+            ),
+        ]
+
+
+class ChangeTrackedModel(models.Model):
+    """
+    Model stamping every write with a change number of its owner.
+
+    `save()` and `delete()` take the number and write in one transaction,
+    and `delete()` leaves a tombstone. Writes of one change can share a
+    number by passing it to `save()`. Bulk writes have to take a number
+    from ChangeCounter themselves.
+    """
+    tombstone_kind = None
+
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def get_owner_id(self):
+        """Return the id of the user owning the row."""
+        raise NotImplementedError
+
+    def save(self, *args, change_seq=None, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self),
+            instance=self,
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'change_seq'}
+        with transaction.atomic(using=using, savepoint=False):
+            if change_seq is None:
+                change_seq = ChangeCounter.next_value(self.get_owner_id())
+            self.change_seq = change_seq
+            super().save(*args, **kwargs)
+
+    def add_tombstone(self, using=None):
+        """Record the deletion of the row and return its change number."""
+        owner_id = self.get_owner_id()
+        self.change_seq = ChangeCounter.next_value(owner_id)
+        Tombstone.objects.using(using).create(
+            user_id=owner_id,
+            kind=self.tombstone_kind,
+            object_id=self.pk,
+            change_seq=self.change_seq,
+        )
+        return self.change_seq
 
-class TodoList(models.Model):
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self),
+            instance=self,
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            self.add_tombstone(using)
+            return super().delete(*args, **kwargs)
+
+
+class TodoListManager(models.Manager):
+    """Manager leaving out the todo lists hidden for deletion."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
+class TodoList(ChangeTrackedModel):
     """Todo List model."""
+    tombstone_kind = Tombstone.TODO_LIST
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     label = models.CharField(max_length=255)
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the list is hidden, until its tasks are purged.
+    deleted_at = models.DateTimeField(null=True, editable=False)
+    # Set when a task position grew long, until the tasks are rebalanced.
+    needs_rebalance = models.BooleanField(default=False, editable=False)
+
+    objects = TodoListManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # The composite index leads with user, so it also serves the
+        # foreign key lookups the implicit single column index was for.
+        indexes = [
+            models.Index(fields=['user', '-id'], name='todolist_user_id_idx'),
+            models.Index(
+                fields=['user', 'change_seq'],
+                name='todolist_change_seq_idx',
+            ),
+            models.Index(
+                fields=['deleted_at'],
+                name='todolist_deleted_at_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            models.Index(
+                fields=['id'],
+                name='todolist_needs_rebalance_idx',
+                condition=models.Q(needs_rebalance=True),
+            ),
+        ]
 
     def __str__(self):
         return self.label
 
+    def get_owner_id(self):
+        return self.user_id
+
+    def touch(self, tasks=0, completed=0, change_seq=None, **values):
+        """
+        Bump updated_at after its tasks changed.
+
+        The counters are moved by the given deltas in the same UPDATE, with
+        F() expressions so concurrent changes add up. They are reloaded on
+        next access. Drift is fixed by the repair_task_counters command.
+        Pass the change number of the tasks to reuse it for the list, and
+        other field values to write them in the same UPDATE.
+        """
+        counters = []
+        for field, delta in (('task_count', tasks),
+                             ('completed_count', completed)):
+            if delta:
+                value = models.F(field) + delta
+                if delta < 0:
+                    # Never below zero, even if the counter has drifted.
+                    value = Greatest(value, 0)
+                setattr(self, field, value)
+                counters.append(field)
+        for field, value in values.items():
+            setattr(self, field, value)
+        self.save(
+            update_fields=['updated_at', *counters, *values],
+            change_seq=change_seq,
+        )
+        for field in counters:
+            delattr(self, field)
+
+    def move_task(self, task, after_id=None):
+        """
+        Move task of this list right after the task after_id, or first.
+
+        Only the task row is written, with a position between those of its
+        new neighbours. If none fits, the list is rebalanced first. A
+        position longer than REBALANCE_LENGTH flags the list for the
+        rebalance_positions command. Raises Task.DoesNotExist if after_id
+        is not another task of the list.
+        """
+        change_seq = ChangeCounter.next_value(self.user_id)
+        try:
+            position = positions.key_between(*self.get_gap(task, after_id))
+            if len(position) > positions.MAX_LENGTH:
+                raise ValueError('Position too long.')
+        except ValueError:
+            # Equal neighbours, or keys extended as far as they go.
+            self.rebalance_positions(change_seq=change_seq)
+            position = positions.key_between(*self.get_gap(task, after_id))
+
+        task.position = position
+        task.save(
+            update_fields=['position', 'updated_at'],
+            change_seq=change_seq,
+        )
+        values = {}
+        if len(position) > positions.REBALANCE_LENGTH:
+            values['needs_rebalance'] = True
+        self.touch(change_seq=change_seq, **values)
+
+    def get_gap(self, task, after_id=None):
+        """Return the positions around the place right after after_id."""
+        tasks = Task.objects.filter(todo_list=self).exclude(pk=task.pk)
+        before = None
+        if after_id is not None:
+            before = tasks.values_list('position', flat=True).get(pk=after_id)
+            tasks = tasks.filter(
+                models.Q(position__gt=before)
+                | models.Q(position=before, id__gt=after_id)
+            )
+        after = tasks.order_by('position', 'id').values_list(
+            'position',
+            flat=True,
+        ).first()
+        return before, after
+
+    def rebalance_positions(self, batch_size=1000, change_seq=None):
+        """
+        Give the tasks of the list short, evenly spread positions.
+
+        Their order is kept, ties broken by id. Every task is rewritten
+        with one change number, so run it in a transaction. Returns the
+        number of tasks.
+        """
+        if change_seq is None:
+            change_seq = ChangeCounter.next_value(self.user_id)
+        ids = list(
+            Task.objects.filter(todo_list=self).order_by(
+                'position',
+                'id',
+            ).values_list('id', flat=True)
+        )
+        now = timezone.now()
+        Task.objects.bulk_update(
+            [
+                Task(
+                    id=pk,
+                    position=position,
+                    change_seq=change_seq,
+                    updated_at=now,
+                )
+                for pk, position in zip(
+                    ids,
+                    positions.keys_between(None, None, len(ids)),
+                )
+            ],
+            ['position', 'change_seq', 'updated_at'],
+            batch_size=batch_size,
+        )
+        self.touch(change_seq=change_seq, needs_rebalance=False)
+        return len(ids)
+
+    def update_tasks(self, tasks, **values):
+        """
+        Update tasks of this list in bulk and return how many matched.
 
-class Task(models.Model):
+        A change of `completed` is applied in two statements, split on the
+        current value, so their row counts give the exact counter change.
+        """
+        # QuerySet.update() skips auto_now, so set updated_at explicitly.
+        values['updated_at'] = timezone.now()
+        values['change_seq'] = change_seq = ChangeCounter.next_value(
+            self.user_id
+        )
+        if 'completed' not in values:
+            count = tasks.update(**values)
+            changed = 0
+        else:
+            completed = values['completed']
+            count = tasks.filter(completed=completed).update(**values)
+            changed = tasks.exclude(completed=completed).update(**values)
+            count += changed
+            if not completed:
+                changed = -changed
+        if count:
+            self.touch(completed=changed, change_seq=change_seq)
+        return count
+
+    def delete_tasks(self, tasks):
+        """
+        Delete tasks of this list in bulk and return how many there were.
+
+        The tombstones are written first. Any other write of the user waits
+        for the change number taken here, so no task can join the selection
+        between the two.
+        """
+        change_seq = ChangeCounter.next_value(self.user_id)
+        Tombstone.objects.bulk_create(
+            (
+                Tombstone(
+                    user_id=self.user_id,
+                    kind=Tombstone.TASK,
+                    object_id=pk,
+                    change_seq=change_seq,
+                )
+                for pk in tasks.values_list('pk', flat=True)
+            ),
+            batch_size=1000,
+        )
+        completed, _ = tasks.filter(completed=True).delete()
+        count, _ = tasks.filter(completed=False).delete()
+        count += completed
+        if count:
+            self.touch(
+                tasks=-count,
+                completed=-completed,
+                change_seq=change_seq,
+            )
+        return count
+
+    def hide(self):
+        """
+        Hide the list and its tasks for deletion by `purge()`.
+
+        This is a single row update, whatever the number of tasks. The
+        tombstone is written now, so sync clients drop the list at once.
+        """
+        with transaction.atomic(savepoint=False):
+            self.deleted_at = timezone.now()
+            self.save(
+                update_fields=['deleted_at'],
+                change_seq=self.add_tombstone(),
+            )
+
+    def purge_batches(self, batch_size):
+        """
+        Delete the tasks of the hidden list in batches, then the list.
+
+        Every batch is a short transaction of its own, deleting the ids
+        selected by a subquery, so no task is loaded and locks are held
+        briefly. Yields the number of tasks deleted by every batch. An
+        interrupted purge is resumed by purging again.
+        """
+        tasks = Task.objects.filter(todo_list=self).order_by()
+        while True:
+            with transaction.atomic():
+                count, _ = Task.objects.filter(
+                    pk__in=tasks.values('pk')[:batch_size],
+                ).delete()
+            yield count
+            if count < batch_size:
+                break
+        # hide() wrote the tombstone. Tasks added since go by cascade.
+        with transaction.atomic():
+            models.Model.delete(self)
+
+    def purge(self, batch_size, max_batches=None):
+        """
+        Delete the hidden list batch by batch, return the tasks deleted.
+
+        Past max_batches full batches the rest is left to a later purge.
+        """
+        batches = self.purge_batches(batch_size)
+        deleted = 0
+        for index, count in enumerate(batches, start=1):
+            deleted += count
+            if index == max_batches and count == batch_size:
+                batches.close()
+                break
+        return deleted
+
+
+class Task(ChangeTrackedModel):
     """Task model."""
+    tombstone_kind = Tombstone.TASK
+
     todo_list = models.ForeignKey(
         TodoList,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     name = models.CharField(max_length=255)
     content = models.TextField(null=True, blank=True)
@@ -72,6 +532,71 @@ class Task(models.Model):
     deadline = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Key of the manual order of the list, see core.positions.
+    position = models.CharField(
+        max_length=positions.MAX_LENGTH,
+        default='',
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['todo_list', '-id'],
+                name='task_todo_list_id_idx',
+            ),
+            # Filters and orderings of the tasks of a list; id comes last
+            # for the keyset pagination.
+            models.Index(
+                fields=['todo_list', 'completed', '-id'],
+                name='task_completed_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'deadline', 'id'],
+                name='task_deadline_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'created_at', 'id'],
+                name='task_created_at_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'updated_at', 'id'],
+                name='task_updated_at_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'name', 'id'],
+                name='task_name_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'change_seq'],
+                name='task_change_seq_idx',
+            ),
+            models.Index(
+                fields=['todo_list', 'position', 'id'],
+                name='task_position_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    def get_owner_id(self):
+        return self.todo_list.user_id
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.position:
+            self.position, = Task.new_positions(self.todo_list_id, 1)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def new_positions(cls, todo_list_id, count):
+        """
+        Return the positions of count new tasks of the list.
+
+        New tasks go first, the last one on top, as in the default order.
+        """
+        first = cls.objects.filter(
+            todo_list_id=todo_list_id,
+            position__gt='',
+        ).order_by('position').values_list('position', flat=True).first()
+        return positions.keys_between(None, first, count)[::-1]
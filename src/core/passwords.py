@@ -0,0 +1,127 @@
+"""
+Password hashing off the request thread for the user API
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolBusy(APIException):
+    """Too many passwords are waiting to be hashed."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again shortly.'
+    default_code = 'hashing_pool_busy'
+
+
+class HashingPool:
+    """
+    Bounded pool of threads hashing and checking passwords.
+
+    PBKDF2, scrypt and argon2 release the GIL while hashing, so the pool
+    hashes in parallel and an event loop awaiting a hash keeps serving
+    other requests. At most max_workers hashes run at once; past
+    max_pending more waiting, HashingPoolBusy is raised instead of letting
+    the queue, and the latency of every login, grow without bound.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers,
+            thread_name_prefix='password-hashing',
+        )
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, func, *args):
+        """Return the future of func(*args), run in the pool."""
+        with self.lock:
+            if self.in_flight >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy()
+            self.in_flight += 1
+            self.submitted += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.release()
+            raise
+        future.add_done_callback(self.release)
+        return future
+
+    def release(self, future=None):
+        """Free the slot of a finished hash."""
+        with self.lock:
+            self.in_flight -= 1
+
+    def run(self, func, *args):
+        """Return func(*args), waiting for the pool to run it."""
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        """Async version of run, leaving the event loop free meanwhile."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self):
+        """Return the pool's size and counters."""
+        with self.lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'in_flight': self.in_flight,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+            }
+
+
+_hashing_pool = None
+
+
+def get_hashing_pool():
+    """Return the process wide password hashing pool."""
+    global _hashing_pool
+    if _hashing_pool is None:
+        options = getattr(settings, 'PASSWORD_HASHING_POOL', {})
+        _hashing_pool = HashingPool(
+            max_workers=options.get('MAX_WORKERS', 4),
+            max_pending=options.get('MAX_PENDING', 64),
+        )
+    return _hashing_pool
+
+
+@receiver(setting_changed)
+def reset_hashing_pool(setting, **kwargs):
+    """Rebuild the hashing pool when its settings are overridden."""
+    global _hashing_pool
+    if setting == 'PASSWORD_HASHING_POOL':
+        _hashing_pool = None
+
+
+def password_must_update(encoded):
+    """
+    Return whether the password hash encoded should be redone.
+
+    It should when it was not made by the first of PASSWORD_HASHERS, or
+    with weaker parameters than that hasher now uses, as in Django's own
+    check_password.
+    """
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher()
+    return (
+        hasher.algorithm != preferred.algorithm or
+        preferred.must_update(encoded)
+    )
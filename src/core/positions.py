@@ -0,0 +1,161 @@
+"""
+Fractional position keys ordering the tasks of a todo list
+"""
+
+# Keys are compared as plain strings, so they are made of lowercase letters
+# and digits only, which every collation orders the same way.
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# A key is an integer part followed by a fraction without trailing zeros.
+# The head of the integer part gives its sign and number of digits: 'i' to
+# 'z' for 1 to 18 digits, 'h' down to '0' for negative ones. Appending or
+# prepending steps the integer, so keys only grow logarithmically at the
+# ends; inserting between two keys extends the fraction.
+ZERO = 'i0'
+
+SMALLEST = '0' * 19
+
+# Keys longer than this get the list rebalanced in the background.
+REBALANCE_LENGTH = 32
+
+MAX_LENGTH = 255
+
+
+def get_integer_length(head):
+    """Return the length of the integer part starting with head."""
+    index = DIGITS.index(head)
+    if index >= DIGITS.index('i'):
+        return index - DIGITS.index('i') + 2
+    return DIGITS.index('h') - index + 2
+
+
+def split_key(key):
+    """Return the integer part and fraction of key, or raise ValueError."""
+    if not key or key[0] not in DIGITS:
+        raise ValueError(f'Invalid position key: {key!r}.')
+    length = get_integer_length(key[0])
+    integer, fraction = key[:length], key[length:]
+    if len(integer) < length or key == SMALLEST or \
+            fraction.endswith('0') or \
+            any(char not in DIGITS for char in key):
+        raise ValueError(f'Invalid position key: {key!r}.')
+    return integer, fraction
+
+
+def midpoint(low, high):
+    """Return a fraction between low and high, None being the end."""
+    if high is not None:
+        # Skip the common prefix, low padded with zeros.
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else '0') == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + midpoint(low[n:], high[n:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else len(DIGITS)
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit + 1) // 2]
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[low_digit] + midpoint(low[1:], None)
+
+
+def increment_integer(integer):
+    """Return the integer part following integer, or None past the last."""
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[index]) + 1
+        if digit < len(DIGITS):
+            digits[index] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[index] = DIGITS[0]
+    if head == 'h':
+        return ZERO
+    if head == DIGITS[-1]:
+        return None
+    head = DIGITS[DIGITS.index(head) + 1]
+    if head > 'i':
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def decrement_integer(integer):
+    """Return the integer part before integer, or None past the first."""
+    head, digits = integer[0], list(integer[1:])
+    for index in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[index]) - 1
+        if digit >= 0:
+            digits[index] = DIGITS[digit]
+            return head + ''.join(digits)
+        digits[index] = DIGITS[-1]
+    if head == 'i':
+        return 'h' + DIGITS[-1]
+    if head == DIGITS[0]:
+        return None
+    head = DIGITS[DIGITS.index(head) - 1]
+    if head < 'h':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def key_between(before, after):
+    """
+    Return a key sorting between the keys before and after.
+
+    None stands for the start or the end of the list. Raises ValueError
+    if a key is invalid or before does not sort below after.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f'{before!r} does not sort before {after!r}.')
+    if before is None and after is None:
+        return ZERO
+    if before is None:
+        integer, fraction = split_key(after)
+        if integer == SMALLEST:
+            return integer + midpoint('', fraction)
+        if fraction:
+            return integer
+        key = decrement_integer(integer)
+        if key is None:
+            raise ValueError('No key before the first key.')
+        return key
+    integer, fraction = split_key(before)
+    if after is None:
+        key = increment_integer(integer)
+        return integer + midpoint(fraction, None) if key is None else key
+    after_integer, after_fraction = split_key(after)
+    if integer == after_integer:
+        return integer + midpoint(fraction, after_fraction)
+    key = increment_integer(integer)
+    if key is not None and key < after:
+        return key
+    return integer + midpoint(fraction, None)
+
+
+def keys_between(before, after, count):
+    """Return count keys in order between the keys before and after."""
+    if count == 0:
+        return []
+    if count == 1:
+        return [key_between(before, after)]
+    if after is None:
+        keys = [key_between(before, None)]
+        while len(keys) < count:
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if before is None:
+        keys = [key_between(None, after)]
+        while len(keys) < count:
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = count // 2
+    key = key_between(before, after)
+    return [
+        *keys_between(before, key, middle),
+        key,
+        *keys_between(key, after, count - middle - 1),
+    ]
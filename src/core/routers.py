@@ -0,0 +1,55 @@
+"""
+Database routing to read replicas
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Alias of the replica the current request reads from, or None for the
+# primary. Set by core.middleware.ReplicaRoutingMiddleware once per request,
+# so all of its reads see the same state of the data.
+read_replica = ContextVar('read_replica', default=None)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica the current request was given.
+
+    Replicas are only read while `read_replica` holds one of
+    `settings.DATABASE_REPLICAS`, which the middleware sets for safe
+    requests of clients that have not written recently. Everything else,
+    including management commands, reads made inside a transaction on the
+    primary and the models authentication depends on, uses the primary.
+    """
+    primary_models = {'authtoken.token', 'sessions.session'}
+
+    def use_primary(self, model):
+        """Return whether model must be read from the primary."""
+        label = model._meta.label_lower
+        return (
+            label in self.primary_models
+            or label == settings.AUTH_USER_MODEL.lower()
+        )
+
+    def db_for_read(self, model, **hints):
+        replica = read_replica.get()
+        if replica is None or not settings.DATABASE_REPLICAS:
+            return None
+        # A transaction must see its own writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if self.use_primary(model):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # Instances read from a replica must still be saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
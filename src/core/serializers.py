@@ -0,0 +1,87 @@
+"""
+Serializers for the core API
+"""
+from rest_framework import serializers
+
+
+MAX_BATCH_REQUESTS = 50
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Serializer for one request of a batch."""
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'],
+    )
+    path = serializers.RegexField(
+        r'^/',
+        max_length=2048,
+        help_text='Path of a todo or user endpoint, with its query string.',
+    )
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for a batch of requests."""
+    requests = serializers.ListField(
+        child=SubRequestSerializer(),
+        min_length=1,
+        max_length=MAX_BATCH_REQUESTS,
+    )
+    atomic = serializers.BooleanField(
+        default=False,
+        help_text='Run every request in one transaction, stopping and '
+                  'rolling back at the first failed one.',
+    )
+
+
+class SubResponseSerializer(serializers.Serializer):
+    """Serializer for the response to one request of a batch."""
+    status = serializers.IntegerField()
+    headers = serializers.DictField(child=serializers.CharField())
+    body = serializers.JSONField(allow_null=True)
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """Serializer for the responses to a batch of requests."""
+    responses = SubResponseSerializer(many=True)
+    rolled_back = serializers.BooleanField(
+        help_text='Whether an atomic batch failed and was rolled back.',
+    )
+
+
+class TokenCacheStatsSerializer(serializers.Serializer):
+    """Serializer for the counters of the token cache."""
+    size = serializers.IntegerField()
+    max_size = serializers.IntegerField()
+    hits = serializers.IntegerField()
+    shared_hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+
+
+class ResponseCacheStatsSerializer(serializers.Serializer):
+    """Serializer for the counters of the response cache."""
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    oversized = serializers.IntegerField()
+    hit_ratio = serializers.FloatField()
+
+
+class HashingPoolStatsSerializer(serializers.Serializer):
+    """Serializer for the size and counters of the password hashing pool."""
+    max_workers = serializers.IntegerField()
+    max_pending = serializers.IntegerField()
+    in_flight = serializers.IntegerField()
+    submitted = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+
+
+class MetricsSerializer(serializers.Serializer):
+    """Serializer for the pool and cache statistics of a process."""
+    database_pools = serializers.DictField(
+        child=serializers.DictField(child=serializers.IntegerField()),
+        help_text='psycopg_pool statistics of every open pool, by alias.',
+    )
+    token_cache = TokenCacheStatsSerializer()
+    response_cache = ResponseCacheStatsSerializer()
+    password_hashing = HashingPoolStatsSerializer()
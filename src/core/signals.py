@@ -0,0 +1,32 @@
+"""
+Signal handlers for the core models
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from core.authentication import get_token_cache
+from core.models import User
+
+
+def invalidate_tokens(*keys):
+    """Drop token keys from the auth cache once the change is committed."""
+    if keys:
+        transaction.on_commit(lambda: get_token_cache().invalidate(*keys))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Forget a deleted token."""
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """Forget the tokens of a changed or deactivated user."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    invalidate_tokens(*keys)
@@ -0,0 +1,150 @@
+"""
+Tests for the cached token authentication
+"""
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.authentication import TokenCache, get_token_cache
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+ME_URL = reverse('user:me')
+
+
+class TokenCacheTests(SimpleTestCase):
+    """Test the token LRU."""
+
+    def setUp(self):
+        self.addCleanup(caches['default'].clear)
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache holds at most max_size entries."""
+        token_cache = TokenCache(max_size=2)
+        token_cache.set('a', 'token-a')
+        token_cache.set('b', 'token-b')
+        token_cache.get('a')
+        token_cache.set('c', 'token-c')
+
+        self.assertEqual(token_cache.get('a'), 'token-a')
+        self.assertIsNone(token_cache.get('b'))
+        self.assertEqual(token_cache.get('c'), 'token-c')
+
+    @patch('core.authentication.time.monotonic')
+    def test_entries_expire(self, patched_monotonic):
+        """Test entries are dropped after the timeout."""
+        patched_monotonic.return_value = 100
+        token_cache = TokenCache(timeout=10)
+        token_cache.set('a', 'token-a')
+
+        patched_monotonic.return_value = 111
+
+        self.assertIsNone(token_cache.get('a'))
+
+    def test_shared_tier_used_by_other_processes(self):
+        """Test a fresh cache finds entries written to the shared tier."""
+        TokenCache(cache_alias='default').set('a', 'token-a')
+        other = TokenCache(cache_alias='default')
+
+        self.assertEqual(other.get('a'), 'token-a')
+        self.assertEqual(other.get('a'), 'token-a')
+
+        stats = other.stats()
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 0)
+
+    def test_invalidate_clears_shared_tier(self):
+        """Test invalidation drops the key from both tiers."""
+        token_cache = TokenCache(cache_alias='default')
+        token_cache.set('a', 'token-a')
+
+        token_cache.invalidate('a')
+
+        self.assertIsNone(TokenCache(cache_alias='default').get('a'))
+        self.assertIsNone(token_cache.get('a'))
+
+
+@override_settings(TOKEN_AUTH_CACHE={'MAX_SIZE': 16, 'TIMEOUT': 60})
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests through the token cache."""
+
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='password123',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        """Test a cached token saves the token lookup query."""
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        stats = get_token_cache().stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is not authenticated."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token invalidates the cached entry."""
+        self.client.get(TODO_LIST_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        res = self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates the cached entry."""
+        self.client.get(TODO_LIST_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        res = self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_changed_user_reloaded(self):
+        """Test changing a user serves the new values."""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = 'Changed'
+            self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Changed')
+
+    def test_requests_do_not_share_instances(self):
+        """Test every request gets its own user instance."""
+        self.client.get(TODO_LIST_URL)
+        cached = get_token_cache().get(self.token.key)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNot(res.wsgi_request.user, cached.user)
@@ -0,0 +1,64 @@
+"""
+Tests for the pooled PostgreSQL backend
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core.backends.postgresql.base import DatabaseWrapper, pool_stats
+
+
+POOL_OPTIONS = {'min_size': 1, 'max_size': 2, 'check': True}
+
+
+def pooled_settings(**overrides):
+    """Return the default database settings with a pool configured."""
+    settings_dict = {
+        **connection.settings_dict,
+        'CONN_MAX_AGE': 0,
+        **overrides,
+    }
+    settings_dict['OPTIONS'] = {
+        **settings_dict['OPTIONS'],
+        'pool': POOL_OPTIONS,
+    }
+    return settings_dict
+
+
+class PoolSettingsTests(SimpleTestCase):
+    """Test the pool configuration."""
+
+    def test_persistent_connections_rejected(self):
+        """Test pooling refuses CONN_MAX_AGE, which would hoard connections."""
+        with self.assertRaises(ImproperlyConfigured):
+            DatabaseWrapper(pooled_settings(CONN_MAX_AGE=60), alias='pooled')
+
+
+class PooledConnectionTests(TestCase):
+    """Test connections are reused through the pool."""
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('The pool is only used on PostgreSQL.')
+        self.wrapper = DatabaseWrapper(pooled_settings(), alias='pooled')
+        self.addCleanup(self.wrapper.close_pool)
+
+    def backend_pid(self):
+        """Return the server process of a freshly opened connection."""
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            pid = cursor.fetchone()[0]
+        self.wrapper.close()
+        return pid
+
+    def test_connection_returned_to_pool(self):
+        """Test closing keeps the server connection for the next request."""
+        self.assertEqual(self.backend_pid(), self.backend_pid())
+
+    def test_pool_stats(self):
+        """Test the statistics of the pool are reported."""
+        self.backend_pid()
+
+        stats = pool_stats()
+
+        self.assertEqual(stats['pooled']['pool_max'], 2)
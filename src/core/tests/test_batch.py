@@ -0,0 +1,222 @@
+"""
+Tests for the batch API
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.authentication import CachedTokenAuthentication, get_token_cache
+from core.models import TodoList, Task
+from core.serializers import MAX_BATCH_REQUESTS
+
+
+BATCH_URL = reverse('core:batch')
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class BatchApiTests(TestCase):
+    """Test running requests in a batch."""
+
+    def setUp(self):
+        cache.clear()
+        get_token_cache().clear()
+        self.user = create_user()
+        self.client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def batch(self, *requests, **params):
+        """Run requests in a batch and return the response data."""
+        res = self.client.post(
+            BATCH_URL,
+            {'requests': list(requests), **params},
+            format='json',
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_requests_run_in_order(self):
+        """Test each request sees the changes of the ones before."""
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+        path = reverse('todo:tasks', args=[todo_list.id])
+
+        data = self.batch(
+            {'method': 'POST', 'path': path, 'body': [{'name': 'Milk'}]},
+            {
+                'method': 'PUT',
+                'path': reverse('todo:todo-list-detail', args=[todo_list.id]),
+                'body': {'label': 'Groceries'},
+            },
+            {'method': 'GET', 'path': f'{path}?completed=false'},
+        )
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [201, 200, 200],
+        )
+        self.assertEqual(data['responses'][1]['body']['label'], 'Groceries')
+        self.assertEqual(
+            [task['name'] for task in data['responses'][2]['body']['results']],
+            ['Milk'],
+        )
+        self.assertIn('ETag', data['responses'][2]['headers'])
+        self.assertFalse(data['rolled_back'])
+
+    def test_authenticated_once(self):
+        """Test the token is checked for the batch only."""
+        with patch.object(
+            CachedTokenAuthentication,
+            'authenticate_credentials',
+            autospec=True,
+            side_effect=CachedTokenAuthentication.authenticate_credentials,
+        ) as patched_authenticate:
+            data = self.batch(*[
+                {'method': 'GET', 'path': reverse('todo:todo-lists')}
+                for _ in range(3)
+            ])
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [200] * 3,
+        )
+        patched_authenticate.assert_called_once()
+
+    def test_unauthenticated_batch(self):
+        """Test requests of an anonymous batch are anonymous."""
+        client = APIClient()
+
+        res = client.post(BATCH_URL, {'requests': [
+            {
+                'method': 'POST',
+                'path': reverse('user:create'),
+                'body': {
+                    'email': 'new@example.com',
+                    'password': 'pass123',
+                    'name': 'New',
+                },
+            },
+            {'method': 'GET', 'path': reverse('todo:todo-lists')},
+        ]}, format='json')
+
+        self.assertEqual(
+            [sub['status'] for sub in res.data['responses']],
+            [201, 401],
+        )
+
+    def test_atomic_batch_rolled_back(self):
+        """Test an atomic batch undoes everything when a request fails."""
+        data = self.batch(
+            {
+                'method': 'POST',
+                'path': reverse('todo:todo-lists'),
+                'body': {'label': 'List'},
+            },
+            {'method': 'POST', 'path': reverse('todo:todo-lists'), 'body': {}},
+            {'method': 'GET', 'path': reverse('todo:todo-lists')},
+            atomic=True,
+        )
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [201, 400],
+        )
+        self.assertTrue(data['rolled_back'])
+        self.assertFalse(TodoList.objects.exists())
+
+    def test_batch_not_atomic_by_default(self):
+        """Test requests before a failed one are kept by default."""
+        data = self.batch(
+            {
+                'method': 'POST',
+                'path': reverse('todo:todo-lists'),
+                'body': {'label': 'List'},
+            },
+            {'method': 'POST', 'path': reverse('todo:todo-lists'), 'body': {}},
+        )
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [201, 400],
+        )
+        self.assertEqual(TodoList.objects.get().label, 'List')
+
+    def test_only_todo_and_user_routes(self):
+        """Test other paths are not found."""
+        data = self.batch(*[
+            {'method': 'GET', 'path': path}
+            for path in (BATCH_URL, reverse('core:metrics'), '/admin/', '/x')
+        ])
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [404] * 4,
+        )
+
+    def test_batch_size_limited(self):
+        """Test too many requests are refused."""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'method': 'GET', 'path': reverse('todo:todo-lists')}
+        ] * (MAX_BATCH_REQUESTS + 1)}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(ROOT_URLCONF='todo.tests.async_urls')
+    def test_async_views(self):
+        """Test requests served by async views run as the batch's user."""
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+
+        data = self.batch(
+            {
+                'method': 'POST',
+                'path': reverse('todo:tasks', args=[todo_list.id]),
+                'body': {'name': 'Milk'},
+            },
+            {'method': 'GET', 'path': reverse('todo:todo-lists')},
+            atomic=True,
+        )
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [201, 200],
+        )
+        self.assertEqual(data['responses'][1]['body']['results'][0]['id'],
+                         todo_list.id)
+        self.assertEqual(Task.objects.get().name, 'Milk')
+
+    @override_settings(ROOT_URLCONF='todo.tests.async_urls')
+    def test_async_stream(self):
+        """Test streams of async views are read in full."""
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+        Task.objects.create(todo_list=todo_list, name='Milk')
+
+        todo_lists_path = reverse('todo:todo-lists')
+        tasks_path = reverse('todo:tasks', args=[todo_list.id])
+
+        data = self.batch(
+            {'method': 'GET', 'path': f'{todo_lists_path}?stream=true'},
+            {'method': 'GET', 'path': f'{tasks_path}?stream=true'},
+        )
+
+        self.assertEqual(
+            [res['status'] for res in data['responses']],
+            [200, 200],
+        )
+        self.assertEqual(
+            [row['id'] for row in data['responses'][0]['body']],
+            [todo_list.id],
+        )
+        self.assertEqual(
+            [row['name'] for row in data['responses'][1]['body']],
+            ['Milk'],
+        )
@@ -1,11 +1,26 @@
 """
 Test custom Django management commands
 """
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 import psycopg
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.models import ChangeCounter, TodoList, Task, Tombstone
+from todo.cache import get_response_cache, todo_list_scope
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -30,3 +45,356 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class ImportTasksCommandTests(TestCase):
+    """Test importing tasks in bulk."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+
+    def write(self, name, content):
+        """Write content to a temporary file and return its path."""
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def write_ndjson(self, rows):
+        """Write rows to a temporary NDJSON file and return its path."""
+        return self.write(
+            'tasks.ndjson',
+            ''.join(json.dumps(row) + '\n' for row in rows),
+        )
+
+    def import_tasks(self, *args, **kwargs):
+        """Run the command and return its (stdout, stderr)."""
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            'import_tasks', *args, stdout=stdout, stderr=stderr, **kwargs
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_ndjson(self):
+        """Test rows are imported into lists created by label."""
+        path = self.write_ndjson([
+            {'email': 'test@example.com', 'todo_list': 'Work',
+             'name': 'Task 1', 'completed': True},
+            {'email': 'test@example.com', 'todo_list': 'Home',
+             'name': 'Task 2', 'deadline': '2030-01-01T00:00:00Z'},
+            {'email': 'test@example.com', 'todo_list': 'Work',
+             'name': 'Task 3'},
+        ])
+
+        stdout, _ = self.import_tasks(path, batch_size=2)
+
+        self.assertEqual(
+            sorted(TodoList.objects.values_list('label', flat=True)),
+            ['Home', 'Work'],
+        )
+        work = Task.objects.filter(todo_list__label='Work').order_by('id')
+        self.assertEqual([task.name for task in work], ['Task 1', 'Task 3'])
+        self.assertTrue(work[0].completed)
+        home = Task.objects.get(todo_list__label='Home')
+        self.assertEqual(home.deadline.year, 2030)
+        self.assertIn('Imported 3 tasks', stdout)
+        self.assertIn('rows/s', stdout)
+
+    def test_import_csv(self):
+        """Test CSV rows with empty cells are imported."""
+        path = self.write(
+            'tasks.csv',
+            'email,todo_list,name,content,completed,deadline\n'
+            'test@example.com,Work,Task 1,,true,\n'
+            'test@example.com,Work,Task 2,Notes,false,\n',
+        )
+
+        self.import_tasks(path)
+
+        tasks = Task.objects.order_by('id')
+        self.assertEqual([task.name for task in tasks], ['Task 1', 'Task 2'])
+        self.assertIsNone(tasks[0].content)
+        self.assertIsNone(tasks[0].deadline)
+        self.assertEqual(tasks[1].content, 'Notes')
+        todo_list = TodoList.objects.get()
+        self.assertEqual(todo_list.task_count, 2)
+        self.assertEqual(todo_list.completed_count, 1)
+
+    def test_import_into_existing_list(self):
+        """Test an existing list is reused and touched."""
+        todo_list = TodoList.objects.create(user=self.user, label='Work')
+        TodoList.objects.update(updated_at=timezone.now().replace(year=2000))
+        version = get_response_cache().get_version(
+            todo_list_scope(todo_list.id)
+        )
+        path = self.write_ndjson([
+            {'email': 'test@EXAMPLE.com', 'todo_list': 'Work',
+             'name': 'Task 1'},
+        ])
+
+        self.import_tasks(path)
+
+        todo_list.refresh_from_db()
+        self.assertEqual(TodoList.objects.count(), 1)
+        self.assertEqual(todo_list.task_set.count(), 1)
+        self.assertNotEqual(todo_list.updated_at.year, 2000)
+        self.assertNotEqual(
+            get_response_cache().get_version(todo_list_scope(todo_list.id)),
+            version,
+        )
+
+    def test_invalid_rows_reported(self):
+        """Test invalid rows are skipped and reported."""
+        path = self.write_ndjson([
+            {'email': 'test@example.com', 'todo_list': 'Work'},
+            {'email': 'nobody@example.com', 'todo_list': 'Work',
+             'name': 'Task 1'},
+            {'email': 'test@example.com', 'todo_list': 'Work',
+             'name': 'Task 2'},
+        ])
+
+        stdout, stderr = self.import_tasks(path)
+
+        self.assertEqual(
+            list(Task.objects.values_list('name', flat=True)),
+            ['Task 2'],
+        )
+        self.assertIn('Row 1: {"name"', stderr)
+        self.assertIn('Row 2: {"email": ["Unknown user."]}', stderr)
+        self.assertIn('skipped 2 invalid rows', stdout)
+
+    def test_resume_from_checkpoint(self):
+        """Test a failed import resumes after the rows already done."""
+        path = self.write(
+            'tasks.ndjson',
+            json.dumps({'email': 'test@example.com', 'todo_list': 'Work',
+                        'name': 'Task 1'}) + '\n'
+            'not json\n',
+        )
+        checkpoint = os.path.join(self.tmp_dir, 'checkpoint.json')
+
+        with self.assertRaises(CommandError):
+            self.import_tasks(path, batch_size=1, checkpoint=checkpoint)
+        self.write(
+            'tasks.ndjson',
+            json.dumps({'email': 'test@example.com', 'todo_list': 'Work',
+                        'name': 'Task 1'}) + '\n' +
+            json.dumps({'email': 'test@example.com', 'todo_list': 'Work',
+                        'name': 'Task 2'}) + '\n',
+        )
+        stdout, _ = self.import_tasks(path, checkpoint=checkpoint)
+
+        self.assertIn('Resuming after 1 rows', stdout)
+        self.assertEqual(
+            sorted(Task.objects.values_list('name', flat=True)),
+            ['Task 1', 'Task 2'],
+        )
+
+    def test_import_uses_copy_on_postgresql(self):
+        """Test PostgreSQL loads the tasks with COPY."""
+        if connection.vendor != 'postgresql':
+            self.skipTest('COPY is only used on PostgreSQL.')
+        path = self.write_ndjson([
+            {'email': 'test@example.com', 'todo_list': 'Work',
+             'name': f'Task {i}'}
+            for i in range(3)
+        ])
+
+        with patch('core.management.commands.import_tasks.Task.objects'
+                   '.bulk_create') as patched_bulk_create:
+            self.import_tasks(path)
+
+        patched_bulk_create.assert_not_called()
+        self.assertEqual(Task.objects.count(), 3)
+
+
+class RepairTaskCountersCommandTests(TestCase):
+    """Test repairing drifted task counters."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.todo_lists = [
+            TodoList.objects.create(user=user, label=f'List {i}')
+            for i in range(3)
+        ]
+        for todo_list in self.todo_lists:
+            Task.objects.bulk_create([
+                Task(todo_list=todo_list, name='Open'),
+                Task(todo_list=todo_list, name='Done', completed=True),
+            ])
+        TodoList.objects.filter(pk=self.todo_lists[0].pk).update(
+            task_count=2,
+            completed_count=1,
+        )
+
+    def test_repair_drifted_lists(self):
+        """Test drifted lists are recounted in batches."""
+        stdout = StringIO()
+
+        call_command('repair_task_counters', batch_size=2, stdout=stdout)
+
+        self.assertIn('Repaired 2 drifted of 3 todo lists', stdout.getvalue())
+        for todo_list in self.todo_lists:
+            todo_list.refresh_from_db()
+            self.assertEqual(todo_list.task_count, 2)
+            self.assertEqual(todo_list.completed_count, 1)
+
+    def test_repair_invalidates_validators(self):
+        """Test revalidating a repaired list returns the new counts."""
+        client = APIClient()
+        client.force_authenticate(user=self.todo_lists[0].user)
+        url = reverse('todo:todo-list-detail', args=[self.todo_lists[1].pk])
+        res = client.get(url)
+
+        call_command('repair_task_counters', stdout=StringIO())
+        res = client.get(
+            url,
+            HTTP_IF_NONE_MATCH=res['ETag'],
+            HTTP_IF_MODIFIED_SINCE=res['Last-Modified'],
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['task_count'], 2)
+
+    def test_dry_run(self):
+        """Test a dry run only reports the drift."""
+        stdout = StringIO()
+
+        call_command('repair_task_counters', dry_run=True, stdout=stdout)
+
+        self.assertIn(
+            f'Todo list {self.todo_lists[1].pk}: 0/0 counted, 1/2 actual',
+            stdout.getvalue(),
+        )
+        self.todo_lists[1].refresh_from_db()
+        self.assertEqual(self.todo_lists[1].task_count, 0)
+
+
+class PurgeTombstonesCommandTests(TestCase):
+    """Test purging tombstones past the retention window."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+        for i in range(3):
+            Task.objects.create(todo_list=todo_list, name=f'Task {i}').delete()
+        self.old = list(Tombstone.objects.order_by('change_seq')[:2])
+        Tombstone.objects.filter(pk__in=[t.pk for t in self.old]).update(
+            deleted_at=timezone.now() - timedelta(days=31),
+        )
+
+    def test_purge_old_tombstones(self):
+        """Test old tombstones are deleted and the purged seq is raised."""
+        stdout = StringIO()
+
+        call_command('purge_tombstones', batch_size=1, stdout=stdout)
+
+        self.assertIn('Purged 2 tombstones', stdout.getvalue())
+        self.assertEqual(Tombstone.objects.count(), 1)
+        counter = ChangeCounter.objects.get(user=self.user)
+        self.assertEqual(counter.purged_seq, self.old[1].change_seq)
+
+    def test_retention_days(self):
+        """Test the retention window can be given in days."""
+        call_command('purge_tombstones', days=40, stdout=StringIO())
+
+        self.assertEqual(Tombstone.objects.count(), 3)
+        counter = ChangeCounter.objects.get(user=self.user)
+        self.assertEqual(counter.purged_seq, 0)
+
+
+class PurgeTodoListsCommandTests(TestCase):
+    """Test purging todo lists hidden for deletion."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.todo_list = TodoList.objects.create(user=user, label='Hidden')
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}') for i in range(5)
+        )
+        self.todo_list.hide()
+        self.kept = TodoList.objects.create(user=user, label='Kept')
+        Task.objects.create(todo_list=self.kept, name='Kept')
+
+    def test_purge_hidden_lists(self):
+        """Test hidden lists are deleted in batches, other lists are kept."""
+        stdout = StringIO()
+
+        call_command('purge_todo_lists', batch_size=2, stdout=stdout)
+
+        self.assertIn(f'Todo list {self.todo_list.pk}: 5 tasks',
+                      stdout.getvalue())
+        self.assertFalse(TodoList.all_objects.filter(
+            pk=self.todo_list.pk,
+        ).exists())
+        self.assertEqual(Task.objects.get().todo_list, self.kept)
+
+    def test_resume_interrupted_purge(self):
+        """Test a purge stopped after a batch is finished by the command."""
+        batches = self.todo_list.purge_batches(2)
+        self.assertEqual(next(batches), 2)
+        batches.close()
+
+        call_command('purge_todo_lists', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(TodoList.all_objects.get(), self.kept)
+        self.assertEqual(Task.objects.count(), 1)
+
+
+class RebalancePositionsCommandTests(TestCase):
+    """Test rebalancing the task positions of todo lists."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.todo_list = TodoList.objects.create(user=user, label='Long')
+        positions = ['i0', 'i0' + 'v' * 40, 'i0w', 'i1']
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}', position=key)
+            for i, key in enumerate(positions)
+        )
+        TodoList.objects.filter(pk=self.todo_list.pk).update(
+            needs_rebalance=True,
+        )
+        self.kept = TodoList.objects.create(user=user, label='Kept')
+        Task.objects.bulk_create([
+            Task(todo_list=self.kept, name='Kept', position='i0' + 'v' * 40),
+        ])
+
+    def test_rebalance_flagged_lists(self):
+        """Test flagged lists get short positions in the same order."""
+        stdout = StringIO()
+
+        call_command('rebalance_positions', batch_size=2, stdout=stdout)
+
+        self.assertIn(f'Todo list {self.todo_list.pk}: 4 tasks',
+                      stdout.getvalue())
+        tasks = Task.objects.filter(todo_list=self.todo_list)
+        self.assertEqual(
+            list(tasks.order_by('position').values_list('name', flat=True)),
+            ['Task 0', 'Task 1', 'Task 2', 'Task 3'],
+        )
+        self.assertTrue(all(len(task.position) == 2 for task in tasks))
+        self.assertEqual(len(set(tasks.values_list('change_seq'))), 1)
+        self.assertFalse(TodoList.objects.filter(
+            needs_rebalance=True,
+        ).exists())
+        self.assertEqual(Task.objects.get(todo_list=self.kept).position,
+                         'i0' + 'v' * 40)
@@ -0,0 +1,76 @@
+"""
+Tests that the todo API queries are served by the model indexes
+"""
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core import models
+
+
+class IndexUsageTests(TestCase):
+    """Test the query planner picks the indexes for the hot queries."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='password123',
+        )
+        self.todo_list = models.TodoList.objects.create(
+            user=self.user,
+            label='Test List',
+        )
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan sequentially, so make
+            # the planner prefer an index whenever one is usable.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """Assert the plan of queryset uses index_name."""
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_todo_lists_by_user_uses_index(self):
+        """Test listing todo lists of a user uses (user, -id)."""
+        queryset = models.TodoList.objects.filter(
+            user=self.user,
+        ).order_by('-id')[:101]
+
+        self.assertUsesIndex(queryset, 'todolist_user_id_idx')
+
+    def test_tasks_by_todo_list_uses_index(self):
+        """Test listing tasks of a todo list uses (todo_list, -id)."""
+        queryset = models.Task.objects.filter(
+            todo_list=self.todo_list,
+        ).order_by('-id')[:101]
+
+        self.assertUsesIndex(queryset, 'task_todo_list_id_idx')
+
+    def test_overdue_tasks_use_deadline_index(self):
+        """Test overdue tasks of a todo list use (todo_list, deadline, id)."""
+        queryset = models.Task.objects.filter(
+            todo_list=self.todo_list,
+            completed=False,
+            deadline__lt=timezone.now(),
+        ).order_by('deadline', 'id')
+
+        self.assertUsesIndex(queryset, 'task_deadline_idx')
+
+    def test_task_orderings_use_indexes(self):
+        """Test every task ordering is served by an index."""
+        indexes = {
+            'created_at': 'task_created_at_idx',
+            'updated_at': 'task_updated_at_idx',
+            'name': 'task_name_idx',
+        }
+        for field_name, index_name in indexes.items():
+            with self.subTest(field_name):
+                queryset = models.Task.objects.filter(
+                    todo_list=self.todo_list,
+                    **{f'{field_name}__gte': 'a' if field_name == 'name'
+                       else timezone.now()},
+                ).order_by(field_name, 'id')[:101]
+
+                self.assertUsesIndex(queryset, index_name)
@@ -0,0 +1,71 @@
+"""
+Tests for the metrics API
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+
+METRICS_URL = reverse('core:metrics')
+
+
+class MetricsApiTests(TestCase):
+    """Test the metrics endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test anonymous requests are rejected."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_admin_required(self):
+        """Test regular users cannot read the metrics."""
+        user = get_user_model().objects.create_user(
+            'user@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retrieve_metrics(self):
+        """Test admins get the pool and cache statistics."""
+        user = get_user_model().objects.create_superuser(
+            'admin@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.data),
+            {
+                'database_pools',
+                'token_cache',
+                'response_cache',
+                'password_hashing',
+            },
+        )
+        self.assertIn('in_flight', res.data['password_hashing'])
+        self.assertIn('hit_ratio', res.data['token_cache'])
+        self.assertIn('hit_ratio', res.data['response_cache'])
+
+    def test_schema(self):
+        """Test the schema documents the metrics response."""
+        res = self.client.get(reverse('api-schema'), {'format': 'json'})
+
+        operation = res.json()['paths'][METRICS_URL]['get']
+        self.assertEqual(
+            operation['responses']['200']['content']['application/json'],
+            {'schema': {'$ref': '#/components/schemas/Metrics'}},
+        )
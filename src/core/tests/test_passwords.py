@@ -0,0 +1,142 @@
+"""
+Tests for the password hashing pool
+"""
+import threading
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+
+from core.passwords import (
+    HashingPool,
+    HashingPoolBusy,
+    get_hashing_pool,
+    password_must_update,
+)
+
+
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+SCRYPT = 'django.contrib.auth.hashers.ScryptPasswordHasher'
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Test running hashes in the bounded pool."""
+
+    def setUp(self):
+        self.pool = HashingPool(max_workers=1, max_pending=1)
+        self.addCleanup(self.pool.executor.shutdown)
+
+    def test_run(self):
+        """Test run returns the result computed in a pool thread."""
+        name = self.pool.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(name.startswith('password-hashing'))
+        self.assertEqual(self.pool.stats()['submitted'], 1)
+        self.assertEqual(self.pool.stats()['in_flight'], 0)
+
+    async def test_arun(self):
+        """Test arun awaits the result from the event loop."""
+        self.assertEqual(await self.pool.arun(sum, [1, 2]), 3)
+
+    def test_busy(self):
+        """Test hashes past the workers and pending ones are rejected."""
+        release = threading.Event()
+        running = self.pool.submit(release.wait)
+        pending = self.pool.submit(release.wait)
+
+        with self.assertRaises(HashingPoolBusy):
+            self.pool.submit(release.wait)
+        release.set()
+        running.result()
+        pending.result()
+
+        self.assertEqual(self.pool.run(sum, [1]), 1)
+        stats = self.pool.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['submitted'], 3)
+
+    def test_settings(self):
+        """Test the process wide pool follows its settings."""
+        with override_settings(
+            PASSWORD_HASHING_POOL={'MAX_WORKERS': 2, 'MAX_PENDING': 3},
+        ):
+            stats = get_hashing_pool().stats()
+
+        self.assertEqual(stats['max_workers'], 2)
+        self.assertEqual(stats['max_pending'], 3)
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    def test_password_must_update(self):
+        """Test hashes of another hasher than the first must update."""
+        self.assertFalse(password_must_update(make_password('password123')))
+        self.assertTrue(password_must_update(
+            make_password('password123', hasher='pbkdf2_sha256'),
+        ))
+        self.assertFalse(password_must_update('!unusable'))
+
+
+class UserPasswordTests(TestCase):
+    """Test user passwords are hashed in the pool and rehashed on login."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+
+    def test_check_password(self):
+        """Test checking passwords goes through the pool."""
+        submitted = get_hashing_pool().stats()['submitted']
+
+        self.assertTrue(self.user.check_password('password123'))
+        self.assertFalse(self.user.check_password('wrong'))
+        self.assertEqual(
+            get_hashing_pool().stats()['submitted'],
+            submitted + 2,
+        )
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    def test_rehash_on_login(self):
+        """Test a correct password of an old hasher is rehashed."""
+        self.assertTrue(self.user.check_password('password123'))
+
+        self.user.refresh_from_db()
+        self.assertEqual(
+            identify_hasher(self.user.password).algorithm,
+            'scrypt',
+        )
+        self.assertTrue(self.user.check_password('password123'))
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    def test_no_rehash_on_wrong_password(self):
+        """Test a wrong password leaves the old hash alone."""
+        self.assertFalse(self.user.check_password('wrong'))
+
+        self.user.refresh_from_db()
+        self.assertEqual(
+            identify_hasher(self.user.password).algorithm,
+            'pbkdf2_sha256',
+        )
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    async def test_acheck_password(self):
+        """Test the async check rehashes too."""
+        self.assertFalse(await self.user.acheck_password('wrong'))
+        self.assertTrue(await self.user.acheck_password('password123'))
+
+        await self.user.arefresh_from_db()
+        self.assertEqual(
+            identify_hasher(self.user.password).algorithm,
+            'scrypt',
+        )
+
+    async def test_acreate_user(self):
+        """Test creating a user with the password hashed in the pool."""
+        user = await get_user_model().objects.acreate_user(
+            'Async@EXAMPLE.com',
+            'password123',
+            name='Async',
+        )
+
+        self.assertEqual(user.email, 'Async@example.com')
+        self.assertTrue(await user.acheck_password('password123'))
@@ -0,0 +1,81 @@
+"""
+Tests for the fractional task positions
+"""
+import random
+
+from django.test import SimpleTestCase
+
+from core.positions import (
+    REBALANCE_LENGTH,
+    SMALLEST,
+    ZERO,
+    key_between,
+    keys_between,
+)
+
+
+class PositionTests(SimpleTestCase):
+    """Test generating position keys."""
+
+    def test_key_between(self):
+        """Test keys sort between their neighbours."""
+        cases = [
+            (None, None),
+            (None, ZERO),
+            (ZERO, None),
+            ('i0', 'i1'),
+            ('i0', 'i0v'),
+            ('i0v', 'i1'),
+            ('hz', 'i0'),
+            ('iz', None),
+            (None, 'gzz'),
+            ('i0', 'i01'),
+            ('i00z', 'i01'),
+        ]
+        for before, after in cases:
+            key = key_between(before, after)
+            self.assertTrue(before is None or before < key, (before, key))
+            self.assertTrue(after is None or key < after, (key, after))
+
+    def test_ends_grow_slowly(self):
+        """Test appending and prepending only grow keys logarithmically."""
+        first = last = ZERO
+        for _ in range(10000):
+            first = key_between(None, first)
+            last = key_between(last, None)
+
+        self.assertLessEqual(len(first), 4)
+        self.assertLessEqual(len(last), 4)
+
+    def test_random_moves_stay_short(self):
+        """Test keys of randomly moved items stay ordered and short."""
+        rng = random.Random(42)
+        keys = keys_between(None, None, 500)
+        for _ in range(5000):
+            keys.pop(rng.randrange(len(keys)))
+            index = rng.randrange(len(keys) + 1)
+            keys.insert(index, key_between(
+                keys[index - 1] if index else None,
+                keys[index] if index < len(keys) else None,
+            ))
+
+        self.assertEqual(keys, sorted(set(keys)))
+        self.assertLess(max(len(key) for key in keys), REBALANCE_LENGTH)
+
+    def test_keys_between(self):
+        """Test many keys are ordered and within their bounds."""
+        for before, after in ((None, None), ('i0', 'i1'), (None, 'i0'),
+                              ('i0', None)):
+            keys = keys_between(before, after, 50)
+
+            self.assertEqual(keys, sorted(set(keys)))
+            self.assertTrue(before is None or before < keys[0])
+            self.assertTrue(after is None or keys[-1] < after)
+
+    def test_invalid_keys(self):
+        """Test invalid or unordered keys raise ValueError."""
+        for before, after in (('', None), (None, 'i'), ('i10', None),
+                              (None, SMALLEST), ('I0', None), ('i1', 'i0'),
+                              ('i0', 'i0')):
+            with self.assertRaises(ValueError):
+                key_between(before, after)
@@ -0,0 +1,186 @@
+"""
+Tests for routing reads to the replicas
+"""
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.authentication import get_token_cache
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import TodoList, Task
+from core.routers import read_replica
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the database chosen for reads and writes."""
+
+    def allow_replica_reads(self):
+        """Allow replica reads until the end of the test."""
+        token = read_replica.set('replica')
+        self.addCleanup(read_replica.reset, token)
+
+    def test_primary_outside_requests(self):
+        """Test reads use the primary unless a request allows replicas."""
+        self.assertEqual(router.db_for_read(TodoList), 'default')
+
+    def test_replica_reads(self):
+        """Test allowed reads go to a replica."""
+        self.allow_replica_reads()
+
+        self.assertEqual(router.db_for_read(TodoList), 'replica')
+        self.assertEqual(router.db_for_read(Task), 'replica')
+
+    def test_authentication_models_read_from_primary(self):
+        """Test users and tokens are always read from the primary."""
+        self.allow_replica_reads()
+
+        self.assertEqual(router.db_for_read(get_user_model()), 'default')
+        self.assertEqual(router.db_for_read(Token), 'default')
+
+    def test_transactions_read_primary(self):
+        """Test reads inside a transaction on the primary stay there."""
+        self.allow_replica_reads()
+
+        with patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(router.db_for_read(TodoList), 'default')
+
+    def test_writes_go_to_primary(self):
+        """Test instances read from a replica are saved to the primary."""
+        self.allow_replica_reads()
+        todo_list = TodoList()
+        todo_list._state.db = 'replica'
+
+        self.assertEqual(
+            router.db_for_write(TodoList, instance=todo_list),
+            'default',
+        )
+
+
+@override_settings(
+    DATABASE_REPLICAS=['replica'],
+    DATABASE_REPLICA_STICKY={'CACHE_ALIAS': 'default', 'TIMEOUT': 60},
+)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """Test which requests may read from the replicas."""
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+        self.read_from = None
+
+        def get_response(request):
+            self.read_from = router.db_for_read(TodoList)
+            return HttpResponse(status=request.status_code)
+        self.middleware = ReplicaRoutingMiddleware(get_response)
+
+    def request(self, method, token='abc', status_code=200):
+        """Pass a request through the middleware and return its db."""
+        request = self.factory.generic(
+            method,
+            '/',
+            HTTP_AUTHORIZATION=f'Token {token}',
+        )
+        request.status_code = status_code
+        self.middleware(request)
+        return self.read_from
+
+    def test_safe_requests_read_replicas(self):
+        """Test GET requests read from a replica."""
+        self.assertEqual(self.request('GET'), 'replica')
+        self.assertEqual(router.db_for_read(TodoList), 'default')
+
+    def test_unsafe_requests_read_primary(self):
+        """Test writing requests read from the primary."""
+        self.assertEqual(self.request('POST'), 'default')
+
+    def test_reads_stick_to_primary_after_write(self):
+        """Test a client reads from the primary right after writing."""
+        self.request('POST')
+
+        self.assertEqual(self.request('GET'), 'default')
+        self.assertEqual(self.request('GET', token='other'), 'replica')
+
+    def test_failed_write_not_sticky(self):
+        """Test rejected writes do not pin the client to the primary."""
+        self.request('POST', status_code=400)
+
+        self.assertEqual(self.request('GET'), 'replica')
+
+    def test_one_replica_per_request(self):
+        """Test every read of a request goes to the same replica."""
+        def get_response(request):
+            self.read_from = {
+                router.db_for_read(model)
+                for model in (TodoList, Task) * 10
+            }
+            return HttpResponse()
+        self.middleware = ReplicaRoutingMiddleware(get_response)
+
+        replicas = set()
+        with self.settings(DATABASE_REPLICAS=['replica0', 'replica1']):
+            for _ in range(50):
+                read_from = self.request('GET')
+                self.assertEqual(len(read_from), 1)
+                replicas |= read_from
+
+        self.assertEqual(replicas, {'replica0', 'replica1'})
+
+    def test_no_replicas(self):
+        """Test nothing is marked without replicas."""
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.request('POST')
+
+        self.assertEqual(len(cache._cache), 0)
+
+
+class ReplicaReadsTests(TransactionTestCase):
+    """Test the API reads from the configured replicas."""
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        if not settings.DATABASE_REPLICAS:
+            self.skipTest('Set DB_REPLICA_HOSTS to configure replicas.')
+        self.addCleanup(cache.clear)
+        get_token_cache().clear()
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+        )
+        self.todo_list = TodoList.objects.create(user=user, label='List')
+        self.url = reverse('todo:tasks', args=[self.todo_list.id])
+
+    def test_reads_follow_writes(self):
+        """Test reads go to the primary only after a write."""
+        replica = settings.DATABASE_REPLICAS[0]
+        with self.settings(DATABASE_REPLICAS=[replica]):
+            # The first request caches the token, read from the primary.
+            self.client.get(self.url)
+            with self.assertNumQueries(0, using='default'):
+                self.client.get(self.url)
+
+            res = self.client.post(self.url, {'name': 'Task'})
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+            with self.assertNumQueries(0, using=replica):
+                res = self.client.get(self.url)
+        self.assertEqual(len(res.data['results']), 1)
@@ -0,0 +1,14 @@
+"""
+URL mappings for the core API
+"""
+from django.urls import path
+
+from core import views
+
+
+app_name = 'core'
+
+urlpatterns = [
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('batch', views.BatchView.as_view(), name='batch'),
+]
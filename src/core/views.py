@@ -0,0 +1,80 @@
+"""
+Views for the core API
+"""
+from django.db import transaction
+
+from rest_framework import permissions
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from drf_spectacular.utils import extend_schema
+
+from core.authentication import CachedTokenAuthentication, get_token_cache
+from core.backends.postgresql.base import pool_stats
+from core.batch import dispatch
+from core.passwords import get_hashing_pool
+from core.serializers import (
+    BatchSerializer,
+    BatchResponseSerializer,
+    MetricsSerializer,
+)
+from todo.cache import get_response_cache
+
+
+class MetricsView(APIView):
+    """API exposing the pool and cache statistics."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses={200: MetricsSerializer})
+    def get(self, request, format=None):
+        """Return the statistics of this process."""
+        return Response({
+            'database_pools': pool_stats(),
+            'token_cache': get_token_cache().stats(),
+            'response_cache': get_response_cache().stats(),
+            'password_hashing': get_hashing_pool().stats(),
+        })
+
+
+class BatchView(APIView):
+    """API running several todo and user API requests in one round trip."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+    serializer_class = BatchSerializer
+
+    @extend_schema(
+        request=BatchSerializer,
+        responses={200: BatchResponseSerializer, 400: Response},
+    )
+    def post(self, request, format=None):
+        """
+        Run the requests in order and return their responses.
+
+        They are dispatched in this process as the batch's user, each
+        getting the status, headers and body it would get on its own. An
+        atomic batch stops at the first request failing with a 4xx or 5xx
+        status and rolls back the ones before it.
+        """
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sub_requests = serializer.validated_data['requests']
+
+        if not serializer.validated_data['atomic']:
+            return Response({
+                'responses': [
+                    dispatch(request, **sub_request)
+                    for sub_request in sub_requests
+                ],
+                'rolled_back': False,
+            })
+
+        responses, rolled_back = [], False
+        with transaction.atomic():
+            for sub_request in sub_requests:
+                responses.append(dispatch(request, **sub_request))
+                if responses[-1]['status'] >= 400:
+                    transaction.set_rollback(True)
+                    rolled_back = True
+                    break
+        return Response({'responses': responses, 'rolled_back': rolled_back})
@@ -0,0 +1,37 @@
+"""
+URL mappings for the todo API served by async views
+"""
+from django.urls import path
+
+from todo import async_views, views
+
+
+app_name = 'todo'
+
+
+urlpatterns = [
+    path('', async_views.TodoListsView.as_view(), name='todo-lists'),
+    path('stats', views.StatsView.as_view(), name='stats'),
+    path('search', views.TaskSearchView.as_view(), name='search'),
+    path('export', views.ExportView.as_view(), name='export'),
+    path(
+        '<int:pk>',
+        async_views.TodoListDetailView.as_view(),
+        name='todo-list-detail'
+    ),
+    path(
+        '<int:todo_list_id>/tasks',
+        async_views.TasksView.as_view(),
+        name='tasks'
+    ),
+    path(
+        '<int:todo_list_id>/tasks/<int:pk>',
+        async_views.TaskDetailView.as_view(),
+        name='task-detail'
+    ),
+    path(
+        '<int:todo_list_id>/tasks/<int:pk>/move',
+        views.TaskMoveView.as_view(),
+        name='task-move'
+    ),
+]
@@ -0,0 +1,485 @@
+"""
+Async views for the todo API
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.views import View
+
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.authentication import AsyncTokenAuthentication
+from core.models import (
+    TodoList,
+    Task,
+)
+from todo.cache import ConditionalGet, todo_list_scope, user_scope
+from todo.conditional import make_etag, not_modified, set_validators
+from todo.fieldsets import select_fields
+from todo.pagination import TodoCursorPagination, order_by
+from todo.streaming import astream_json_array, is_stream_requested
+from todo.serializers import (
+    TodoListSerializer,
+    TaskSerializer,
+    TaskSelectionSerializer,
+    TaskBulkUpdateSerializer,
+    TaskQuerySerializer,
+    task_values_serializer,
+    todo_list_values_serializer,
+    todo_list_detail_values_serializer,
+)
+from todo.views import MAX_BULK_TASKS, TASK_LIST_FIELDS
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    """Async version of get_object_or_404."""
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of the APIView setup used by `todo.views`.
+
+    DRF views are sync only, so this runs the same pieces by hand: token
+    authentication through the shared token cache, DRF's parsers for the
+    request body and JSON error responses. Queries use the async ORM;
+    writes that need a transaction run in `sync_to_async`, since
+    transactions are not supported in async code. Views without an
+    `authentication` are public.
+    """
+    authentication = AsyncTokenAuthentication()
+    renderer = JSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Token authentication is not vulnerable to CSRF, as with APIView.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+        request = Request(request, parsers=parsers)
+        # Every response is JSON, as DRF's negotiation would pick.
+        request.accepted_renderer = self.renderer
+        request.accepted_media_type = self.renderer.media_type
+        self.request = request
+        try:
+            user_auth = self.get_forced_auth(request)
+            if user_auth is None and self.authentication is not None:
+                user_auth = await self.authentication.aauthenticate(request)
+                if user_auth is None:
+                    raise exceptions.NotAuthenticated()
+            request.user, request.auth = user_auth or (AnonymousUser(), None)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self.handle_exception(exceptions.NotFound())
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    @staticmethod
+    def get_forced_auth(request):
+        """Return the (user, token) a batch request was run as, or None."""
+        user = getattr(request._request, '_force_auth_user', None)
+        if user is None:
+            return None
+        return (user, getattr(request._request, '_force_auth_token', None))
+
+    def handle_exception(self, exc):
+        """Return the JSON error response DRF would give for exc."""
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+        response = self.render(data, exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated,
+                            exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = (
+                self.authentication.authenticate_header(self.request)
+            )
+        return response
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        """Return data rendered as a JSON response."""
+        if data is None:
+            return HttpResponse(status=status_code)
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status_code,
+            content_type='application/json',
+        )
+
+
+class TodoListsView(AsyncAPIView):
+    """API for listing & creating todo lists."""
+    pagination_class = TodoCursorPagination
+
+    async def get(self, request, format=None):
+        """Retrieve todo lists for authenticated user."""
+        fields = select_fields(request, todo_list_values_serializer)
+        stream = is_stream_requested(request)
+        conditional = ConditionalGet(
+            request,
+            None if stream else user_scope(request.user.pk),
+        )
+        response = await conditional.alookup()
+        if response is not None:
+            return response
+
+        todo_lists = TodoList.objects.filter(user=request.user)
+
+        # Deleting a list lowers the count but not the newest updated_at,
+        # so only an ETag (no Last-Modified) is safe for the collection.
+        stats = await todo_lists.aaggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id'),
+        )
+        response = conditional.not_modified(make_etag(
+            request.get_full_path(),
+            stats['last_modified'],
+            stats['count'],
+        ))
+        if response is not None:
+            return response
+
+        rows = fields.values(todo_lists, 'id')
+        if stream:
+            return await conditional.arespond(
+                astream_json_array(rows.order_by('-id'), fields)
+            )
+
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(rows, request, view=self)
+        return await conditional.arespond(self.render(
+            paginator.get_paginated_data(fields.many(page))
+        ))
+
+    async def post(self, request, format=None):
+        """Create todo lists for authenticated user."""
+        serializer = TodoListSerializer(
+            data=request.data,
+            context={"request": request}
+        )
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        await sync_to_async(serializer.save)()
+        return self.render(serializer.data, status.HTTP_201_CREATED)
+
+
+class TodoListDetailView(AsyncAPIView):
+    """API for get, update and delete a todo list."""
+
+    async def get_object(self, pk):
+        """Retrieve todo list object by ID."""
+        return await aget_object_or_404(
+            TodoList.objects.all(),
+            pk=pk,
+            user=self.request.user,
+        )
+
+    async def get(self, request, pk, format=None):
+        """Retrieve todo list object detail."""
+        fields = select_fields(request, todo_list_detail_values_serializer)
+        task_fields = select_fields(
+            request,
+            task_values_serializer,
+            TASK_LIST_FIELDS,
+            name='task_fields',
+        )
+        conditional = ConditionalGet(request, todo_list_scope(pk))
+        response = await conditional.alookup()
+        if response is not None:
+            return response
+
+        todo_list = await aget_object_or_404(
+            fields.values(TodoList.objects, 'updated_at'),
+            pk=pk,
+            user=request.user,
+        )
+        last_modified = todo_list['updated_at']
+
+        # Task changes touch the list, so its updated_at covers the tasks.
+        response = conditional.not_modified(
+            make_etag(request.get_full_path(), last_modified),
+            last_modified,
+        )
+        if response is not None:
+            return response
+
+        data = fields.one(todo_list)
+        if 'tasks' in fields.field_names:
+            data['tasks'] = task_fields.many([
+                row async for row in task_fields.values(
+                    Task.objects.filter(todo_list_id=pk).order_by('-id')
+                )
+            ])
+        return await conditional.arespond(self.render(data))
+
+    async def put(self, request, pk, format=None):
+        """Update a todo list."""
+        todo_list = await self.get_object(pk=pk)
+        serializer = TodoListSerializer(
+            todo_list,
+            data=request.data,
+            context={"request": request}
+        )
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        await sync_to_async(serializer.save)()
+        data = dict(serializer.data)
+        data['tasks'] = task_values_serializer.many([
+            row async for row in Task.objects.filter(
+                todo_list=todo_list,
+            ).order_by('-id').values(*task_values_serializer.value_names)
+        ])
+        return self.render(data)
+
+    async def delete(self, request, pk, format=None):
+        """Delete a todo list in database."""
+        todo_list = await self.get_object(pk=pk)
+        await sync_to_async(self.delete_todo_list)(todo_list)
+        return self.render(None, status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def delete_todo_list(todo_list):
+        """Hide the list, then delete one batch of its tasks."""
+        todo_list.hide()
+        todo_list.purge(settings.TODO_LIST_DELETE_BATCH_SIZE, max_batches=1)
+
+
+class TasksView(AsyncAPIView):
+    """API for listing, creating and bulk changing tasks of a todo list."""
+    pagination_class = TodoCursorPagination
+
+    async def get_todo_list(self, pk):
+        """Retrieve todo list object by ID."""
+        return await aget_object_or_404(
+            TodoList.objects.all(),
+            pk=pk,
+            user=self.request.user,
+        )
+
+    async def get(self, request, todo_list_id, format=None):
+        """Retrieve list of tasks for the todo list."""
+        todo_list = await self.get_todo_list(pk=todo_list_id)
+        query = TaskQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = select_fields(
+            request,
+            task_values_serializer,
+            TASK_LIST_FIELDS,
+        )
+
+        # Task changes touch the list, so its updated_at covers the tasks.
+        # Overdue tasks also change with time, so those are never current.
+        now = timezone.now()
+        last_modified = todo_list.updated_at
+        etag = make_etag(
+            request.get_full_path(),
+            last_modified,
+            now if query.is_time_dependent() else None,
+        )
+        if not query.is_time_dependent():
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+        tasks = query.filter_queryset(
+            Task.objects.filter(todo_list=todo_list),
+            now,
+        )
+        ordering = query.get_ordering()
+        rows = fields.values(tasks, *(name.lstrip('-') for name in ordering))
+        if is_stream_requested(request):
+            response = astream_json_array(order_by(rows, ordering), fields)
+            return set_validators(response, etag, last_modified)
+
+        paginator = self.pagination_class()
+        paginator.ordering = ordering
+        page = await paginator.apaginate_queryset(rows, request, view=self)
+        response = self.render(paginator.get_paginated_data(
+            fields.many(page)
+        ))
+        return set_validators(response, etag, last_modified)
+
+    async def post(self, request, todo_list_id, format=None):
+        """
+        Create a task for the todo list.
+
+        A JSON array creates all of its tasks at once; if any item is
+        invalid nothing is created and the errors are returned per item.
+        """
+        todo_list = await self.get_todo_list(pk=todo_list_id)
+
+        if isinstance(request.data, list):
+            serializer = TaskSerializer(
+                data=request.data,
+                many=True,
+                max_length=MAX_BULK_TASKS,
+                context={"request": request}
+            )
+        else:
+            serializer = TaskSerializer(
+                data=request.data,
+                context={"request": request}
+            )
+
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        await sync_to_async(self.create_tasks)(serializer, todo_list)
+        return self.render(serializer.data, status.HTTP_201_CREATED)
+
+    @staticmethod
+    def create_tasks(serializer, todo_list):
+        """Save the tasks and touch their list in one transaction."""
+        with transaction.atomic():
+            tasks = serializer.save(todo_list=todo_list)
+            if not isinstance(tasks, list):
+                tasks = [tasks]
+            todo_list.touch(
+                tasks=len(tasks),
+                completed=sum(task.completed for task in tasks),
+                change_seq=tasks[0].change_seq if tasks else None,
+            )
+
+    async def patch(self, request, todo_list_id, format=None):
+        """Update the selected tasks of the todo list in one statement."""
+        todo_list = await self.get_todo_list(pk=todo_list_id)
+        serializer = TaskBulkUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = serializer.filter_queryset(
+            Task.objects.filter(todo_list=todo_list)
+        )
+        count = await sync_to_async(self.update_tasks)(
+            tasks,
+            todo_list,
+            serializer.get_values(),
+        )
+        return self.render({'count': count})
+
+    @staticmethod
+    def update_tasks(tasks, todo_list, values):
+        """Update tasks and touch their list in one transaction."""
+        with transaction.atomic():
+            return todo_list.update_tasks(tasks, **values)
+
+    async def delete(self, request, todo_list_id, format=None):
+        """Delete the selected tasks of the todo list in one statement."""
+        todo_list = await self.get_todo_list(pk=todo_list_id)
+        serializer = TaskSelectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = serializer.filter_queryset(
+            Task.objects.filter(todo_list=todo_list)
+        )
+        count = await sync_to_async(self.delete_tasks)(tasks, todo_list)
+        return self.render({'count': count})
+
+    @staticmethod
+    def delete_tasks(tasks, todo_list):
+        """Delete tasks and touch their list in one transaction."""
+        with transaction.atomic():
+            return todo_list.delete_tasks(tasks)
+
+
+class TaskDetailView(AsyncAPIView):
+    """API for get, update and delete a task."""
+
+    async def get_object(self, todo_list_id, pk):
+        """Retrieve task object by ID, checking ownership in one query."""
+        return await aget_object_or_404(
+            Task.objects.select_related('todo_list'),
+            pk=pk,
+            todo_list_id=todo_list_id,
+            todo_list__user=self.request.user,
+            todo_list__deleted_at=None,
+        )
+
+    async def get(self, request, todo_list_id, pk, format=None):
+        """Retrieve a task in todo list."""
+        fields = select_fields(request, task_values_serializer)
+        task = await aget_object_or_404(
+            fields.values(Task.objects),
+            pk=pk,
+            todo_list_id=todo_list_id,
+            todo_list__user=request.user,
+            todo_list__deleted_at=None,
+        )
+        return self.render(fields.one(task))
+
+    async def put(self, request, todo_list_id, pk, format=None):
+        """Update a task in todo list."""
+        task = await self.get_object(todo_list_id, pk)
+        serializer = TaskSerializer(
+            task,
+            data=request.data,
+            context={'request': request}
+        )
+
+        if not serializer.is_valid():
+            return self.render(
+                serializer.errors,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        await sync_to_async(self.save_task)(serializer, task)
+        return self.render(serializer.data)
+
+    @staticmethod
+    def save_task(serializer, task):
+        """Save the task and touch its list in one transaction."""
+        completed = task.completed
+        with transaction.atomic():
+            serializer.save()
+            task.todo_list.touch(
+                completed=task.completed - completed,
+                change_seq=task.change_seq,
+            )
+
+    async def delete(self, request, todo_list_id, pk, format=None):
+        """Delete a task in todo list."""
+        task = await self.get_object(todo_list_id, pk)
+        await sync_to_async(self.delete_task)(task)
+        return self.render(None, status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def delete_task(task):
+        """Delete the task and touch its list in one transaction."""
+        with transaction.atomic():
+            task.delete()
+            task.todo_list.touch(
+                tasks=-1,
+                completed=-task.completed,
+                change_seq=task.change_seq,
+            )
@@ -0,0 +1,24 @@
+"""
+Benchmarks for the todo API.
+
+They are regular Django test cases kept out of the default test discovery.
+Run them with `make benchmark`, or a single one with
+`python manage.py test todo.benchmarks.bench_bulk_create`.
+"""
+import sys
+import time
+
+
+def timed(func, *args, **kwargs):
+    """Call func and return (seconds taken, result)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def report(title, rows):
+    """Print a table of (label, value) rows under title."""
+    width = max(len(label) for label, _ in rows)
+    sys.stdout.write(f'\n{title}\n')
+    for label, value in rows:
+        sys.stdout.write(f'  {label.ljust(width)}  {value}\n')
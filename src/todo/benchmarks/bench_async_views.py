@@ -0,0 +1,105 @@
+"""
+Benchmark concurrent requests to the sync views under WSGI and ASGI and to
+the async views under ASGI
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import (
+    AsyncClient,
+    Client,
+    TransactionTestCase,
+    override_settings,
+)
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+REQUESTS = 400
+CONCURRENCY = 50
+WSGI_WORKERS = 4
+ASYNC_URLCONF = 'todo.tests.async_urls'
+
+
+class AsyncViewsBenchmark(TransactionTestCase):
+    """
+    Compare request throughput with many requests in flight.
+
+    WSGI is a pool of worker threads each serving one request at a time;
+    ASGI is one event loop with every request in flight at once. This runs
+    in process, so it measures the cost of dispatching and querying, not
+    socket handling; use a real server and load generator to measure slow
+    clients end to end.
+    """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        self.headers = {
+            'Authorization': f'Token {Token.objects.create(user=user).key}',
+        }
+        todo_list = TodoList.objects.create(user=user, label='List')
+        Task.objects.bulk_create(
+            Task(todo_list=todo_list, name=f'Task {i}') for i in range(100)
+        )
+        self.url = reverse('todo:tasks', args=[todo_list.id])
+
+    def wsgi_requests(self):
+        """Serve the requests from a pool of sync workers."""
+        def request(_):
+            try:
+                return Client().get(self.url, headers=self.headers)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=WSGI_WORKERS) as executor:
+            return list(executor.map(request, range(REQUESTS)))
+
+    def asgi_requests(self):
+        """Serve the requests concurrently from one event loop."""
+        async def run():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(CONCURRENCY)
+
+            async def request():
+                async with semaphore:
+                    return await client.get(self.url, headers=self.headers)
+
+            return await asyncio.gather(
+                *(request() for _ in range(REQUESTS))
+            )
+        return async_to_sync(run)()
+
+    def test_concurrent_throughput(self):
+        """Report requests per second of every deployment."""
+        wsgi_time, wsgi = timed(self.wsgi_requests)
+        asgi_sync_time, asgi_sync = timed(self.asgi_requests)
+        with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+            asgi_async_time, asgi_async = timed(self.asgi_requests)
+
+        for responses in (wsgi, asgi_sync, asgi_async):
+            self.assertTrue(all(res.status_code == 200 for res in responses))
+        report(
+            f'{REQUESTS} task list requests, {CONCURRENCY} in flight',
+            [
+                (f'WSGI, {WSGI_WORKERS} workers, sync views',
+                 f'{REQUESTS / wsgi_time:.0f} req/s'),
+                ('ASGI, sync views',
+                 f'{REQUESTS / asgi_sync_time:.0f} req/s'),
+                ('ASGI, async views',
+                 f'{REQUESTS / asgi_async_time:.0f} req/s'),
+            ],
+        )
@@ -0,0 +1,96 @@
+"""
+Benchmark running the requests of a client screen one by one or in a batch
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import TodoList
+
+from todo.benchmarks import timed, report
+
+
+REQUEST_COUNT = 20
+
+ROUNDS = 20
+
+# Round trip time of a mobile client on a fair connection.
+ROUND_TRIP_SECONDS = 0.08
+
+
+class BatchBenchmark(TestCase):
+    """Compare sequential requests with one batch of the same requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.todo_list = TodoList.objects.create(user=cls.user, label='List')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        tasks_url = reverse('todo:tasks', args=[self.todo_list.id])
+        self.requests = [
+            {
+                'method': 'POST',
+                'path': tasks_url,
+                'body': {'name': f'Task {i}'},
+            }
+            if i % 2 else
+            {'method': 'GET', 'path': f'{tasks_url}?completed=false'}
+            for i in range(REQUEST_COUNT)
+        ]
+
+    def sequential(self):
+        """Send every request on its own."""
+        for request in self.requests:
+            method = getattr(self.client, request['method'].lower())
+            res = method(request['path'], request.get('body'), format='json')
+            self.assertLess(res.status_code, 400)
+
+    def batch(self):
+        """Send every request in one batch."""
+        res = self.client.post(
+            reverse('core:batch'),
+            {'requests': self.requests},
+            format='json',
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertLess(
+            max(sub['status'] for sub in res.data['responses']),
+            400,
+        )
+
+    def test_batch(self):
+        """Report server time and time with round trips of both."""
+        sequential_time = sum(
+            timed(self.sequential)[0] for _ in range(ROUNDS)
+        ) / ROUNDS
+        batch_time = sum(timed(self.batch)[0] for _ in range(ROUNDS)) / ROUNDS
+        sequential_total = sequential_time + REQUEST_COUNT * ROUND_TRIP_SECONDS
+        batch_total = batch_time + ROUND_TRIP_SECONDS
+
+        report(
+            f'{REQUEST_COUNT} requests, '
+            f'{ROUND_TRIP_SECONDS * 1000:.0f}ms round trips',
+            [
+                (
+                    'sequential',
+                    f'server {sequential_time * 1000:.1f}ms, '
+                    f'total {sequential_total * 1000:.0f}ms',
+                ),
+                (
+                    'batch',
+                    f'server {batch_time * 1000:.1f}ms, '
+                    f'total {batch_total * 1000:.0f}ms',
+                ),
+            ],
+        )
+        self.assertLess(batch_total, sequential_total / 5)
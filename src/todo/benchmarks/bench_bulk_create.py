@@ -0,0 +1,58 @@
+"""
+Benchmark creating tasks one request at a time versus in bulk
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+TASK_COUNT = 2000
+
+
+class BulkCreateBenchmark(TestCase):
+    """Compare single and bulk task creation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.url = reverse('todo:tasks', args=[self.todo_list.id])
+        self.payload = [
+            {'name': f'Task {i}', 'content': 'Imported item'}
+            for i in range(TASK_COUNT)
+        ]
+
+    def create_one_by_one(self):
+        """POST every task on its own."""
+        for item in self.payload:
+            self.client.post(self.url, item, format='json')
+
+    def create_in_bulk(self):
+        """POST all tasks as one JSON array."""
+        self.client.post(self.url, self.payload, format='json')
+
+    def test_bulk_create(self):
+        """Time both ways of creating the same tasks."""
+        single, _ = timed(self.create_one_by_one)
+        Task.objects.all().delete()
+        bulk, _ = timed(self.create_in_bulk)
+
+        self.assertEqual(Task.objects.count(), TASK_COUNT)
+        report(f'Creating {TASK_COUNT} tasks', [
+            ('one request per task', f'{single:.3f}s'),
+            ('one bulk request', f'{bulk:.3f}s'),
+            ('speedup', f'{single / bulk:.1f}x'),
+        ])
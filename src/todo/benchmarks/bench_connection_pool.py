@@ -0,0 +1,62 @@
+"""
+Benchmark the connection setup of a request with and without the pool
+"""
+from django.db import connection
+from django.test import TestCase
+
+from core.backends.postgresql.base import DatabaseWrapper
+
+from todo.benchmarks import timed, report
+
+
+REQUESTS = 200
+
+
+class ConnectionPoolBenchmark(TestCase):
+    """
+    Compare one query per request over fresh and pooled connections.
+
+    Every "request" opens the connection, runs a query and closes it, as
+    Django does with CONN_MAX_AGE = 0.
+    """
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('The pool is only used on PostgreSQL.')
+
+    def make_wrapper(self, alias, pool=None):
+        """Return a connection to the test database."""
+        settings_dict = {**connection.settings_dict, 'CONN_MAX_AGE': 0}
+        settings_dict['OPTIONS'] = {**settings_dict['OPTIONS']}
+        if pool is not None:
+            settings_dict['OPTIONS']['pool'] = pool
+        return DatabaseWrapper(settings_dict, alias=alias)
+
+    def serve(self, wrapper):
+        """Serve REQUESTS requests of one query each."""
+        for _ in range(REQUESTS):
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            wrapper.close()
+
+    def test_connection_setup(self):
+        """Report the time per request of both setups."""
+        fresh = self.make_wrapper('bench-fresh')
+        pooled = self.make_wrapper(
+            'bench-pooled',
+            pool={'min_size': 1, 'max_size': 1},
+        )
+        self.addCleanup(pooled.close_pool)
+        # Open the pool before timing, as a server does on start.
+        pooled.pool.wait()
+
+        fresh_time, _ = timed(self.serve, fresh)
+        pooled_time, _ = timed(self.serve, pooled)
+
+        report(f'{REQUESTS} requests of one query', [
+            ('new connection per request',
+             f'{fresh_time / REQUESTS * 1000:.2f} ms/request'),
+            ('pooled connection',
+             f'{pooled_time / REQUESTS * 1000:.2f} ms/request'),
+        ])
+        self.assertLess(pooled_time, fresh_time)
@@ -0,0 +1,109 @@
+"""
+Benchmark deleting a todo list of 500k tasks at once or in batches
+"""
+import tracemalloc
+
+from django.conf import settings
+from django.db import models, transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+TASK_COUNT = 500000
+
+
+def peak_memory(func):
+    """Return (seconds, peak traced bytes, result) of calling func."""
+    tracemalloc.start()
+    try:
+        seconds, result = timed(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+class DeleteTodoListBenchmark(TestCase):
+    """Compare a cascading delete with hiding and purging in batches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_lists = []
+        for label in ('Cascade', 'Batches'):
+            todo_list = TodoList.objects.create(user=cls.user, label=label)
+            Task.objects.bulk_create(
+                (
+                    Task(todo_list=todo_list, name=f'Task {i}')
+                    for i in range(TASK_COUNT)
+                ),
+                batch_size=5000,
+            )
+            todo_list.touch(tasks=TASK_COUNT)
+            cls.todo_lists.append(todo_list)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def cascade(self):
+        """Delete the first list and its tasks in one transaction."""
+        with transaction.atomic():
+            models.Model.delete(self.todo_lists[0])
+
+    def purge(self):
+        """Purge the hidden second list, return the longest batch."""
+        batches = self.todo_lists[1].purge_batches(
+            settings.TODO_LIST_DELETE_BATCH_SIZE,
+        )
+        longest = 0
+        while True:
+            seconds, count = timed(next, batches, None)
+            if count is None:
+                return longest
+            longest = max(longest, seconds)
+
+    def test_delete_todo_list(self):
+        """Report the time locks are held and the peak memory of both."""
+        cascade_time, cascade_peak, _ = peak_memory(self.cascade)
+
+        hide_time, res = timed(
+            self.client.delete,
+            reverse('todo:todo-list-detail', args=[self.todo_lists[1].id]),
+        )
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(
+            Task.objects.count(),
+            TASK_COUNT - settings.TODO_LIST_DELETE_BATCH_SIZE,
+        )
+        purge_time, purge_peak, longest = peak_memory(self.purge)
+        self.assertFalse(Task.objects.exists())
+
+        report(f'Deleting a todo list of {TASK_COUNT} tasks', [
+            (
+                'cascade',
+                f'{cascade_time * 1000:.0f}ms in one transaction, '
+                f'peak {cascade_peak / 2 ** 20:.1f} MiB',
+            ),
+            ('hide + one batch (request)', f'{hide_time * 1000:.1f}ms'),
+            (
+                'purge',
+                f'{purge_time * 1000:.0f}ms in batches of '
+                f'{settings.TODO_LIST_DELETE_BATCH_SIZE}, longest '
+                f'{longest * 1000:.1f}ms, peak {purge_peak / 2 ** 20:.1f} MiB',
+            ),
+        ])
+        self.assertLess(longest, cascade_time / 10)
@@ -0,0 +1,93 @@
+"""
+Benchmark listing tasks with long contents with and without them
+"""
+import statistics
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+from todo.serializers import TaskSerializer, task_values_serializer
+from todo.views import TASK_LIST_FIELDS
+
+from todo.benchmarks import timed, report
+
+
+TASK_COUNT = 500
+
+CONTENT_LENGTH = 4000
+
+ROUNDS = 20
+
+
+class FieldsetBenchmark(TestCase):
+    """Compare a page of tasks with every field, the default and a few."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_list = TodoList.objects.create(user=cls.user, label='List')
+        Task.objects.bulk_create(
+            Task(
+                todo_list=cls.todo_list,
+                name=f'Task {i}',
+                content='x' * CONTENT_LENGTH,
+            )
+            for i in range(TASK_COUNT)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def measure(self, names):
+        """Return (bytes, median query seconds, median seconds) of a page."""
+        url = reverse('todo:tasks', args=[self.todo_list.id])
+        params = {'limit': TASK_COUNT, 'fields': ','.join(names)}
+        rows = task_values_serializer.select(names).values(
+            Task.objects.filter(todo_list=self.todo_list).order_by('-id'),
+            'id',
+        )
+        query_times, times = [], []
+        for _ in range(ROUNDS):
+            query_times.append(timed(list, rows.all())[0])
+            seconds, res = timed(self.client.get, url, params)
+            self.assertEqual(res.status_code, 200)
+            times.append(seconds)
+        return (
+            len(res.content),
+            statistics.median(query_times),
+            statistics.median(times),
+        )
+
+    def test_fieldsets(self):
+        """Report response size, query and request time of each fieldset."""
+        rows = []
+        sizes = {}
+        for label, names in (
+            ('all fields', TaskSerializer.Meta.fields),
+            ('default', TASK_LIST_FIELDS),
+            ('id,name,completed', ['id', 'name', 'completed']),
+        ):
+            size, query_time, seconds = self.measure(names)
+            sizes[label] = size
+            rows.append((
+                label,
+                f'{size / 1024:.0f} KiB, query {query_time * 1000:.2f}ms, '
+                f'request {seconds * 1000:.1f}ms',
+            ))
+        report(
+            f'A page of {TASK_COUNT} tasks of {CONTENT_LENGTH} '
+            'character contents',
+            rows,
+        )
+        self.assertLess(sizes['default'], sizes['all fields'] / 10)
@@ -0,0 +1,174 @@
+"""
+Benchmark login throughput and event loop stalls of password hashing
+"""
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.passwords import get_hashing_pool
+
+from todo.benchmarks import timed, report
+
+
+LOGINS = 20
+PASSWORD = 'password123'
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+SCRYPT = 'django.contrib.auth.hashers.ScryptPasswordHasher'
+ASYNC_URLCONF = 'todo.tests.async_urls'
+TICK = 0.005
+
+
+async def max_stall(start_work):
+    """
+    Return (result, longest event loop stall) of awaiting start_work().
+
+    A ticker sleeping TICK seconds at a time measures how late the event
+    loop wakes it up.
+    """
+    stall = 0
+    done = False
+
+    async def tick():
+        nonlocal stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            stall = max(stall, time.perf_counter() - start - TICK)
+
+    ticker = asyncio.ensure_future(tick())
+    await asyncio.sleep(0)
+    try:
+        result = await start_work()
+    finally:
+        done = True
+        await ticker
+    return result, stall
+
+
+class LoginBenchmark(TestCase):
+    """
+    Compare PBKDF2 and scrypt logins, and hashing on the event loop with
+    hashing in the pool.
+
+    Hashes are CPU bound, so the pool only adds throughput with more cores
+    than one; what it always buys is an event loop left free to serve
+    other requests meanwhile.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {}
+        for hasher in ('pbkdf2_sha256', 'scrypt'):
+            cls.users[hasher] = get_user_model().objects.create(
+                email=f'{hasher}@example.com',
+                password=make_password(PASSWORD, hasher=hasher),
+            )
+
+    def login(self, client, hasher):
+        """Log in as the user of hasher, check a token comes back."""
+        res = client.post(reverse('user:token'), {
+            'email': f'{hasher}@example.com',
+            'password': PASSWORD,
+        })
+        self.assertEqual(res.status_code, 200)
+
+    def sync_logins(self, hasher):
+        """Return the logins per second of one WSGI worker."""
+        client = APIClient()
+        seconds, _ = timed(
+            lambda: [self.login(client, hasher) for _ in range(LOGINS)]
+        )
+        return LOGINS / seconds
+
+    def event_loop_logins(self, offload):
+        """Return (logins per second, longest stall) of concurrent checks."""
+        encoded = self.users['pbkdf2_sha256'].password
+
+        async def check():
+            if offload:
+                return await get_hashing_pool().arun(
+                    check_password, PASSWORD, encoded,
+                )
+            return check_password(PASSWORD, encoded)
+
+        async def run():
+            start = time.perf_counter()
+            results, stall = await max_stall(
+                lambda: asyncio.gather(*(check() for _ in range(LOGINS)))
+            )
+            self.assertTrue(all(results))
+            return LOGINS / (time.perf_counter() - start), stall
+
+        return async_to_sync(run)()
+
+    @override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+    def async_view_logins(self):
+        """Return (logins per second, longest stall) of the async view."""
+        async def run():
+            client = AsyncClient()
+
+            async def login():
+                res = await client.post(reverse('user:token'), {
+                    'email': 'pbkdf2_sha256@example.com',
+                    'password': PASSWORD,
+                })
+                return res.status_code
+
+            start = time.perf_counter()
+            statuses, stall = await max_stall(
+                lambda: asyncio.gather(*(login() for _ in range(LOGINS)))
+            )
+            self.assertEqual(set(statuses), {200})
+            return LOGINS / (time.perf_counter() - start), stall
+
+        return async_to_sync(run)()
+
+    def test_login(self):
+        """Report logins per second and the longest event loop stall."""
+        pbkdf2 = self.sync_logins('pbkdf2_sha256')
+        with override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2]):
+            scrypt = self.sync_logins('scrypt')
+        inline = self.event_loop_logins(offload=False)
+        pooled = self.event_loop_logins(offload=True)
+        async_view = self.async_view_logins()
+
+        with override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2]):
+            client = APIClient()
+            rehash_time, _ = timed(self.login, client, 'pbkdf2_sha256')
+            after_time, _ = timed(self.login, client, 'pbkdf2_sha256')
+
+        workers = get_hashing_pool().max_workers
+        report(f'{LOGINS} logins, hashing workers: {workers}', [
+            ('sync view, pbkdf2', f'{pbkdf2:.1f} logins/s'),
+            ('sync view, scrypt', f'{scrypt:.1f} logins/s'),
+            (
+                'pbkdf2 on the event loop',
+                f'{inline[0]:.1f} logins/s, '
+                f'longest stall {inline[1] * 1000:.0f}ms',
+            ),
+            (
+                'pbkdf2 in the pool',
+                f'{pooled[0]:.1f} logins/s, '
+                f'longest stall {pooled[1] * 1000:.1f}ms',
+            ),
+            (
+                'async view, pbkdf2',
+                f'{async_view[0]:.1f} logins/s, '
+                f'longest stall {async_view[1] * 1000:.1f}ms',
+            ),
+            (
+                'switch to scrypt',
+                f'first login {rehash_time * 1000:.0f}ms (rehash), '
+                f'then {after_time * 1000:.0f}ms',
+            ),
+        ])
+        self.assertGreater(scrypt, pbkdf2)
+        self.assertLess(pooled[1], inline[1] / 10)
+        self.assertLess(async_view[1], inline[1] / 10)
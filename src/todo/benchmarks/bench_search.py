@@ -0,0 +1,101 @@
+"""
+Benchmark full-text task searches over a million tasks
+"""
+import random
+import statistics
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+USER_COUNT = 1000
+
+TASKS_PER_USER = 1000
+
+VOCABULARY = [f'word{i}' for i in range(5000)]
+
+QUERY_COUNT = 50
+
+MAX_MEDIAN_SECONDS = 0.05
+
+
+def make_text(rng, words):
+    """Return words random words of the vocabulary."""
+    return ' '.join(rng.choices(VOCABULARY, k=words))
+
+
+class SearchBenchmark(TestCase):
+    """Time searches of one user among a million tasks of all users."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f'bench{i}@example.com')
+            for i in range(USER_COUNT)
+        )
+        todo_lists = TodoList.objects.bulk_create(
+            TodoList(user=user, label='List') for user in users
+        )
+        Task.objects.bulk_create(
+            (
+                Task(
+                    todo_list=todo_list,
+                    name=make_text(rng, 3),
+                    content=make_text(rng, 12),
+                )
+                for todo_list in todo_lists
+                for _ in range(TASKS_PER_USER)
+            ),
+            batch_size=5000,
+        )
+        cls.user = users[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def time_queries(self, queries):
+        """Return the median and worst seconds of searching queries."""
+        seconds = []
+        for query in queries:
+            elapsed, res = timed(
+                self.client.get,
+                reverse('todo:search'),
+                {'q': query},
+            )
+            self.assertEqual(res.status_code, 200)
+            seconds.append(elapsed)
+        return statistics.median(seconds), max(seconds)
+
+    def test_search(self):
+        """Report search times and check the median stays below 50ms."""
+        rng = random.Random(7)
+        words = rng.sample(VOCABULARY, QUERY_COUNT)
+        pairs = [
+            ' '.join(rng.sample(VOCABULARY, 2)) for _ in range(QUERY_COUNT)
+        ]
+
+        rows = []
+        for label, queries in (('one word', words), ('two words', pairs)):
+            median, worst = self.time_queries(queries)
+            rows.append((
+                label,
+                f'median {median * 1000:.1f}ms, worst {worst * 1000:.1f}ms',
+            ))
+            self.assertLess(median, MAX_MEDIAN_SECONDS, label)
+        report(
+            f'Searching {USER_COUNT * TASKS_PER_USER} tasks '
+            f'({len(VOCABULARY)} words)',
+            rows,
+        )
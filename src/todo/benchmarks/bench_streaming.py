@@ -0,0 +1,88 @@
+"""
+Benchmark peak memory of rendering a large task list at once or streamed
+"""
+import tracemalloc
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+from todo.serializers import task_values_serializer
+
+
+TASK_COUNT = 50000
+
+
+def peak_memory(func):
+    """Return (seconds, peak traced bytes) of calling func."""
+    tracemalloc.start()
+    try:
+        seconds, _ = timed(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+class StreamingBenchmark(TestCase):
+    """Compare building a whole response with streaming it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_list = TodoList.objects.create(user=cls.user, label='List')
+        Task.objects.bulk_create(
+            (
+                Task(
+                    todo_list=cls.todo_list,
+                    name=f'Task {i}',
+                    content='Some content ' * 10,
+                )
+                for i in range(TASK_COUNT)
+            ),
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def render_whole_list(self):
+        """Serialize and render every task in one go."""
+        rows = Task.objects.filter(todo_list=self.todo_list).order_by(
+            '-id'
+        ).values(*task_values_serializer.value_names)
+        return len(JSONRenderer().render(task_values_serializer.many(rows)))
+
+    def stream_list(self):
+        """Consume the streamed endpoint chunk by chunk."""
+        res = self.client.get(
+            reverse('todo:tasks', args=[self.todo_list.id]),
+            {'stream': 'true'},
+        )
+        return sum(len(part) for part in res.streaming_content)
+
+    def test_streaming_memory(self):
+        """Report time and peak memory of both approaches."""
+        whole_time, whole_peak = peak_memory(self.render_whole_list)
+        stream_time, stream_peak = peak_memory(self.stream_list)
+
+        report(f'Rendering {TASK_COUNT} tasks', [
+            ('whole list', f'{whole_time:.3f}s, '
+                           f'peak {whole_peak / 2 ** 20:.1f} MiB'),
+            ('streamed', f'{stream_time:.3f}s, '
+                         f'peak {stream_peak / 2 ** 20:.1f} MiB'),
+        ])
+        self.assertLess(stream_peak, whole_peak)
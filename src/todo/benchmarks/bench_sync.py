@@ -0,0 +1,132 @@
+"""
+Benchmark the sync feed of a user with 100k tasks in 200 lists
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    ChangeCounter,
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+LIST_COUNT = 200
+
+TASKS_PER_LIST = 500
+
+PAGE_SIZE = 500
+
+CHANGED_TASKS = 100
+
+
+class SyncBenchmark(TestCase):
+    """
+    Time full and incremental syncs, and show how tasks are read.
+
+    Tasks have no owner column, so the feed finds them through the user's
+    lists, along each list's (todo_list, change_seq) index, and sorts the
+    matches on (change_seq, id). An incremental sync only sorts the tasks
+    changed since its token; a full sync sorts what is left of them on
+    every page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_lists = TodoList.objects.bulk_create(
+            TodoList(user=cls.user, label=f'List {i}')
+            for i in range(LIST_COUNT)
+        )
+        # A bulk write of a user shares one change number, so number the
+        # lists apart as if their tasks were added one list at a time.
+        Task.objects.bulk_create(
+            (
+                Task(
+                    todo_list=todo_list,
+                    name=f'Task {i}',
+                    change_seq=seq + 1,
+                )
+                for seq, todo_list in enumerate(cls.todo_lists)
+                for i in range(TASKS_PER_LIST)
+            ),
+            batch_size=5000,
+        )
+        ChangeCounter.objects.create(user=cls.user, value=LIST_COUNT)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('sync')
+
+    def explain(self, sql):
+        """Return the plan of sql as one line."""
+        prefix = 'EXPLAIN ' if connection.vendor == 'postgresql' else (
+            'EXPLAIN QUERY PLAN '
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            return ' / '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def sync(self, since=None):
+        """Return (seconds, data, plan of the tasks query) of one sync."""
+        params = {'limit': PAGE_SIZE}
+        if since is not None:
+            params['since'] = since
+        with CaptureQueriesContext(connection) as ctx:
+            seconds, res = timed(self.client.get, self.url, params)
+        sql = next(
+            query['sql'] for query in ctx.captured_queries
+            if 'FROM "core_task"' in query['sql']
+        )
+        return seconds, res.data, self.explain(sql)
+
+    def full_sync(self):
+        """Return the seconds of every page of a full sync and its token."""
+        seconds, data, _ = self.sync()
+        pages = [seconds]
+        while data['has_more']:
+            seconds, data, _ = self.sync(data['next'])
+            pages.append(seconds)
+        return pages, data['next']
+
+    def test_sync(self):
+        """Report sync times and check the tasks are read by index."""
+        pages, token = self.full_sync()
+
+        for todo_list in self.todo_lists[::LIST_COUNT // CHANGED_TASKS]:
+            task = todo_list.task_set.first()
+            task.name = 'Changed'
+            task.save()
+        seconds, data, plan = self.sync(token)
+
+        report(
+            f'Sync of {LIST_COUNT * TASKS_PER_LIST} tasks in {LIST_COUNT} '
+            f'lists, {PAGE_SIZE} changes per page',
+            [
+                (
+                    'full sync',
+                    f'{len(pages)} pages, {sum(pages):.2f}s, '
+                    f'first {pages[0] * 1000:.1f}ms, '
+                    f'slowest {max(pages) * 1000:.1f}ms',
+                ),
+                (
+                    f'{CHANGED_TASKS} changed tasks',
+                    f'{seconds * 1000:.1f}ms, {plan}',
+                ),
+            ],
+        )
+        self.assertEqual(len(data['tasks']), CHANGED_TASKS)
+        self.assertIn('task_change_seq_idx', plan)
@@ -0,0 +1,138 @@
+"""
+Benchmark filtered and ordered task pages of a list with 100k tasks
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+TASK_COUNT = 100000
+
+PAGES = 20
+
+PAGE_SIZE = 500
+
+QUERIES = {
+    'newest first': {},
+    'completed': {'completed': 'true'},
+    'overdue': {'overdue': 'true', 'ordering': 'deadline'},
+    'due next week': {'deadline_after': 0, 'deadline_before': 7},
+    'by deadline': {'ordering': 'deadline'},
+    'by -deadline': {'ordering': '-deadline'},
+    'by created_at': {'ordering': 'created_at'},
+    'updated since': {'updated_since': -1, 'ordering': '-created_at'},
+    'by name': {'ordering': 'name'},
+}
+
+
+class TaskFilterBenchmark(TestCase):
+    """Time the first and a deep page of every filter and ordering."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_list = TodoList.objects.create(user=cls.user, label='List')
+        Task.objects.bulk_create(
+            (
+                Task(
+                    todo_list=cls.todo_list,
+                    name=f'Task {i * 7919 % TASK_COUNT}',
+                    completed=i % 5 == 0,
+                    deadline=(
+                        None if i % 3 == 0
+                        else cls.now + timedelta(hours=i % 1000 - 500)
+                    ),
+                )
+                for i in range(TASK_COUNT)
+            ),
+            batch_size=5000,
+        )
+        Task.objects.filter(id__gt=Task.objects.latest('id').id - 1000).update(
+            updated_at=cls.now + timedelta(hours=1),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('todo:tasks', args=[self.todo_list.id])
+
+    def get_params(self, query):
+        """Return the query parameters, with day offsets as datetimes."""
+        return {
+            name: (
+                (self.now + timedelta(days=value)).isoformat()
+                if isinstance(value, int) else value
+            )
+            for name, value in query.items()
+        }
+
+    @property
+    def index_marker(self):
+        """Return the plan text of a query searching an index."""
+        return 'Index' if connection.vendor == 'postgresql' else 'SEARCH'
+
+    def explain(self, sql):
+        """Return the plan of sql as one line."""
+        prefix = 'EXPLAIN ' if connection.vendor == 'postgresql' else (
+            'EXPLAIN QUERY PLAN '
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            return ' / '.join(str(row[-1]) for row in cursor.fetchall())
+
+    def walk_pages(self, params):
+        """Return the seconds of the first and last page, and the plan."""
+        url, seconds = self.url, []
+        for _ in range(PAGES):
+            with CaptureQueriesContext(connection) as ctx:
+                elapsed, res = timed(self.client.get, url, params)
+            seconds.append(elapsed)
+            url, params = res.data['next'], None
+            if url is None:
+                break
+        return seconds[0], seconds[-1], self.explain(ctx[-1]['sql'])
+
+    def stream_all(self):
+        """Consume the whole streamed task list and return its size."""
+        res = self.client.get(self.url, {'stream': 'true'})
+        return sum(len(part) for part in res.streaming_content)
+
+    def test_task_filters(self):
+        """Report page times and check every plan searches an index."""
+        rows = []
+        for label, query in QUERIES.items():
+            params = {**self.get_params(query), 'limit': PAGE_SIZE}
+            first, last, plan = self.walk_pages(params)
+            rows.append((
+                label,
+                f'page 1 {first * 1000:.1f}ms, '
+                f'page {PAGES} {last * 1000:.1f}ms, {plan}',
+            ))
+            self.assertIn(self.index_marker, plan, label)
+        seconds, size = timed(self.stream_all)
+        rows.append((
+            'whole list',
+            f'{seconds * 1000:.1f}ms, {size / 2 ** 20:.1f} MiB streamed '
+            f'to filter on the device',
+        ))
+        report(f'Task pages of a list with {TASK_COUNT} tasks', rows)
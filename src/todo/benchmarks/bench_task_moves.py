@@ -0,0 +1,131 @@
+"""
+Benchmark 10k random drag-and-drop moves of tasks
+"""
+import random
+import statistics
+
+from django.db import transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+
+
+TASK_COUNT = 1000
+
+MOVE_COUNT = 10000
+
+API_MOVE_COUNT = 500
+
+
+class TaskMoveBenchmark(TestCase):
+    """Time single row moves against rewriting integer positions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        cls.todo_list = TodoList.objects.create(user=cls.user, label='List')
+        Task.objects.bulk_create(
+            Task(
+                todo_list=cls.todo_list,
+                name=f'Task {i}',
+                position=position,
+            )
+            for i, position in enumerate(
+                Task.new_positions(cls.todo_list.id, TASK_COUNT)
+            )
+        )
+
+    def setUp(self):
+        self.rng = random.Random(42)
+        self.order = list(
+            Task.objects.filter(todo_list=self.todo_list).order_by(
+                'position',
+                'id',
+            ).values_list('id', flat=True)
+        )
+        self.tasks = {
+            task.id: task
+            for task in Task.objects.select_related('todo_list')
+        }
+
+    def pick_move(self):
+        """Return a random (task id, after id), applied to the order."""
+        index = self.rng.randrange(len(self.order))
+        task_id = self.order.pop(index)
+        target = self.rng.randrange(len(self.order) + 1)
+        self.order.insert(target, task_id)
+        return task_id, self.order[target - 1] if target else None, \
+            abs(target - index) + 1
+
+    def move(self, task_id, after_id):
+        """Move the task as the API does."""
+        with transaction.atomic():
+            self.todo_list.move_task(self.tasks[task_id], after_id)
+
+    def test_moves(self):
+        """Report move times, rows written and key lengths."""
+        seconds, naive_rows, rebalances = [], 0, 0
+        for _ in range(MOVE_COUNT):
+            task_id, after_id, rows = self.pick_move()
+            naive_rows += rows
+            seconds.append(timed(self.move, task_id, after_id)[0])
+            if self.todo_list.needs_rebalance:
+                rebalances += 1
+                self.todo_list.rebalance_positions()
+
+        positions = list(
+            Task.objects.filter(todo_list=self.todo_list).order_by(
+                'position',
+                'id',
+            ).values_list('id', 'position')
+        )
+        self.assertEqual([pk for pk, _ in positions], self.order)
+        longest = max(len(position) for _, position in positions)
+        rebalance_time, _ = timed(
+            transaction.atomic()(self.todo_list.rebalance_positions)
+        )
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        api_seconds = []
+        for _ in range(API_MOVE_COUNT):
+            task_id, after_id, _ = self.pick_move()
+            elapsed, res = timed(
+                client.post,
+                reverse('todo:task-move', args=[self.todo_list.id, task_id]),
+                {'after': after_id},
+                format='json',
+            )
+            self.assertEqual(res.status_code, 200)
+            api_seconds.append(elapsed)
+
+        report(f'{MOVE_COUNT} random moves in a list of {TASK_COUNT} tasks', [
+            (
+                'move',
+                f'median {statistics.median(seconds) * 1000:.2f}ms, '
+                f'worst {max(seconds) * 1000:.1f}ms',
+            ),
+            (
+                'API move',
+                f'median {statistics.median(api_seconds) * 1000:.2f}ms',
+            ),
+            (
+                'task rows written',
+                f'{MOVE_COUNT} vs {naive_rows} with integer positions',
+            ),
+            ('longest key', f'{longest} characters'),
+            ('rebalances', f'{rebalances}, {rebalance_time * 1000:.0f}ms'),
+        ])
+        self.assertLess(longest, 32)
@@ -0,0 +1,64 @@
+"""
+Benchmark the fast read path against the model serializers
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.benchmarks import timed, report
+from todo.serializers import TaskSerializer, task_values_serializer
+
+
+TASK_COUNT = 10000
+
+
+class ValuesSerializerBenchmark(TestCase):
+    """Compare TaskSerializer and ValuesSerializer on many rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(
+            'bench@example.com',
+            'password123',
+        )
+        todo_list = TodoList.objects.create(user=user, label='List')
+        Task.objects.bulk_create(
+            Task(
+                todo_list=todo_list,
+                name=f'Task {i}',
+                content='Some content',
+                deadline=timezone.now(),
+            )
+            for i in range(TASK_COUNT)
+        )
+
+    def serialize_models(self):
+        """Serialize model instances with TaskSerializer."""
+        tasks = Task.objects.order_by('-id')
+        return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+    def serialize_values(self):
+        """Serialize `.values()` rows with the fast path."""
+        rows = Task.objects.order_by('-id').values(
+            *task_values_serializer.value_names
+        )
+        return JSONRenderer().render(task_values_serializer.many(rows))
+
+    def test_values_serializer(self):
+        """Time both serializers including the query and rendering."""
+        slow, expected = timed(self.serialize_models)
+        fast, actual = timed(self.serialize_values)
+
+        self.assertEqual(actual, expected)
+        report(f'Serializing {TASK_COUNT} tasks', [
+            ('TaskSerializer', f'{slow:.3f}s'),
+            ('ValuesSerializer', f'{fast:.3f}s'),
+            ('speedup', f'{slow / fast:.1f}x'),
+        ])
@@ -0,0 +1,247 @@
+"""
+Versioned response cache for the todo API
+"""
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+from todo.conditional import not_modified, set_validators
+
+
+class ResponseCache:
+    """
+    Cache of rendered JSON responses, invalidated through version counters.
+
+    Every entry belongs to a scope (e.g. all lists of a user, or one list)
+    whose current version is part of the entry key. Bumping the version of
+    a scope makes all of its entries unreachable in O(1); they simply age
+    out of the backing cache.
+    """
+    key_prefix = 'todo-response'
+
+    def __init__(self, cache_alias='default', timeout=300,
+                 max_entry_size=1024 * 1024):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.max_entry_size = max_entry_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.oversized = 0
+
+    @property
+    def cache(self):
+        """Return the backing Django cache."""
+        return caches[self.cache_alias]
+
+    def version_key(self, scope):
+        """Return the key holding the version counter of scope."""
+        return f'{self.key_prefix}:v:{scope}'
+
+    def get_version(self, scope):
+        """Return the current version of scope."""
+        key = self.version_key(scope)
+        version = self.cache.get(key)
+        if version is None:
+            # Start from the clock rather than 1, so a counter that was
+            # evicted never comes back with a version already used.
+            self.cache.add(key, time.time_ns(), None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self, *scopes):
+        """Invalidate every entry of scopes now and again on commit."""
+        self._bump(scopes)
+        transaction.on_commit(lambda: self._bump(scopes))
+
+    def _bump(self, scopes):
+        """Increment the version counters of scopes."""
+        for scope in scopes:
+            try:
+                self.cache.incr(self.version_key(scope))
+            except ValueError:
+                self.cache.set(self.version_key(scope), time.time_ns(), None)
+
+    def entry_key(self, request, scope):
+        """
+        Return the key caching the response to request, or None.
+
+        Only JSON renderings are cached, not the browsable API. The key is
+        built once per request so a bump while the response is computed
+        stores it under the old, already unreachable version.
+        """
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is None or renderer.format != 'json':
+            return None
+        path = hashlib.md5(
+            request.get_full_path().encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        version = self.get_version(scope)
+        user_id = request.user.pk
+        return f'{self.key_prefix}:r:{user_id}:{scope}:{version}:{path}'
+
+    def get(self, request, key):
+        """Return the cached response stored under key, or None."""
+        if key is None:
+            return None
+
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        etag, last_modified = entry['etag'], entry['last_modified']
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = HttpResponse(
+                entry['content'],
+                content_type=entry['content_type'],
+            )
+            set_validators(response, etag, last_modified)
+        return response
+
+    def set(self, key, response, etag, last_modified=None, timeout=None):
+        """
+        Store response under key, or once it is rendered for a DRF one.
+
+        `timeout` shortens the configured one for responses that also go
+        stale with time.
+        """
+        if key is None:
+            return
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+
+        def store(rendered):
+            if len(rendered.content) > self.max_entry_size:
+                with self._lock:
+                    self.oversized += 1
+                return
+            self.cache.set(key, {
+                'content': rendered.content,
+                'content_type': rendered['Content-Type'],
+                'etag': etag,
+                'last_modified': last_modified,
+            }, timeout)
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+
+    def clear_stats(self):
+        """Reset the counters."""
+        with self._lock:
+            self.hits = self.misses = self.oversized = 0
+
+    def stats(self):
+        """Return the hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'oversized': self.oversized,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """Return the process wide response cache configured by settings."""
+    global _response_cache
+    if _response_cache is None:
+        options = getattr(settings, 'TODO_RESPONSE_CACHE', {})
+        _response_cache = ResponseCache(
+            cache_alias=options.get('CACHE_ALIAS', 'default'),
+            timeout=options.get('TIMEOUT', 300),
+            max_entry_size=options.get('MAX_ENTRY_SIZE', 1024 * 1024),
+        )
+    return _response_cache
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    """Rebuild the response cache when its settings are overridden."""
+    global _response_cache
+    if setting == 'TODO_RESPONSE_CACHE':
+        _response_cache = None
+
+
+def user_scope(user_id):
+    """Scope of the todo list collection of a user."""
+    return f'user:{user_id}'
+
+
+def todo_list_scope(todo_list_id):
+    """Scope of a single todo list and its tasks."""
+    return f'todo-list:{todo_list_id}'
+
+
+class ConditionalGet:
+    """
+    The cached, conditional GET shared by the sync and async todo views.
+
+    A view calls `lookup()` and returns the cached response if there is
+    one. Otherwise it computes its validators, returns the 304 of
+    `not_modified()` if any, and then passes its response to `respond()`,
+    which caches the response and attaches the validators. A scope of None
+    skips the cache, e.g. for streamed responses.
+
+    The async versions run the sync ones in a thread, which is all the
+    async methods of Django's cache backends do.
+    """
+
+    def __init__(self, request, scope):
+        self.request = request
+        self.scope = scope
+        self.response_cache = get_response_cache()
+        self.key = None
+        self.etag = None
+        self.last_modified = None
+
+    def lookup(self):
+        """Return the cached response to the request, or None."""
+        if self.scope is not None:
+            self.key = self.response_cache.entry_key(self.request, self.scope)
+        return self.response_cache.get(self.request, self.key)
+
+    async def alookup(self):
+        """Async version of lookup."""
+        return await sync_to_async(self.lookup)()
+
+    def not_modified(self, etag, last_modified=None):
+        """Keep the validators, return a 304 if the client is current."""
+        self.etag = etag
+        self.last_modified = last_modified
+        return not_modified(self.request, etag, last_modified)
+
+    def respond(self, response, timeout=None):
+        """Cache response and return it with its validators."""
+        self.response_cache.set(
+            self.key,
+            response,
+            self.etag,
+            self.last_modified,
+            timeout=timeout,
+        )
+        return set_validators(response, self.etag, self.last_modified)
+
+    async def arespond(self, response, timeout=None):
+        """Async version of respond."""
+        if self.key is None:
+            return set_validators(response, self.etag, self.last_modified)
+        return await sync_to_async(self.respond)(response, timeout)
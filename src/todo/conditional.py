@@ -0,0 +1,42 @@
+"""
+Conditional GET support for the todo API
+"""
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Return a quoted ETag derived from parts."""
+    value = '|'.join(str(part) for part in parts)
+    digest = hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's copy is current, else None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach the validators to response and make clients revalidate."""
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(
+            last_modified.timestamp()
+        )
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
@@ -0,0 +1,146 @@
+"""
+Streaming export of a user's todo lists and tasks
+"""
+from django.db.models import FilteredRelation, Q
+
+from core.models import TodoList
+
+from todo.serializers import (
+    task_values_serializer,
+    todo_list_values_serializer,
+)
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+TASK_RELATION = 'exported_task'
+
+CSV_HEADER = [
+    f'todo_list_{name}' for name in todo_list_values_serializer.value_names
+] + [
+    f'task_{name}' for name in task_values_serializer.value_names
+]
+
+
+def get_export_rows(user, since=None):
+    """
+    Return the todo lists of user joined with their tasks.
+
+    It is one LEFT JOIN ordered by list and task, so lists without tasks
+    are included. With `since`, only lists and tasks updated from then on
+    are returned; task changes touch their list, so no list is missed.
+    """
+    todo_lists = TodoList.objects.filter(user=user)
+    condition = Q()
+    if since is not None:
+        todo_lists = todo_lists.filter(updated_at__gte=since)
+        condition = Q(task__updated_at__gte=since)
+    return todo_lists.annotate(
+        **{TASK_RELATION: FilteredRelation('task', condition=condition)}
+    ).order_by('id', f'{TASK_RELATION}__id').values(
+        *todo_list_values_serializer.value_names,
+        *(
+            f'{TASK_RELATION}__{name}'
+            for name in task_values_serializer.value_names
+        ),
+    )
+
+
+def split_row(row):
+    """Split a joined row into its todo list and task parts."""
+    prefix = f'{TASK_RELATION}__'
+    todo_list, task = {}, {}
+    for key, value in row.items():
+        if key.startswith(prefix):
+            task[key[len(prefix):]] = value
+        else:
+            todo_list[key] = value
+    return todo_list, task if task['id'] is not None else None
+
+
+def build_records(rows, previous_todo_list_id=None):
+    """
+    Return the NDJSON records of a chunk of joined rows.
+
+    A todo list record is emitted before the first of its tasks; pass the
+    id of the last list of the previous chunk so it is not repeated.
+    """
+    todo_lists, tasks, order = [], [], []
+    for row in rows:
+        todo_list, task = split_row(row)
+        if todo_list['id'] != previous_todo_list_id:
+            previous_todo_list_id = todo_list['id']
+            todo_lists.append(todo_list)
+            order.append(None)
+        if task is not None:
+            tasks.append(task)
+            order.append(todo_list['id'])
+
+    todo_lists = iter(todo_list_values_serializer.many(todo_lists))
+    tasks = iter(task_values_serializer.many(tasks))
+    records = []
+    for todo_list_id in order:
+        if todo_list_id is None:
+            records.append({'type': 'todo_list', **next(todo_lists)})
+        else:
+            records.append({
+                'type': 'task',
+                **next(tasks),
+                'todo_list_id': todo_list_id,
+            })
+    return records, previous_todo_list_id
+
+
+def build_csv_records(rows):
+    """Return the flat CSV records of a chunk of joined rows."""
+    todo_lists, tasks = [], []
+    for row in rows:
+        todo_list, task = split_row(row)
+        todo_lists.append(todo_list)
+        tasks.append(task)
+
+    records = []
+    for todo_list, task in zip(
+        todo_list_values_serializer.many(todo_lists),
+        tasks,
+    ):
+        record = {f'todo_list_{k}': v for k, v in todo_list.items()}
+        if task is not None:
+            task = task_values_serializer.one(task)
+            record.update({f'task_{k}': v for k, v in task.items()})
+        records.append(record)
+    return records
+
+
+def iter_chunks(rows, chunk_size):
+    """Yield lists of up to chunk_size rows read through a cursor."""
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_export(rows, renderer, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the export of rows rendered chunk by chunk."""
+    if renderer.format == 'csv':
+        context = {'header': CSV_HEADER, 'write_header': True}
+        yield renderer.render([], renderer_context=context)
+        context['write_header'] = False
+        for chunk in iter_chunks(rows, chunk_size):
+            yield renderer.render(
+                build_csv_records(chunk),
+                renderer_context=context,
+            )
+        return
+
+    previous_todo_list_id = None
+    for chunk in iter_chunks(rows, chunk_size):
+        records, previous_todo_list_id = build_records(
+            chunk,
+            previous_todo_list_id,
+        )
+        yield renderer.render(records)
@@ -0,0 +1,36 @@
+"""
+Sparse fieldsets of the todo API responses
+"""
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+
+def fields_parameter(values_serializer, default=None, name='fields'):
+    """Return the schema of the sparse fieldset parameter name."""
+    description = 'Comma separated fields to return, among: %s.' % (
+        ', '.join(values_serializer.field_names)
+    )
+    if default is not None:
+        description += ' %s unless given.' % ', '.join(default)
+    return OpenApiParameter(name, str, description=description)
+
+
+def select_fields(request, values_serializer, default=None, name='fields'):
+    """
+    Return values_serializer narrowed down to the fields requested in name.
+
+    `?fields=id,name` renders only those fields and reads only their
+    columns. Without it the default fields are, or all of them if None.
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return values_serializer.select(default)
+
+    names = [field.strip() for field in value.split(',') if field.strip()]
+    if not names or not set(names) <= set(values_serializer.field_names):
+        raise serializers.ValidationError({name: [
+            'Choose fields among: %s.' % (
+                ', '.join(values_serializer.field_names)
+            ),
+        ]})
+    return values_serializer.select(names)
@@ -0,0 +1,278 @@
+"""
+Pagination for the todo API
+"""
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+from rest_framework.response import Response
+
+
+def is_nullable(model, name):
+    """Return whether the field name of model can be NULL."""
+    try:
+        return model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return False
+
+
+def order_by(queryset, ordering):
+    """
+    Order queryset by the field names of ordering.
+
+    NULLs sort after every value, i.e. last ascending and first
+    descending. That is how PostgreSQL indexes store them, so either
+    direction is a scan of the same index.
+    """
+    expressions = []
+    for name in ordering:
+        field_name = name.lstrip('-')
+        if not is_nullable(queryset.model, field_name):
+            expressions.append(name)
+        elif name.startswith('-'):
+            expressions.append(F(field_name).desc(nulls_first=True))
+        else:
+            expressions.append(F(field_name).asc(nulls_last=True))
+    return queryset.order_by(*expressions)
+
+
+def after_position(ordering, values):
+    """
+    Return the condition selecting the rows following values in ordering.
+
+    It is the row comparison `(a, b) > (x, y)` spelled out as
+    `a >= x AND (a > x OR b > y)`, so the first column bounds an index
+    range scan. Fields whose value is None are skipped; the caller keeps
+    the rows where they are NULL.
+    """
+    condition = None
+    for name, value in reversed(list(zip(ordering, values))):
+        if value is None:
+            continue
+        field_name = name.lstrip('-')
+        if name.startswith('-'):
+            bound, beyond = 'lte', 'lt'
+        else:
+            bound, beyond = 'gte', 'gt'
+        beyond = Q(**{f'{field_name}__{beyond}': value})
+        if condition is None:
+            condition = beyond
+        else:
+            condition = Q(**{f'{field_name}__{bound}': value}) & (
+                beyond | condition
+            )
+    return condition
+
+
+def get_segments(model, ordering):
+    """
+    Return the parts of ordering without NULLs in its first field, in order.
+
+    Each part is given as the `<field>__isnull` value selecting it, or None
+    if the field is not nullable. NULLs come after the other values
+    ascending and before them descending.
+    """
+    if not is_nullable(model, ordering[0].lstrip('-')):
+        return [None]
+    if ordering[0].startswith('-'):
+        return [True, False]
+    return [False, True]
+
+
+def filter_segment(queryset, ordering, isnull):
+    """Narrow queryset down to the part of ordering given by isnull."""
+    if isnull is None:
+        return queryset
+    field_name = ordering[0].lstrip('-')
+    return queryset.filter(**{f'{field_name}__isnull': isnull})
+
+
+class TodoCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the `-id` ordering, or another one ending in id.
+
+    Pages are fetched with `WHERE id < <cursor> ORDER BY id DESC LIMIT n`,
+    so the cost of a page does not depend on how deep the client has paged
+    and no `COUNT(*)` is ever issued. Orderings like `('deadline', 'id')`
+    put every value of the last row in the cursor and start the next page
+    right after it, which stays an index range scan given an index on the
+    same columns.
+
+    NULLs of such a field would turn the condition into an OR no index
+    serves, so past the first page the rows with and without a NULL are
+    fetched by separate queries, the second only for a page spanning both.
+
+    `paginate_queryset` is DRF's, split in two around the queries it runs
+    so async views can await those with `apaginate_queryset`.
+    """
+    ordering = '-id'
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_querysets = self.get_page_querysets(queryset, request, view)
+        if page_querysets is None:
+            return None
+        results = []
+        for page_queryset in page_querysets:
+            results.extend(page_queryset[:self.page_size + 1 - len(results)])
+            if len(results) > self.page_size:
+                break
+        return self.set_page(results)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of `paginate_queryset`."""
+        page_querysets = self.get_page_querysets(queryset, request, view)
+        if page_querysets is None:
+            return None
+        results = []
+        for page_queryset in page_querysets:
+            results.extend([
+                row async for row in
+                page_queryset[:self.page_size + 1 - len(results)]
+            ])
+            if len(results) > self.page_size:
+                break
+        return self.set_page(results)
+
+    def get_page_querysets(self, queryset, request, view=None):
+        """Return the unevaluated queries for the page, in order."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        ordering = self.ordering
+        if reverse:
+            ordering = _reverse_ordering(ordering)
+
+        if current_position is None:
+            return [order_by(queryset, ordering)[offset:]]
+
+        values = self.decode_position(current_position, queryset.model)
+        segments = get_segments(queryset.model, ordering)
+        if segments != [None]:
+            # Start from the part holding the position.
+            segments = segments[segments.index(values[0] is None):]
+
+        page_querysets = [
+            filter_segment(queryset, ordering, segments[0]).filter(
+                after_position(ordering, values)
+            ).order_by(*ordering)[offset:]
+        ]
+        page_querysets.extend(
+            filter_segment(queryset, ordering, segment).order_by(*ordering)
+            for segment in segments[1:]
+        )
+        return page_querysets
+
+    def decode_position(self, position, model):
+        """
+        Return the ordering values held by a cursor position.
+
+        Each value is converted by its field, so a cursor of another
+        ordering, or a forged one, gives 404 rather than a failing query.
+        """
+        if len(self.ordering) == 1:
+            values = [position]
+        else:
+            try:
+                values = json.loads(position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            if not isinstance(values, list) or \
+                    len(values) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+        return [
+            self.to_python(model, name.lstrip('-'), value)
+            for name, value in zip(self.ordering, values)
+        ]
+
+    def to_python(self, model, name, value):
+        """Return the cursor value of the field name as a Python value."""
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        if value is None:
+            if not field.null:
+                raise NotFound(self.invalid_cursor_message)
+            return None
+        if not isinstance(value, (str, int, float, bool)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        if len(ordering) == 1:
+            return super()._get_position_from_instance(instance, ordering)
+        values = [
+            instance[name.lstrip('-')] if isinstance(instance, dict)
+            else getattr(instance, name.lstrip('-'))
+            for name in ordering
+        ]
+        # str() rather than DjangoJSONEncoder, which drops microseconds.
+        return json.dumps(values, default=str)
+
+    def set_page(self, results):
+        """Set the page and the next/previous positions from results."""
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        """Return the paginated body of `get_paginated_response`."""
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
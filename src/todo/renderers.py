@@ -0,0 +1,63 @@
+"""
+Renderers for the todo API exports
+"""
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer writing one JSON document per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render a list of items, or a single dict, as NDJSON."""
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = [data]
+        render = JSONRenderer().render
+        return b''.join(render(item) + b'\n' for item in data)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renderer writing a list of flat dicts as CSV.
+
+    The columns come from `renderer_context['header']`, or from the keys of
+    the first item. Pass `write_header=False` to render further chunks of
+    the same document.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render a list of items, or a single dict, as CSV."""
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = [data]
+        renderer_context = renderer_context or {}
+        header = renderer_context.get('header')
+        if header is None:
+            header = list(data[0]) if data else []
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if renderer_context.get('write_header', True):
+            writer.writerow(header)
+        for item in data:
+            writer.writerow(
+                [self.format_value(item.get(column)) for column in header]
+            )
+        return buffer.getvalue().encode(self.charset)
+
+    def format_value(self, value):
+        """Return value as written to a CSV cell."""
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return value
@@ -0,0 +1,83 @@
+"""
+Full-text search over the tasks of a user
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.models import Task
+
+
+# websearch_to_tsquery accepts any input, whereas FTS5 has a query syntax of
+# its own; its input is reduced to quoted words, which must all match.
+FTS_WORD_RE = re.compile(r'\w+')
+
+
+class SearchNotSupported(APIException):
+    """Task search is not implemented for the database in use."""
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = 'Task search is not supported on this database.'
+    default_code = 'search_not_supported'
+
+
+def to_fts_query(text):
+    """Return text as an FTS5 query matching all of its words."""
+    return ' '.join(f'"{word}"' for word in FTS_WORD_RE.findall(text))
+
+
+def search_tasks(user, text):
+    """
+    Return the tasks of user matching text, best first, with their rank.
+
+    PostgreSQL matches the stored `search_vector` through its GIN index and
+    ranks with ts_rank; SQLite matches the `core_task_fts` FTS5 table and
+    ranks with bm25. Either way a name match outweighs a content match.
+    Other databases raise SearchNotSupported.
+    """
+    tasks = Task.objects.filter(
+        todo_list__user=user,
+        todo_list__deleted_at=None,
+    )
+    table = Task._meta.db_table
+    vendor = connections[tasks.db].vendor
+
+    if vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('english', %s)"
+        matches = RawSQL(
+            f'{table}.search_vector @@ {tsquery}',
+            [text],
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f'ts_rank({table}.search_vector, {tsquery})',
+            [text],
+            output_field=FloatField(),
+        )
+    elif vendor == 'sqlite':
+        text = to_fts_query(text)
+        if not text:
+            # A query of no words is invalid in FTS5 and matches nothing.
+            tasks = tasks.none()
+        matches = RawSQL(
+            f'{table}.id IN (SELECT rowid FROM {table}_fts '
+            f'WHERE {table}_fts MATCH %s)',
+            [text],
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f'(SELECT -bm25({table}_fts, 10.0, 1.0) FROM {table}_fts '
+            f'WHERE {table}_fts MATCH %s AND rowid = {table}.id)',
+            [text],
+            output_field=FloatField(),
+        )
+    else:
+        raise SearchNotSupported(
+            f'Task search is not supported on {vendor}.'
+        )
+
+    return tasks.filter(matches).annotate(rank=rank).order_by('-rank', '-id')
@@ -1,14 +1,42 @@
 """
 Serializers for the todo API view
 """
-from rest_framework import serializers
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
 from core.models import (
+    ChangeCounter,
     TodoList,
     Task,
+    Tombstone,
 )
 
 
+class TaskListSerializer(serializers.ListSerializer):
+    """Serializer for creating many Task objects at once."""
+    batch_size = 500
+
+    def create(self, validated_data):
+        """Create the tasks with batched INSERTs."""
+        tasks = [Task(**attrs) for attrs in validated_data]
+        if tasks:
+            change_seq = ChangeCounter.next_value(
+                tasks[0].todo_list.user_id
+            )
+            new_positions = Task.new_positions(
+                tasks[0].todo_list_id,
+                len(tasks),
+            )
+            for task, position in zip(tasks, new_positions):
+                task.change_seq = change_seq
+                task.position = position
+        return Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """Serializer for Task object."""
 
@@ -16,10 +44,11 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'name', 'content', 'completed',
-            'deadline', 'created_at', 'updated_at'
+            'deadline', 'position', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'position', 'created_at', 'updated_at']
         depth = 1
+        list_serializer_class = TaskListSerializer
 
 
 class TodoListSerializer(serializers.ModelSerializer):
@@ -27,8 +56,10 @@ class TodoListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TodoList
-        fields = ['id', 'label', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'label', 'task_count', 'completed_count',
+                  'created_at', 'updated_at']
+        read_only_fields = ['id', 'task_count', 'completed_count',
+                            'created_at', 'updated_at']
 
     def create(self, validated_data):
         """Create a todo list"""
@@ -38,6 +69,13 @@ class TodoListSerializer(serializers.ModelSerializer):
         )
         return todo_list
 
+    def update(self, instance, validated_data):
+        """Update a todo list without writing back its counters."""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
 class TodoListDetailSerializer(TodoListSerializer):
     """Serializer for TodoList object detail."""
@@ -46,3 +84,368 @@ class TodoListDetailSerializer(TodoListSerializer):
     class Meta(TodoListSerializer.Meta):
         fields = TodoListSerializer.Meta.fields + ['tasks']
         read_only_fields = TodoListSerializer.Meta.read_only_fields + ['tasks']
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    """Serializer for the fields tasks can be selected by."""
+    completed = serializers.BooleanField(required=False)
+
+
+class TaskSelectionSerializer(serializers.Serializer):
+    """Serializer selecting tasks by a list of ids or a filter."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+    )
+    filter = TaskFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        """Check exactly one way of selecting tasks is given."""
+        if ('ids' in attrs) == ('filter' in attrs):
+            msg = _('Provide either "ids" or "filter".')
+            raise serializers.ValidationError(msg, code='selection')
+        return attrs
+
+    def filter_queryset(self, queryset):
+        """Narrow queryset down to the selected tasks."""
+        if 'ids' in self.validated_data:
+            return queryset.filter(id__in=self.validated_data['ids'])
+        return queryset.filter(**self.validated_data['filter'])
+
+
+class TaskBulkUpdateSerializer(TaskSelectionSerializer):
+    """Serializer for updating the selected tasks to the same values."""
+    completed = serializers.BooleanField(required=False)
+    deadline = serializers.DateTimeField(required=False, allow_null=True)
+
+    update_fields = ['completed', 'deadline']
+
+    def validate(self, attrs):
+        """Check there is something to update."""
+        attrs = super().validate(attrs)
+        if not any(field in attrs for field in self.update_fields):
+            msg = _('Provide at least one of: %s.') % ', '.join(
+                self.update_fields
+            )
+            raise serializers.ValidationError(msg, code='no_values')
+        return attrs
+
+    def get_values(self):
+        """Return the field values to set on the selected tasks."""
+        return {
+            field: self.validated_data[field]
+            for field in self.update_fields
+            if field in self.validated_data
+        }
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """Serializer for moving a task within its todo list."""
+    after = serializers.IntegerField(
+        allow_null=True,
+        help_text='Id of the task to move the task right after; '
+                  'null to move it first.',
+    )
+
+    def validate_after(self, value):
+        """Check the task is not moved after itself."""
+        if value is not None and value == self.context['task'].pk:
+            msg = _('A task cannot be moved after itself.')
+            raise serializers.ValidationError(msg, code='itself')
+        return value
+
+
+class TaskImportSerializer(TaskSerializer):
+    """Serializer for a task row of a bulk import."""
+    email = serializers.EmailField(
+        help_text='Email of the user owning the todo list.',
+    )
+    todo_list = serializers.CharField(
+        max_length=255,
+        help_text='Label of the todo list, created if missing.',
+    )
+
+    class Meta(TaskSerializer.Meta):
+        fields = ['email', 'todo_list', 'name', 'content', 'completed',
+                  'deadline']
+        read_only_fields = []
+
+
+class TaskStatsSerializer(serializers.Serializer):
+    """Serializer for the task counts of the stats."""
+    open = serializers.IntegerField()
+    completed = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    due_soon = serializers.IntegerField(
+        help_text='Open tasks due within 24 hours.',
+    )
+
+
+class TodoListStatsSerializer(TaskStatsSerializer):
+    """Serializer for the task counts of a todo list."""
+    id = serializers.IntegerField()
+    label = serializers.CharField()
+
+
+class StatsSerializer(serializers.Serializer):
+    """Serializer for the task counts of a user, in total and per list."""
+    total = TaskStatsSerializer()
+    todo_lists = TodoListStatsSerializer(many=True)
+
+
+class TaskQuerySerializer(serializers.Serializer):
+    """Serializer for the filter and ordering query parameters of tasks."""
+    orderings = ['deadline', 'created_at', 'name', 'position']
+
+    completed = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        default=None,
+    )
+    overdue = serializers.BooleanField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text='Open tasks whose deadline has passed.',
+    )
+    deadline_after = serializers.DateTimeField(
+        required=False,
+        help_text='Tasks due at or after this time.',
+    )
+    deadline_before = serializers.DateTimeField(
+        required=False,
+        help_text='Tasks due before this time.',
+    )
+    created_since = serializers.DateTimeField(required=False)
+    updated_since = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(
+        choices=orderings + [f'-{name}' for name in orderings],
+        required=False,
+        help_text='Sort by this field, descending with a leading "-"; '
+                  'newest first unless given.',
+    )
+
+    def get_ordering(self):
+        """Return the ordering of the tasks, ending with id for ties."""
+        ordering = self.validated_data.get('ordering')
+        if ordering is None:
+            return ('-id',)
+        return (ordering, '-id' if ordering.startswith('-') else 'id')
+
+    def is_time_dependent(self):
+        """Return whether the selected tasks change with the clock alone."""
+        return self.validated_data['overdue'] is not None
+
+    def filter_queryset(self, queryset, now):
+        """Narrow queryset down to the tasks matching the filters at now."""
+        data = self.validated_data
+        if data['completed'] is not None:
+            queryset = queryset.filter(completed=data['completed'])
+        if data['overdue'] is not None:
+            overdue = Q(completed=False, deadline__lt=now)
+            if not data['overdue']:
+                overdue = ~overdue
+            queryset = queryset.filter(overdue)
+        lookups = {
+            'deadline_after': 'deadline__gte',
+            'deadline_before': 'deadline__lt',
+            'created_since': 'created_at__gte',
+            'updated_since': 'updated_at__gte',
+        }
+        return queryset.filter(**{
+            lookup: data[name]
+            for name, lookup in lookups.items()
+            if name in data
+        })
+
+
+class TaskSearchQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of a task search."""
+    q = serializers.CharField(
+        max_length=255,
+        help_text='Words to find in the task names and contents.',
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text='Number of results (at most 100).',
+    )
+
+
+class TaskChangeSerializer(TaskSerializer):
+    """Serializer for a task outside of its todo list."""
+    todo_list = serializers.IntegerField(source='todo_list_id', read_only=True)
+
+    class Meta(TaskSerializer.Meta):
+        fields = ['id', 'todo_list', 'name', 'content', 'completed',
+                  'deadline', 'position', 'created_at', 'updated_at']
+
+
+class TaskSearchResultSerializer(TaskChangeSerializer):
+    """Serializer for a task found by a search."""
+    rank = serializers.FloatField(
+        read_only=True,
+        help_text='Relevance of the task, higher is better.',
+    )
+
+    class Meta(TaskChangeSerializer.Meta):
+        fields = TaskChangeSerializer.Meta.fields + ['rank']
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """Serializer for a deleted todo list or task."""
+    type = serializers.CharField(source='kind', read_only=True)
+    id = serializers.IntegerField(source='object_id', read_only=True)
+
+    class Meta:
+        model = Tombstone
+        fields = ['type', 'id']
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of the sync feed."""
+    since = serializers.CharField(
+        required=False,
+        help_text='`next` token of the previous response; '
+                  'omit it for a full sync.',
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=1000,
+        default=500,
+        help_text='Number of changes per response (at most 1000).',
+    )
+
+
+class SyncSerializer(serializers.Serializer):
+    """Serializer for a page of the sync feed."""
+    todo_lists = TodoListSerializer(many=True)
+    tasks = TaskChangeSerializer(many=True)
+    deleted = TombstoneSerializer(many=True)
+    next = serializers.CharField(
+        help_text='Token to pass as `since` to get the following changes.',
+    )
+    has_more = serializers.BooleanField(
+        help_text='Whether to sync again right away for more changes.',
+    )
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Serializer for the query parameters of an export."""
+    since = serializers.DateTimeField(required=False)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path rendering `.values()` rows like a ModelSerializer.
+
+    The fields of `serializer_class` are inspected once and turned into
+    plain converters, so serializing a row is a simple loop instead of a
+    trip through DRF's per-field machinery. Nested serializers are skipped
+    and left for the caller to fill in. `names` narrows the fields down to
+    a sparse fieldset, which also narrows the columns read.
+    """
+
+    def __init__(self, serializer_class, names=None):
+        self.serializer_class = serializer_class
+        self.names = names
+        self.selections = {}
+
+    @cached_property
+    def field_names(self):
+        """Return the names of every field, nested ones included."""
+        return [
+            name for name in self.serializer_class().fields
+            if self.names is None or name in self.names
+        ]
+
+    @cached_property
+    def fields(self):
+        """Return (name, source, field) of the plain fields."""
+        return [
+            (name, field.source, field)
+            for name, field in self.serializer_class().fields.items()
+            if not isinstance(field, serializers.BaseSerializer)
+            and (self.names is None or name in self.names)
+        ]
+
+    @property
+    def value_names(self):
+        """Return the names to pass to `.values()`."""
+        return [source for name, source, field in self.fields]
+
+    def values(self, queryset, *names):
+        """Return the rows of queryset with the fields and names read."""
+        return queryset.values(*dict.fromkeys([*self.value_names, *names]))
+
+    def select(self, names=None):
+        """Return the serializer of the fields in names, all if None."""
+        if names is None:
+            return self
+        key = frozenset(names)
+        selected = self.selections.get(key)
+        if selected is None:
+            selected = ValuesSerializer(self.serializer_class, key)
+            self.selections[key] = selected
+        return selected
+
+    def get_converter(self, field):
+        """Return a function converting a non-null value, or None."""
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(
+                field, 'format', api_settings.DATETIME_FORMAT
+            )
+            if hasattr(field, 'timezone'):
+                field_timezone = field.timezone
+            else:
+                field_timezone = field.default_timezone()
+            if output_format is None or output_format.lower() != ISO_8601 \
+                    or field_timezone is None:
+                return field.to_representation
+
+            def convert_datetime(value):
+                value = value.astimezone(field_timezone).isoformat()
+                if value.endswith('+00:00'):
+                    value = value[:-6] + 'Z'
+                return value
+            return convert_datetime
+
+        # Database values of these fields already have the output type.
+        if type(field) in (
+            serializers.BooleanField,
+            serializers.CharField,
+            serializers.IntegerField,
+        ):
+            return None
+        return field.to_representation
+
+    def many(self, rows):
+        """Return the representation of every row."""
+        fields = [
+            (name, source, self.get_converter(field))
+            for name, source, field in self.fields
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, source, convert in fields:
+                value = row[source]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+    def one(self, row):
+        """Return the representation of a single row."""
+        return self.many([row])[0]
+
+
+task_values_serializer = ValuesSerializer(TaskSerializer)
+task_search_values_serializer = ValuesSerializer(TaskSearchResultSerializer)
+task_change_values_serializer = ValuesSerializer(TaskChangeSerializer)
+tombstone_values_serializer = ValuesSerializer(TombstoneSerializer)
+todo_list_values_serializer = ValuesSerializer(TodoListSerializer)
+todo_list_detail_values_serializer = ValuesSerializer(TodoListDetailSerializer)
@@ -0,0 +1,28 @@
+"""
+Signal handlers keeping the todo response cache current
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.cache import get_response_cache, todo_list_scope, user_scope
+
+
+@receiver(post_save, sender=TodoList)
+@receiver(post_delete, sender=TodoList)
+def todo_list_changed(sender, instance, **kwargs):
+    """Invalidate the list itself and its owner's collection."""
+    get_response_cache().bump(
+        user_scope(instance.user_id),
+        todo_list_scope(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    """Invalidate the todo list holding the task."""
+    get_response_cache().bump(todo_list_scope(instance.todo_list_id))
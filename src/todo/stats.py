@@ -0,0 +1,45 @@
+"""
+Task statistics of a user's todo lists
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Q
+
+from core.models import TodoList
+
+
+STAT_NAMES = ('open', 'completed', 'overdue', 'due_soon')
+
+DUE_SOON = timedelta(hours=24)
+
+# Overdue and due soon tasks change with the clock alone, so cached stats
+# are kept only this many seconds even without a task change.
+STATS_CACHE_TIMEOUT = 60
+
+
+def get_task_stats(user, now):
+    """
+    Return the task counts of every todo list of user and their total.
+
+    The counts come from one grouped LEFT JOIN with conditional counts, so
+    lists without tasks are included and no task is loaded.
+    """
+    open_tasks = Q(task__completed=False)
+    rows = TodoList.objects.filter(user=user).annotate(
+        open=Count('task', filter=open_tasks),
+        completed=Count('task', filter=Q(task__completed=True)),
+        overdue=Count('task', filter=open_tasks & Q(task__deadline__lt=now)),
+        due_soon=Count(
+            'task',
+            filter=open_tasks & Q(
+                task__deadline__gte=now,
+                task__deadline__lt=now + DUE_SOON,
+            ),
+        ),
+    ).order_by('-id').values('id', 'label', *STAT_NAMES)
+
+    todo_lists = list(rows)
+    total = {
+        name: sum(row[name] for row in todo_lists) for name in STAT_NAMES
+    }
+    return {'total': total, 'todo_lists': todo_lists}
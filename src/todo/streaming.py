@@ -0,0 +1,77 @@
+"""
+Streaming JSON responses for the todo API
+"""
+from django.http import StreamingHttpResponse
+
+from rest_framework.renderers import JSONRenderer
+
+
+STREAM_CHUNK_SIZE = 2000
+
+
+def is_stream_requested(request):
+    """Return whether the client asked for a streamed response."""
+    return request.query_params.get('stream', '').lower() in ('1', 'true')
+
+
+def iter_json_array(rows, values_serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a JSON array of the serialized rows piece by piece.
+
+    Rows are read from the queryset with `.iterator()` (a server-side
+    cursor on PostgreSQL) and rendered a chunk at a time, so memory stays
+    bounded however many rows there are. The bytes are the same as
+    rendering the whole list at once with JSONRenderer.
+    """
+    renderer = JSONRenderer()
+    rows = rows.iterator(chunk_size=chunk_size)
+    yield b'['
+    separator = b''
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield separator + renderer.render(
+                values_serializer.many(chunk)
+            )[1:-1]
+            separator = b','
+            chunk = []
+    if chunk:
+        yield separator + renderer.render(values_serializer.many(chunk))[1:-1]
+    yield b']'
+
+
+async def aiter_json_array(rows, values_serializer,
+                           chunk_size=STREAM_CHUNK_SIZE):
+    """Async version of `iter_json_array`, reading with `.aiterator()`."""
+    renderer = JSONRenderer()
+    yield b'['
+    separator = b''
+    chunk = []
+    async for row in rows.aiterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield separator + renderer.render(
+                values_serializer.many(chunk)
+            )[1:-1]
+            separator = b','
+            chunk = []
+    if chunk:
+        yield separator + renderer.render(values_serializer.many(chunk))[1:-1]
+    yield b']'
+
+
+def stream_json_array(rows, values_serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """Return a streaming response of the serialized rows."""
+    return StreamingHttpResponse(
+        iter_json_array(rows, values_serializer, chunk_size),
+        content_type='application/json',
+    )
+
+
+def astream_json_array(rows, values_serializer, chunk_size=STREAM_CHUNK_SIZE):
+    """Return a streaming response of the rows for async views."""
+    return StreamingHttpResponse(
+        aiter_json_array(rows, values_serializer, chunk_size),
+        content_type='application/json',
+    )
@@ -0,0 +1,166 @@
+"""
+Delta sync feed of a user's todo lists and tasks
+"""
+import heapq
+import re
+
+from django.db import router
+from django.db.models import Q
+
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from core.models import (
+    ChangeCounter,
+    TodoList,
+    Task,
+    Tombstone,
+)
+
+from todo.pagination import after_position
+from todo.serializers import (
+    task_change_values_serializer,
+    todo_list_values_serializer,
+    tombstone_values_serializer,
+)
+
+
+# A token is the change number the client is complete up to, or, in the
+# middle of a sync, the `<seq>.<source>.<id>.<floor>` position of the last
+# change sent, `floor` being what the client was complete up to before.
+SYNC_TOKEN_RE = re.compile(r'(\d+)(?:\.(\d+)\.(\d+)\.(\d+))?')
+
+SYNC_ORDERING = ('change_seq', 'id')
+
+
+class SyncTokenExpired(APIException):
+    """The tombstones a sync token needs have been purged."""
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Sync token expired, sync again without `since`.'
+    default_code = 'sync_token_expired'
+
+
+def get_sources(user):
+    """Return (key, queryset, values serializer) of every change source."""
+    return [
+        (
+            'todo_lists',
+            TodoList.objects.filter(user=user),
+            todo_list_values_serializer,
+        ),
+        (
+            'tasks',
+            Task.objects.filter(
+                todo_list__user=user,
+                todo_list__deleted_at=None,
+            ),
+            task_change_values_serializer,
+        ),
+        (
+            'deleted',
+            Tombstone.objects.filter(user=user),
+            tombstone_values_serializer,
+        ),
+    ]
+
+
+def parse_token(token, source_count):
+    """Return the (seq, source, id) position and floor of token."""
+    match = SYNC_TOKEN_RE.fullmatch(token)
+    if match is None or (match[2] and int(match[2]) >= source_count):
+        raise serializers.ValidationError({'since': ['Invalid sync token.']})
+    seq = int(match[1])
+    if not match[2]:
+        # Complete up to seq: every source is past it.
+        return (seq, source_count, 0), seq
+    return (seq, int(match[2]), int(match[3])), int(match[4])
+
+
+def format_token(position, floor):
+    """Return the token of a sync stopped at position."""
+    return '.'.join(str(value) for value in (*position, floor))
+
+
+def after(index, position):
+    """Return the condition selecting the changes of source after position."""
+    seq, source, pk = position
+    if index < source:
+        return Q(change_seq__gt=seq)
+    if index > source:
+        return Q(change_seq__gte=seq)
+    return after_position(SYNC_ORDERING, (seq, pk))
+
+
+def get_changes(user, since, limit):
+    """
+    Return the changes of user after the token since, oldest first.
+
+    Every source is read in (change_seq, id) order, at most limit + 1 rows
+    each, and merged on (change_seq, source, id). Lists and tombstones are
+    read along their (user, change_seq) index; tasks have no owner column,
+    so the ones of each list are found along its (todo_list, change_seq)
+    index and then sorted, see todo.benchmarks.bench_sync. Changes
+    numbered above the counter read first are left for the next sync, as
+    their transaction may be committed in one source but not yet read in
+    another. A full sync skips tombstones; a client whose tombstones were
+    purged since its token has to fall back to one.
+
+    That only holds if every query sees the commits the counter has seen,
+    so the counter and the sources are all read from the one database
+    chosen for the counter, never from replicas lagging differently.
+    """
+    db = router.db_for_read(ChangeCounter)
+    sources = [
+        (key, queryset.using(db), serializer)
+        for key, queryset, serializer in get_sources(user)
+    ]
+    value, purged_seq = ChangeCounter.objects.using(db).filter(
+        user=user,
+    ).values_list('value', 'purged_seq').first() or (0, 0)
+
+    if since is None:
+        position, floor = None, value
+    else:
+        position, floor = parse_token(since, len(sources))
+        if floor < purged_seq:
+            raise SyncTokenExpired()
+    if position is not None and position[0] >= value and \
+            position[1] == len(sources):
+        return {
+            **{key: [] for key, _, _ in sources},
+            'next': since,
+            'has_more': False,
+        }
+
+    changes = []
+    for index, (key, queryset, serializer) in enumerate(sources):
+        queryset = queryset.filter(change_seq__lte=value)
+        if key == 'deleted':
+            if floor >= value:
+                continue
+            # Deletions before the client's floor are of rows it never got.
+            queryset = queryset.filter(change_seq__gt=floor)
+        if position is not None:
+            queryset = queryset.filter(after(index, position))
+        rows = queryset.order_by(*SYNC_ORDERING).values(
+            *{*serializer.value_names, *SYNC_ORDERING}
+        )[:limit + 1]
+        changes.append([
+            ((row['change_seq'], index, row['id']), row) for row in rows
+        ])
+
+    page = list(heapq.merge(*changes, key=lambda change: change[0]))
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    data = {key: [] for key, _, _ in sources}
+    for (_, index, _), row in page:
+        data[sources[index][0]].append(row)
+    for key, _, serializer in sources:
+        data[key] = serializer.many(data[key])
+    data['has_more'] = has_more
+    if has_more:
+        data['next'] = format_token(page[-1][0], floor)
+    else:
+        data['next'] = str(max(value, position[0] if position else 0))
+    return data
@@ -0,0 +1,11 @@
+"""
+URL configuration serving the todo and user APIs with the async views
+"""
+from django.urls import path, include
+
+
+urlpatterns = [
+    path('api/', include('core.urls')),
+    path('api/users/', include('user.async_urls')),
+    path('api/todo_lists/', include('todo.async_urls')),
+]
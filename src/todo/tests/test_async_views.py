@@ -0,0 +1,473 @@
+"""
+Test the async views of the todo API
+"""
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+from core.authentication import get_token_cache
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.cache import get_response_cache
+from todo.serializers import (
+    TaskSerializer,
+    TodoListSerializer,
+    TodoListDetailSerializer,
+)
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+
+
+def detail_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def read_json(res):
+    """Return the decoded JSON body of res."""
+    if res.streaming:
+        return json.loads(b''.join(res.streaming_content))
+    return json.loads(res.content)
+
+
+def render(data):
+    """Return data as it is rendered to JSON."""
+    return json.loads(json.dumps(data, default=str))
+
+
+@override_settings(ROOT_URLCONF='todo.tests.async_urls')
+class AsyncViewsTests(TestCase):
+    """Test the todo endpoints served by async views."""
+
+    def setUp(self):
+        cache.clear()
+        get_response_cache().clear_stats()
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        token = Token.objects.create(user=self.user)
+        self.headers = {'Authorization': f'Token {token.key}'}
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.tasks = Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}')
+            for i in range(3)
+        )
+
+    async def test_auth_required(self):
+        """Test requests without a token are rejected."""
+        res = await self.async_client.get(TODO_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    async def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected."""
+        res = await self.async_client.get(
+            TODO_LIST_URL,
+            headers={'Authorization': 'Token invalid'},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(read_json(res), {'detail': 'Invalid token.'})
+
+    async def test_token_cached(self):
+        """Test the token lookup is cached across requests."""
+        await self.async_client.get(TODO_LIST_URL, headers=self.headers)
+        await self.async_client.get(TODO_LIST_URL, headers=self.headers)
+
+        stats = get_token_cache().stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    async def test_retrieve_todo_lists(self):
+        """Test listing todo lists of the user."""
+        other_user = await get_user_model().objects.acreate(
+            email='other@example.com',
+        )
+        await TodoList.objects.acreate(user=other_user, label='Other')
+
+        res = await self.async_client.get(TODO_LIST_URL, headers=self.headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(read_json(res), {
+            'next': None,
+            'previous': None,
+            'results': [render(TodoListSerializer(self.todo_list).data)],
+        })
+        self.assertIn('ETag', res)
+
+    async def test_not_modified(self):
+        """Test a matching ETag gives a 304."""
+        res = await self.async_client.get(TODO_LIST_URL, headers=self.headers)
+
+        res = await self.async_client.get(
+            TODO_LIST_URL,
+            headers={**self.headers, 'If-None-Match': res['ETag']},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_todo_lists_served_from_cache(self):
+        """Test a repeated collection read is served from the cache."""
+        res = await self.async_client.get(TODO_LIST_URL, headers=self.headers)
+
+        again = await self.async_client.get(
+            TODO_LIST_URL,
+            headers=self.headers,
+        )
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.content, res.content)
+        self.assertEqual(again['ETag'], res['ETag'])
+        self.assertEqual(get_response_cache().stats()['hits'], 1)
+
+    async def test_cached_response_not_modified(self):
+        """Test revalidating against a cached detail gives a 304."""
+        url = detail_url(self.todo_list.id)
+        res = await self.async_client.get(url, headers=self.headers)
+
+        again = await self.async_client.get(
+            url,
+            headers={**self.headers, 'If-None-Match': res['ETag']},
+        )
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(get_response_cache().stats()['hits'], 1)
+
+    async def test_update_invalidates_cached_detail(self):
+        """Test an async update drops the cached list detail."""
+        url = detail_url(self.todo_list.id)
+        await self.async_client.get(url, headers=self.headers)
+
+        await self.async_client.put(
+            url,
+            {'label': 'Changed'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        res = await self.async_client.get(url, headers=self.headers)
+
+        self.assertEqual(read_json(res)['label'], 'Changed')
+        self.assertEqual(get_response_cache().stats()['hits'], 0)
+
+    async def test_stream_not_cached(self):
+        """Test streamed collections bypass the cache."""
+        await self.async_client.get(
+            TODO_LIST_URL,
+            {'stream': 'true'},
+            headers=self.headers,
+        )
+
+        res = await self.async_client.get(
+            TODO_LIST_URL,
+            {'stream': 'true'},
+            headers=self.headers,
+        )
+
+        self.assertTrue(res.streaming)
+        content = b''.join([part async for part in res.streaming_content])
+        self.assertEqual(len(json.loads(content)), 1)
+        self.assertIn('ETag', res)
+        self.assertEqual(get_response_cache().stats()['hits'], 0)
+
+    async def test_create_todo_list(self):
+        """Test creating a todo list."""
+        res = await self.async_client.post(
+            TODO_LIST_URL,
+            {'label': 'New'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        todo_list = await TodoList.objects.aget(id=read_json(res)['id'])
+        self.assertEqual(todo_list.label, 'New')
+        self.assertEqual(todo_list.user_id, self.user.id)
+
+    async def test_create_todo_list_invalid(self):
+        """Test invalid payloads give the serializer errors."""
+        res = await self.async_client.post(
+            TODO_LIST_URL,
+            {'label': ''},
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('label', read_json(res))
+
+    async def test_malformed_json(self):
+        """Test a body that is not JSON is rejected."""
+        res = await self.async_client.post(
+            TODO_LIST_URL,
+            '{',
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_todo_list_detail(self):
+        """Test the detail includes the tasks, newest first."""
+        res = await self.async_client.get(
+            detail_url(self.todo_list.id),
+            headers=self.headers,
+        )
+
+        todo_list = await TodoList.objects.prefetch_related(
+            'task_set',
+        ).aget(id=self.todo_list.id)
+        expected = render(TodoListDetailSerializer(todo_list).data)
+        expected['tasks'].sort(key=lambda task: -task['id'])
+        for task in expected['tasks']:
+            del task['content']
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(read_json(res), expected)
+
+    async def test_todo_list_of_other_user_not_found(self):
+        """Test lists of other users are not found."""
+        other_user = await get_user_model().objects.acreate(
+            email='other@example.com',
+        )
+        todo_list = await TodoList.objects.acreate(
+            user=other_user,
+            label='Other',
+        )
+
+        res = await self.async_client.get(
+            detail_url(todo_list.id),
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(read_json(res), {'detail': 'Not found.'})
+
+    async def test_update_todo_list(self):
+        """Test updating a todo list."""
+        res = await self.async_client.put(
+            detail_url(self.todo_list.id),
+            {'label': 'Changed'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(read_json(res)['label'], 'Changed')
+        self.assertEqual(len(read_json(res)['tasks']), 3)
+        await self.todo_list.arefresh_from_db()
+        self.assertEqual(self.todo_list.label, 'Changed')
+
+    async def test_delete_todo_list(self):
+        """Test deleting a todo list."""
+        res = await self.async_client.delete(
+            detail_url(self.todo_list.id),
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            await TodoList.objects.filter(id=self.todo_list.id).aexists()
+        )
+
+    async def test_retrieve_tasks_paginated(self):
+        """Test tasks are paginated by cursor like the sync views."""
+        res = await self.async_client.get(
+            tasks_url(self.todo_list.id),
+            {'limit': 2},
+            headers=self.headers,
+        )
+
+        data = read_json(res)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task['name'] for task in data['results']],
+            ['Task 2', 'Task 1'],
+        )
+        self.assertIsNotNone(data['next'])
+
+        res = await self.async_client.get(data['next'], headers=self.headers)
+
+        data = read_json(res)
+        self.assertEqual(
+            [task['name'] for task in data['results']],
+            ['Task 0'],
+        )
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    async def test_filter_and_order_tasks(self):
+        """Test tasks are filtered and ordered like the sync views."""
+        await Task.objects.filter(id=self.tasks[0].id).aupdate(completed=True)
+
+        res = await self.async_client.get(
+            tasks_url(self.todo_list.id),
+            {'completed': 'false', 'ordering': 'name', 'limit': 1},
+            headers=self.headers,
+        )
+
+        data = read_json(res)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(data['results'][0]['name'], 'Task 1')
+
+        res = await self.async_client.get(data['next'], headers=self.headers)
+
+        data = read_json(res)
+        self.assertEqual(data['results'][0]['name'], 'Task 2')
+        self.assertIsNone(data['next'])
+
+    async def test_invalid_task_filter(self):
+        """Test an invalid filter gives 400."""
+        res = await self.async_client.get(
+            tasks_url(self.todo_list.id),
+            {'ordering': 'content'},
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', read_json(res))
+
+    async def test_sparse_fieldsets(self):
+        """Test fields are selected like the sync views."""
+        res = await self.async_client.get(
+            tasks_url(self.todo_list.id),
+            {'fields': 'name', 'ordering': 'name', 'limit': 2},
+            headers=self.headers,
+        )
+
+        data = read_json(res)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            data['results'],
+            [{'name': 'Task 0'}, {'name': 'Task 1'}],
+        )
+
+        res = await self.async_client.get(data['next'], headers=self.headers)
+
+        self.assertEqual(read_json(res)['results'], [{'name': 'Task 2'}])
+
+        res = await self.async_client.get(
+            detail_url(self.todo_list.id),
+            {'fields': 'label,tasks', 'task_fields': 'id,content'},
+            headers=self.headers,
+        )
+
+        self.assertEqual(read_json(res), {
+            'label': 'List',
+            'tasks': [
+                {'id': task.id, 'content': None}
+                for task in reversed(self.tasks)
+            ],
+        })
+
+    async def test_stream_tasks(self):
+        """Test streaming every task as one array."""
+        res = await self.async_client.get(
+            tasks_url(self.todo_list.id),
+            {'stream': 'true'},
+            headers=self.headers,
+        )
+
+        tasks = [task async for task in Task.objects.order_by('-id')]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(
+            b''.join([part async for part in res.streaming_content]),
+            json.dumps(
+                [
+                    {
+                        name: value for name, value in task.items()
+                        if name != 'content'
+                    }
+                    for task in render(TaskSerializer(tasks, many=True).data)
+                ],
+                separators=(',', ':'),
+            ).encode(),
+        )
+
+    async def test_create_tasks(self):
+        """Test creating many tasks touches the list once."""
+        updated_at = self.todo_list.updated_at
+
+        res = await self.async_client.post(
+            tasks_url(self.todo_list.id),
+            [{'name': 'New 1'}, {'name': 'New 2'}],
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(read_json(res)), 2)
+        self.assertEqual(
+            await Task.objects.filter(todo_list=self.todo_list).acount(),
+            5,
+        )
+        await self.todo_list.arefresh_from_db()
+        self.assertGreater(self.todo_list.updated_at, updated_at)
+
+    async def test_bulk_update_and_delete_tasks(self):
+        """Test changing the selected tasks in one request each."""
+        ids = [self.tasks[0].id, self.tasks[1].id]
+
+        res = await self.async_client.patch(
+            tasks_url(self.todo_list.id),
+            {'ids': ids, 'completed': True},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        self.assertEqual(read_json(res), {'count': 2})
+
+        res = await self.async_client.delete(
+            tasks_url(self.todo_list.id),
+            {'filter': {'completed': True}},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        self.assertEqual(read_json(res), {'count': 2})
+        self.assertEqual(
+            [task.name async for task in Task.objects.all()],
+            ['Task 2'],
+        )
+
+    async def test_task_detail(self):
+        """Test retrieving, updating and deleting a task."""
+        task = self.tasks[0]
+        url = task_url(self.todo_list.id, task.id)
+
+        res = await self.async_client.get(url, headers=self.headers)
+        await task.arefresh_from_db()
+        self.assertEqual(read_json(res), render(TaskSerializer(task).data))
+
+        res = await self.async_client.put(
+            url,
+            {'name': 'Changed', 'completed': True},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(read_json(res)['name'], 'Changed')
+
+        res = await self.async_client.delete(url, headers=self.headers)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Task.objects.filter(id=task.id).aexists())
@@ -0,0 +1,174 @@
+"""
+Test conditional GET requests to the todo API
+"""
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+
+
+def detail_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+@override_settings(TODO_RESPONSE_CACHE={'TIMEOUT': 0})
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling without the response cache."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.task = Task.objects.create(todo_list=self.todo_list, name='Task')
+
+    def revalidate(self, url, res):
+        """GET url again sending the ETag of res."""
+        return self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+    def test_todo_lists_not_modified(self):
+        """Test an unchanged todo list collection gives 304."""
+        res = self.client.get(TODO_LIST_URL)
+
+        with self.assertNumQueries(1):
+            again = self.revalidate(TODO_LIST_URL, res)
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again['ETag'], res['ETag'])
+        self.assertNotIn('Last-Modified', res)
+        self.assertIn('Authorization', res['Vary'])
+
+    def test_todo_lists_modified_by_create_and_delete(self):
+        """Test adding or removing a todo list changes the ETag."""
+        res = self.client.get(TODO_LIST_URL)
+        other = TodoList.objects.create(user=self.user, label='Other')
+
+        created = self.revalidate(TODO_LIST_URL, res)
+        other.delete()
+        deleted = self.revalidate(TODO_LIST_URL, created)
+
+        self.assertEqual(created.status_code, status.HTTP_200_OK)
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+
+    def test_pages_have_different_etags(self):
+        """Test every page of a collection has its own ETag."""
+        TodoList.objects.create(user=self.user, label='Other')
+        first = self.client.get(TODO_LIST_URL, {'limit': 1})
+        second = self.client.get(first.data['next'])
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_todo_list_detail_not_modified(self):
+        """Test an unchanged todo list gives 304 without loading tasks."""
+        url = detail_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        with self.assertNumQueries(1):
+            again = self.revalidate(url, res)
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_todo_list_detail_if_modified_since(self):
+        """Test If-Modified-Since is compared with updated_at."""
+        url = detail_url(self.todo_list.id)
+        updated_at = self.todo_list.updated_at
+
+        current = self.client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=http_date(updated_at.timestamp()),
+        )
+        stale = self.client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=http_date(
+                (updated_at - timedelta(seconds=10)).timestamp()
+            ),
+        )
+
+        self.assertEqual(current.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(stale.status_code, status.HTTP_200_OK)
+
+    def test_todo_list_detail_modified_by_task_change(self):
+        """Test changing a task through the API changes the list ETag."""
+        url = detail_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        self.client.put(
+            task_url(self.todo_list.id, self.task.id),
+            {'name': 'Renamed'},
+        )
+        again = self.revalidate(url, res)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['tasks'][0]['name'], 'Renamed')
+
+    def test_tasks_not_modified(self):
+        """Test an unchanged task list gives 304."""
+        url = tasks_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        again = self.revalidate(url, res)
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Last-Modified', res)
+
+    def test_tasks_modified_by_task_changes(self):
+        """Test creating and deleting tasks changes the tasks ETag."""
+        url = tasks_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        self.client.post(url, {'name': 'New'})
+        created = self.revalidate(url, res)
+        self.client.delete(task_url(self.todo_list.id, self.task.id))
+        deleted = self.revalidate(url, created)
+
+        self.assertEqual(created.status_code, status.HTTP_200_OK)
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+
+    def test_task_writes_touch_todo_list(self):
+        """Test task create, update and delete bump the list updated_at."""
+        requests = [
+            lambda: self.client.post(
+                tasks_url(self.todo_list.id),
+                {'name': 'New'},
+            ),
+            lambda: self.client.patch(
+                tasks_url(self.todo_list.id),
+                {'ids': [self.task.id], 'completed': True},
+                format='json',
+            ),
+            lambda: self.client.delete(
+                task_url(self.todo_list.id, self.task.id)
+            ),
+        ]
+        for request in requests:
+            before = TodoList.objects.get(id=self.todo_list.id).updated_at
+            request()
+            after = TodoList.objects.get(id=self.todo_list.id).updated_at
+            self.assertGreater(after, before)
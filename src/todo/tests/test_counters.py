@@ -0,0 +1,132 @@
+"""
+Test the task counters of todo lists
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+class TaskCounterTests(TestCase):
+    """Test the counters follow every change of the tasks."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.url = tasks_url(self.todo_list.id)
+        self.client.post(self.url, [
+            {'name': 'Open 1'},
+            {'name': 'Open 2'},
+            {'name': 'Done', 'completed': True},
+        ], format='json')
+
+    def assertCounters(self, tasks, completed):
+        """Assert the counters of the list match the tasks."""
+        self.todo_list.refresh_from_db()
+        self.assertEqual(
+            (self.todo_list.task_count, self.todo_list.completed_count),
+            (tasks, completed),
+        )
+        actual = Task.objects.filter(todo_list=self.todo_list)
+        self.assertEqual(
+            (actual.count(), actual.filter(completed=True).count()),
+            (tasks, completed),
+        )
+
+    def test_create_tasks(self):
+        """Test creating tasks counts them."""
+        self.assertCounters(3, 1)
+
+        self.client.post(self.url, {'name': 'Done', 'completed': True})
+
+        self.assertCounters(4, 2)
+
+    def test_update_task(self):
+        """Test completing and reopening a task."""
+        task = Task.objects.get(name='Open 1')
+        url = task_url(self.todo_list.id, task.id)
+
+        self.client.put(url, {'name': 'Open 1', 'completed': True})
+        self.assertCounters(3, 2)
+
+        self.client.put(url, {'name': 'Open 1', 'completed': True})
+        self.assertCounters(3, 2)
+
+        self.client.put(url, {'name': 'Open 1', 'completed': False})
+        self.assertCounters(3, 1)
+
+    def test_delete_task(self):
+        """Test deleting a completed task."""
+        task = Task.objects.get(name='Done')
+
+        self.client.delete(task_url(self.todo_list.id, task.id))
+
+        self.assertCounters(2, 0)
+
+    def test_bulk_update(self):
+        """Test completing tasks in bulk counts only the changed ones."""
+        res = self.client.patch(
+            self.url,
+            {'filter': {}, 'completed': True},
+            format='json',
+        )
+
+        self.assertEqual(res.data, {'count': 3})
+        self.assertCounters(3, 3)
+
+        self.client.patch(
+            self.url,
+            {'ids': [Task.objects.get(name='Done').id], 'completed': False},
+            format='json',
+        )
+        self.assertCounters(3, 2)
+
+    def test_bulk_delete(self):
+        """Test deleting tasks in bulk."""
+        ids = list(Task.objects.filter(
+            name__in=['Open 1', 'Done'],
+        ).values_list('id', flat=True))
+
+        self.client.delete(self.url, {'ids': ids}, format='json')
+
+        self.assertCounters(1, 0)
+
+    def test_counters_in_todo_list(self):
+        """Test the counters are part of the todo list representation."""
+        res = self.client.get(reverse('todo:todo-lists'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['task_count'], 3)
+        self.assertEqual(res.data['results'][0]['completed_count'], 1)
+
+    def test_update_todo_list_keeps_counters(self):
+        """Test saving a stale list instance does not reset the counters."""
+        res = self.client.put(
+            reverse('todo:todo-list-detail', args=[self.todo_list.id]),
+            {'label': 'Changed', 'task_count': 0},
+        )
+
+        self.assertEqual(res.data['task_count'], 3)
+        self.assertCounters(3, 1)
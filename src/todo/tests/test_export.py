@@ -0,0 +1,191 @@
+"""
+Test the export of todo lists and tasks
+"""
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.export import CSV_HEADER, get_export_rows, iter_export
+from todo.renderers import NDJSONRenderer
+from todo.serializers import TaskSerializer, TodoListSerializer
+
+
+EXPORT_URL = reverse('todo:export')
+
+
+def read_ndjson(res):
+    """Return the records of a streamed NDJSON response."""
+    content = b''.join(res.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+def read_csv(res):
+    """Return the rows of a streamed CSV response."""
+    content = b''.join(res.streaming_content).decode()
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def render(data):
+    """Return data as it is rendered to JSON."""
+    return json.loads(JSONRenderer().render(data))
+
+
+class ExportAPITests(TestCase):
+    """Test the export endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.empty_list = TodoList.objects.create(
+            user=self.user,
+            label='Empty',
+        )
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}', completed=i == 1)
+            for i in range(3)
+        )
+
+    def test_auth_required(self):
+        """Test auth is required to export."""
+        res = APIClient().get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_ndjson(self):
+        """Test every list is followed by its tasks."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertIn('X-Export-Started-At', res)
+
+        tasks = Task.objects.filter(todo_list=self.todo_list).order_by('id')
+        expected = [
+            {'type': 'todo_list', **render(
+                TodoListSerializer(self.todo_list).data
+            )},
+        ] + [
+            {
+                'type': 'task',
+                **render(TaskSerializer(task).data),
+                'todo_list_id': self.todo_list.id,
+            }
+            for task in tasks
+        ] + [
+            {'type': 'todo_list', **render(
+                TodoListSerializer(self.empty_list).data
+            )},
+        ]
+        self.assertEqual(read_ndjson(res), expected)
+
+    def test_export_csv(self):
+        """Test CSV has one row per task and per empty list."""
+        res = self.client.get(EXPORT_URL, {'format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        rows = read_csv(res)
+        self.assertEqual(list(rows[0]), CSV_HEADER)
+        self.assertEqual(
+            [(row['todo_list_label'], row['task_name']) for row in rows],
+            [
+                ('List', 'Task 0'),
+                ('List', 'Task 1'),
+                ('List', 'Task 2'),
+                ('Empty', ''),
+            ],
+        )
+        self.assertEqual(rows[1]['task_completed'], 'true')
+        self.assertEqual(rows[0]['task_deadline'], '')
+
+    def test_export_limited_to_user(self):
+        """Test lists of other users are not exported."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'password123',
+        )
+        TodoList.objects.create(user=other_user, label='Other')
+
+        res = self.client.get(EXPORT_URL)
+
+        labels = [r['label'] for r in read_ndjson(res) if 'label' in r]
+        self.assertEqual(labels, ['List', 'Empty'])
+
+    def test_export_since(self):
+        """Test `since` only exports what changed from then on."""
+        past = timezone.now() - timedelta(days=1)
+        TodoList.objects.update(updated_at=past)
+        Task.objects.update(updated_at=past)
+        task = Task.objects.filter(todo_list=self.todo_list).first()
+        since = timezone.now() - timedelta(hours=1)
+        task.name = 'Changed'
+        task.save()
+        self.todo_list.touch()
+
+        res = self.client.get(EXPORT_URL, {'since': since.isoformat()})
+
+        records = read_ndjson(res)
+        self.assertEqual(
+            [(r['type'], r['id']) for r in records],
+            [('todo_list', self.todo_list.id), ('task', task.id)],
+        )
+
+    def test_export_invalid_since(self):
+        """Test an invalid `since` is rejected."""
+        res = self.client.get(EXPORT_URL, {'since': 'yesterday'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_single_query(self):
+        """Test the export reads all rows in one query."""
+        res = self.client.get(EXPORT_URL)
+
+        with self.assertNumQueries(1):
+            b''.join(res.streaming_content)
+
+
+class IterExportTests(TestCase):
+    """Test rendering an export in chunks."""
+
+    def test_lists_not_repeated_across_chunks(self):
+        """Test a list spanning several chunks is emitted once."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        todo_list = TodoList.objects.create(user=user, label='List')
+        Task.objects.bulk_create(
+            Task(todo_list=todo_list, name=f'Task {i}') for i in range(5)
+        )
+
+        chunks = list(iter_export(
+            get_export_rows(user),
+            NDJSONRenderer(),
+            chunk_size=2,
+        ))
+
+        lines = b''.join(chunks).splitlines()
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[0])['type'], 'todo_list')
@@ -0,0 +1,199 @@
+"""
+Test the sparse fieldsets of the todo API
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+from todo.serializers import task_values_serializer
+
+
+TODO_LISTS_URL = reverse('todo:todo-lists')
+
+
+def detail_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class FieldsetApiTests(TestCase):
+    """Test selecting the fields of todo API responses."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.tasks = Task.objects.bulk_create(
+            Task(
+                todo_list=self.todo_list,
+                name=f'Task {i}',
+                content=f'Content {i}',
+            )
+            for i in range(3)
+        )
+
+    def get(self, url, **params):
+        """GET url and return the response data and the SQL run."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data, ' '.join(query['sql'] for query in queries)
+
+    def test_task_list_skips_content(self):
+        """Test task contents are neither returned nor read by default."""
+        data, sql = self.get(tasks_url(self.todo_list.id))
+
+        self.assertNotIn('content', data['results'][0])
+        self.assertIn('name', data['results'][0])
+        self.assertNotIn('"content"', sql)
+
+    def test_task_list_fields(self):
+        """Test only the requested fields are returned and read."""
+        data, sql = self.get(
+            tasks_url(self.todo_list.id),
+            fields='name,content',
+        )
+
+        self.assertEqual(data['results'][0], {
+            'name': 'Task 2',
+            'content': 'Content 2',
+        })
+        self.assertNotIn('"deadline"', sql)
+
+    def test_task_list_fields_paginated(self):
+        """Test pages follow on without the ordering fields selected."""
+        data, _ = self.get(
+            tasks_url(self.todo_list.id),
+            fields='completed',
+            ordering='name',
+            limit=2,
+        )
+        names = []
+        while True:
+            self.assertEqual(set(data['results'][0]), {'completed'})
+            names += [task['completed'] for task in data['results']]
+            if data['next'] is None:
+                break
+            data, _ = self.get(data['next'])
+
+        self.assertEqual(len(names), 3)
+
+    def test_invalid_fields(self):
+        """Test unknown or no fields give 400."""
+        for fields in ('name,secret', '', ' , '):
+            res = self.client.get(
+                tasks_url(self.todo_list.id),
+                {'fields': fields},
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('fields', res.data)
+
+    def test_task_detail_fields(self):
+        """Test a task includes its content unless other fields are asked."""
+        url = task_url(self.todo_list.id, self.tasks[0].id)
+
+        data, _ = self.get(url)
+        self.assertEqual(data['content'], 'Content 0')
+
+        data, sql = self.get(url, fields='id,completed')
+        self.assertEqual(data, {'id': self.tasks[0].id, 'completed': False})
+        self.assertNotIn('"content"', sql)
+
+    def test_todo_list_detail_fields(self):
+        """Test the list and task fields of a todo list detail."""
+        data, _ = self.get(detail_url(self.todo_list.id))
+        self.assertNotIn('content', data['tasks'][0])
+
+        data, _ = self.get(
+            detail_url(self.todo_list.id),
+            task_fields='name,content',
+        )
+        self.assertEqual(data['tasks'][0], {
+            'name': 'Task 2',
+            'content': 'Content 2',
+        })
+
+        with self.assertNumQueries(1):
+            data, sql = self.get(
+                detail_url(self.todo_list.id),
+                fields='id,label',
+            )
+        self.assertEqual(data, {'id': self.todo_list.id, 'label': 'List'})
+        self.assertNotIn('"task_count"', sql)
+
+    def test_fieldsets_have_own_etags(self):
+        """Test each fieldset of a todo list detail has its own ETag."""
+        url = detail_url(self.todo_list.id)
+
+        res = self.client.get(url)
+        other = self.client.get(
+            url,
+            {'fields': 'id'},
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertEqual(other.data, {'id': self.todo_list.id})
+
+    def test_todo_lists_fields(self):
+        """Test selecting the fields of todo lists, streamed or not."""
+        data, _ = self.get(TODO_LISTS_URL, fields='label')
+        self.assertEqual(data['results'], [{'label': 'List'}])
+
+        res = self.client.get(TODO_LISTS_URL, {
+            'fields': 'id',
+            'stream': 'true',
+        })
+        self.assertEqual(
+            b''.join(res.streaming_content),
+            f'[{{"id":{self.todo_list.id}}}]'.encode(),
+        )
+
+    def test_search_fields(self):
+        """Test search results skip contents by default."""
+        data, _ = self.get(reverse('todo:search'), q='content')
+        self.assertEqual(len(data['results']), 3)
+        self.assertNotIn('content', data['results'][0])
+        self.assertIn('rank', data['results'][0])
+
+        data, _ = self.get(reverse('todo:search'), q='content', fields='id')
+        self.assertEqual(
+            [task['id'] for task in data['results']],
+            [task.id for task in reversed(self.tasks)],
+        )
+
+    def test_selections_reused(self):
+        """Test selecting the same fields again gives the same serializer."""
+        selected = task_values_serializer.select(['name', 'id'])
+
+        self.assertIs(task_values_serializer.select(['id', 'name']), selected)
+        self.assertEqual(selected.value_names, ['id', 'name'])
+        self.assertIs(task_values_serializer.select(), task_values_serializer)
@@ -0,0 +1,121 @@
+"""
+Test for the cursor pagination of the todo API
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.pagination import TodoCursorPagination
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def create_user(email='test@example.com', password='password123', **params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password, **params)
+
+
+class PaginationAPITests(TestCase):
+    """Test paginated list endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+
+    def collect_ids(self, url):
+        """Follow `next` links from url and return all ids in order."""
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in res.data['results'])
+            url = res.data['next']
+        return ids
+
+    def test_todo_lists_paginated_by_limit(self):
+        """Test walking all todo lists page by page."""
+        todo_lists = TodoList.objects.bulk_create(
+            TodoList(user=self.user, label=f'List {i}') for i in range(7)
+        )
+        expected = sorted((t.id for t in todo_lists), reverse=True)
+
+        res = self.client.get(TODO_LIST_URL, {'limit': 3})
+
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertIsNone(res.data['previous'])
+        self.assertEqual(self.collect_ids(res.data['next']), expected[3:])
+
+    def test_tasks_paginated_by_limit(self):
+        """Test walking all tasks of a todo list page by page."""
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+        tasks = Task.objects.bulk_create(
+            Task(todo_list=todo_list, name=f'Task {i}') for i in range(5)
+        )
+        expected = sorted((t.id for t in tasks), reverse=True)
+
+        ids = self.collect_ids(f'{tasks_url(todo_list.id)}?limit=2')
+
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous link of the second page gives the first page."""
+        TodoList.objects.bulk_create(
+            TodoList(user=self.user, label=f'List {i}') for i in range(4)
+        )
+        first = self.client.get(TODO_LIST_URL, {'limit': 2})
+        second = self.client.get(first.data['next'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+
+    @patch.object(TodoCursorPagination, 'max_page_size', 2)
+    def test_limit_capped_at_max_page_size(self):
+        """Test a limit above the maximum page size is capped."""
+        TodoList.objects.bulk_create(
+            TodoList(user=self.user, label=f'List {i}') for i in range(5)
+        )
+
+        res = self.client.get(TODO_LIST_URL, {'limit': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_invalid_cursor_returns_not_found(self):
+        """Test an invalid cursor gives 404."""
+        res = self.client.get(TODO_LIST_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_no_count_query(self):
+        """Test paging never issues a COUNT(*) query."""
+        todo_list = TodoList.objects.create(user=self.user, label='List')
+        Task.objects.bulk_create(
+            Task(todo_list=todo_list, name=f'Task {i}') for i in range(3)
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(tasks_url(todo_list.id), {'limit': 1})
+
+        for query in ctx.captured_queries:
+            self.assertNotIn('COUNT(*)', query['sql'].upper())
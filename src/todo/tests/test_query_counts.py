@@ -0,0 +1,120 @@
+"""
+Test the number of queries issued by the todo API detail endpoints
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+def todo_list_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+class DetailQueryCountTests(TestCase):
+    """Test detail endpoints run a fixed number of queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.task = Task.objects.create(todo_list=self.todo_list, name='Task')
+        Task.objects.create(todo_list=self.todo_list, name='Other Task')
+
+    def test_get_todo_list(self):
+        """Test todo list detail loads the list and its tasks in 2 queries."""
+        with self.assertNumQueries(2):
+            res = self.client.get(todo_list_url(self.todo_list.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tasks']), 2)
+
+    def test_put_todo_list(self):
+        """Test updating a todo list reuses the prefetched tasks."""
+        # lookup, tasks, change number, update.
+        with self.assertNumQueries(4):
+            res = self.client.put(
+                todo_list_url(self.todo_list.id),
+                {'label': 'Renamed'},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['tasks']), 2)
+
+    def test_delete_todo_list(self):
+        """Test deleting a todo list does not load its tasks."""
+        # lookup, change number, tombstone, hide, then a savepoint pair for
+        # the batch of tasks and one for the list and its remaining tasks.
+        with self.assertNumQueries(11):
+            res = self.client.delete(todo_list_url(self.todo_list.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_get_task(self):
+        """Test task detail checks ownership in the same query."""
+        with self.assertNumQueries(1):
+            res = self.client.get(task_url(self.todo_list.id, self.task.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_put_task(self):
+        """Test updating a task is one lookup and two updates."""
+        # lookup, savepoint, change number, task update, todo list touch,
+        # release.
+        with self.assertNumQueries(6):
+            res = self.client.put(
+                task_url(self.todo_list.id, self.task.id),
+                {'name': 'Renamed'},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_delete_task(self):
+        """Test deleting a task is one lookup, a delete and an update."""
+        # lookup, savepoint, change number, tombstone, task delete,
+        # todo list touch, release.
+        with self.assertNumQueries(7):
+            res = self.client.delete(
+                task_url(self.todo_list.id, self.task.id)
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_task_of_other_user_not_found(self):
+        """Test a task in another user's list gives 404 in one query."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'password123',
+        )
+        other_list = TodoList.objects.create(user=other_user, label='List')
+        task = Task.objects.create(todo_list=other_list, name='Task')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(task_url(other_list.id, task.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_task_in_wrong_list_not_found(self):
+        """Test a task looked up through another list gives 404."""
+        other_list = TodoList.objects.create(user=self.user, label='Other')
+
+        res = self.client.get(task_url(other_list.id, self.task.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,131 @@
+"""
+Test the versioned response cache of the todo API
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.cache import get_response_cache
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+
+
+def detail_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class ResponseCacheTests(TestCase):
+    """Test caching rendered todo list responses."""
+
+    def setUp(self):
+        cache.clear()
+        get_response_cache().clear_stats()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.task = Task.objects.create(todo_list=self.todo_list, name='Task')
+
+    def test_todo_lists_served_from_cache(self):
+        """Test a repeated collection read runs no queries."""
+        res = self.client.get(TODO_LIST_URL)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.content, res.content)
+        self.assertEqual(again['ETag'], res['ETag'])
+        self.assertEqual(get_response_cache().stats()['hits'], 1)
+
+    def test_todo_list_detail_served_from_cache(self):
+        """Test a repeated detail read runs no queries."""
+        url = detail_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(url)
+
+        self.assertEqual(again.content, res.content)
+
+    def test_cached_response_not_modified(self):
+        """Test revalidating against a cached response gives 304."""
+        url = detail_url(self.todo_list.id)
+        res = self.client.get(url)
+
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_task_change_invalidates_detail(self):
+        """Test changing a task drops the cached list detail."""
+        url = detail_url(self.todo_list.id)
+        self.client.get(url)
+
+        self.client.put(
+            task_url(self.todo_list.id, self.task.id),
+            {'name': 'Renamed'},
+        )
+        res = self.client.get(url)
+
+        self.assertEqual(res.data['tasks'][0]['name'], 'Renamed')
+
+    def test_new_todo_list_invalidates_collection(self):
+        """Test creating a todo list drops the cached collection."""
+        self.client.get(TODO_LIST_URL)
+
+        self.client.post(TODO_LIST_URL, {'label': 'New'})
+        res = self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_deleted_todo_list_not_served(self):
+        """Test a deleted todo list is not served from the cache."""
+        url = detail_url(self.todo_list.id)
+        self.client.get(url)
+
+        self.client.delete(url)
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_entries_are_per_user(self):
+        """Test another user never gets a cached list detail."""
+        url = detail_url(self.todo_list.id)
+        self.client.get(url)
+
+        self.client.force_authenticate(user=create_user('other@example.com'))
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(TODO_RESPONSE_CACHE={'MAX_ENTRY_SIZE': 10})
+    def test_oversized_responses_not_cached(self):
+        """Test responses above the size limit are not stored."""
+        self.client.get(TODO_LIST_URL)
+
+        with self.assertNumQueries(2):
+            self.client.get(TODO_LIST_URL)
+
+        self.assertEqual(get_response_cache().stats()['oversized'], 2)
@@ -0,0 +1,188 @@
+"""
+Test the full-text task search of the todo API
+"""
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+SEARCH_URL = reverse('todo:search')
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicTaskSearchApiTests(TestCase):
+    """Test unauthenticated task searches."""
+
+    def test_auth_required(self):
+        """Test auth is required to search tasks."""
+        res = APIClient().get(SEARCH_URL, {'q': 'milk'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTaskSearchApiTests(TestCase):
+    """Test authenticated task searches."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+
+    def search(self, text, **params):
+        """Return the names of the tasks found for text."""
+        res = self.client.get(SEARCH_URL, {'q': text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [task['name'] for task in res.data['results']]
+
+    def test_search_name_and_content(self):
+        """Test matches in names rank above matches in contents."""
+        Task.objects.create(
+            todo_list=self.todo_list,
+            name='Shopping',
+            content='Buy milk and bread',
+        )
+        task = Task.objects.create(todo_list=self.todo_list, name='Milk')
+        Task.objects.create(todo_list=self.todo_list, name='Laundry')
+
+        res = self.client.get(SEARCH_URL, {'q': 'milk'})
+
+        self.assertEqual(
+            [result['name'] for result in res.data['results']],
+            ['Milk', 'Shopping'],
+        )
+        self.assertEqual(res.data['results'][0]['id'], task.id)
+        self.assertEqual(
+            res.data['results'][0]['todo_list'],
+            self.todo_list.id,
+        )
+        self.assertGreater(
+            res.data['results'][0]['rank'],
+            res.data['results'][1]['rank'],
+        )
+
+    def test_all_words_must_match(self):
+        """Test every word of the query has to be found."""
+        Task.objects.create(todo_list=self.todo_list, name='Buy milk')
+        Task.objects.create(todo_list=self.todo_list, name='Buy bread')
+
+        self.assertEqual(self.search('buy milk'), ['Buy milk'])
+
+    def test_words_are_stemmed(self):
+        """Test a word finds its other forms."""
+        Task.objects.create(todo_list=self.todo_list, name='Go running')
+
+        self.assertEqual(self.search('runs'), ['Go running'])
+
+    def test_search_limited_to_user(self):
+        """Test tasks of other users are not found."""
+        other = TodoList.objects.create(user=create_user('o@example.com'))
+        Task.objects.create(todo_list=other, name='Milk')
+
+        self.assertEqual(self.search('milk'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Test search operators in the query are taken as plain words."""
+        Task.objects.create(todo_list=self.todo_list, name='Milk')
+
+        self.assertEqual(self.search('"milk* ('), ['Milk'])
+        self.assertEqual(self.search('*'), [])
+
+    def test_limit(self):
+        """Test the number of results is limited."""
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Milk {i}') for i in range(3)
+        )
+
+        self.assertEqual(len(self.search('milk', limit=2)), 2)
+
+    def test_query_required(self):
+        """Test searching without a query gives 400."""
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unsupported_database(self):
+        """Test searching on a database without full-text search gives 501."""
+        with patch.object(connection, 'vendor', 'mysql'):
+            res = self.client.get(SEARCH_URL, {'q': 'milk'})
+
+        self.assertEqual(res.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(
+            res.data['detail'],
+            'Task search is not supported on mysql.',
+        )
+
+    def test_index_follows_api_writes(self):
+        """Test created, renamed and deleted tasks are found accordingly."""
+        self.client.post(
+            tasks_url(self.todo_list.id),
+            [{'name': 'Milk'}, {'name': 'Bread'}],
+            format='json',
+        )
+        self.assertEqual(self.search('milk'), ['Milk'])
+
+        task = Task.objects.get(name='Bread')
+        self.client.put(
+            task_url(self.todo_list.id, task.id),
+            {'name': 'Butter', 'content': 'Salted'},
+        )
+        self.assertEqual(self.search('bread'), [])
+        self.assertEqual(self.search('salted'), ['Butter'])
+
+        self.client.delete(task_url(self.todo_list.id, task.id))
+        self.assertEqual(self.search('butter'), [])
+
+    def test_index_follows_bulk_changes(self):
+        """Test bulk updates and deletes keep the index in sync."""
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Milk {i}') for i in range(3)
+        )
+        Task.objects.filter(name='Milk 0').update(name='Bread')
+        Task.objects.filter(name='Milk 1').delete()
+
+        self.assertEqual(self.search('milk'), ['Milk 2'])
+        self.assertEqual(self.search('bread'), ['Bread'])
+
+    def test_index_follows_import(self):
+        """Test imported tasks are found."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'tasks.ndjson'
+            path.write_text(
+                '{"email": "test@example.com", "todo_list": "List", '
+                '"name": "Imported", "content": "Oat milk"}\n'
+            )
+            call_command('import_tasks', str(path), stdout=StringIO())
+
+        self.assertEqual(self.search('oat'), ['Imported'])
@@ -0,0 +1,166 @@
+"""
+Test the task statistics of the todo API
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+STATS_URL = reverse('todo:stats')
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicStatsApiTests(TestCase):
+    """Test unauthenticated requests for the stats."""
+
+    def test_auth_required(self):
+        """Test auth is required to retrieve the stats."""
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateStatsApiTests(TestCase):
+    """Test authenticated requests for the stats."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.now = timezone.now()
+
+    def create_todo_list(self, label='List'):
+        """Create a list with one task of every kind."""
+        todo_list = TodoList.objects.create(user=self.user, label=label)
+        Task.objects.bulk_create([
+            Task(todo_list=todo_list, name='Open'),
+            Task(todo_list=todo_list, name='Done', completed=True),
+            Task(
+                todo_list=todo_list,
+                name='Overdue',
+                deadline=self.now - timedelta(hours=1),
+            ),
+            Task(
+                todo_list=todo_list,
+                name='Due soon',
+                deadline=self.now + timedelta(hours=1),
+            ),
+            Task(
+                todo_list=todo_list,
+                name='Due later',
+                deadline=self.now + timedelta(days=2),
+            ),
+            Task(
+                todo_list=todo_list,
+                name='Done late',
+                completed=True,
+                deadline=self.now - timedelta(hours=1),
+            ),
+        ])
+        return todo_list
+
+    def test_retrieve_stats(self):
+        """Test counting the tasks per list and in total."""
+        todo_list = self.create_todo_list()
+        empty = TodoList.objects.create(user=self.user, label='Empty')
+        other = TodoList.objects.create(user=create_user('other@example.com'))
+        Task.objects.create(todo_list=other, name='Other')
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counts = {'open': 4, 'completed': 2, 'overdue': 1, 'due_soon': 1}
+        self.assertEqual(res.data['total'], counts)
+        self.assertEqual(res.data['todo_lists'], [
+            {
+                'id': empty.id,
+                'label': 'Empty',
+                'open': 0,
+                'completed': 0,
+                'overdue': 0,
+                'due_soon': 0,
+            },
+            {'id': todo_list.id, 'label': 'List', **counts},
+        ])
+
+    def test_query_count_independent_of_lists(self):
+        """Test the stats take one query however many lists there are."""
+        self.create_todo_list()
+        with self.assertNumQueries(1):
+            self.client.get(STATS_URL)
+
+        for index in range(10):
+            self.create_todo_list(label=f'List {index}')
+        cache.clear()
+        with self.assertNumQueries(1):
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(len(res.data['todo_lists']), 11)
+        self.assertEqual(res.data['total']['open'], 44)
+
+    def test_stats_served_from_cache(self):
+        """Test repeated stats run no queries."""
+        self.create_todo_list()
+        res = self.client.get(STATS_URL)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(STATS_URL)
+
+        self.assertEqual(again.content, res.content)
+
+    def test_task_change_invalidates_stats(self):
+        """Test completing a task refreshes the cached stats."""
+        todo_list = self.create_todo_list()
+        task = todo_list.task_set.get(name='Overdue')
+        self.client.get(STATS_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                task_url(todo_list.id, task.id),
+                {'name': task.name, 'completed': True},
+                format='json',
+            )
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['total']['overdue'], 0)
+        self.assertEqual(res.data['total']['completed'], 3)
+
+    def test_stats_cached_briefly(self):
+        """Test the stats are cached with the short stats timeout."""
+        with patch('todo.views.STATS_CACHE_TIMEOUT', 0):
+            self.client.get(STATS_URL)
+            with self.assertNumQueries(1):
+                self.client.get(STATS_URL)
+
+    def test_stats_not_modified(self):
+        """Test revalidating unchanged stats gives 304."""
+        self.create_todo_list()
+        res = self.client.get(STATS_URL)
+        cache.clear()
+
+        again = self.client.get(STATS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
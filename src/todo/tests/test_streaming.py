@@ -0,0 +1,118 @@
+"""
+Test streamed responses of the todo API
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.serializers import (
+    TaskSerializer,
+    TodoListSerializer,
+    task_values_serializer,
+)
+from todo.streaming import iter_json_array
+
+
+TODO_LIST_URL = reverse('todo:todo-lists')
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+class StreamingAPITests(TestCase):
+    """Test `?stream=true` on the list endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}')
+            for i in range(5)
+        )
+
+    def test_stream_tasks(self):
+        """Test streaming all tasks gives the full rendered list."""
+        res = self.client.get(tasks_url(self.todo_list.id), {'stream': 'true'})
+
+        tasks = Task.objects.filter(todo_list=self.todo_list).order_by('-id')
+        expected = JSONRenderer().render([
+            {name: value for name, value in task.items() if name != 'content'}
+            for task in TaskSerializer(tasks, many=True).data
+        ])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(b''.join(res.streaming_content), expected)
+        self.assertIn('ETag', res)
+
+    def test_stream_todo_lists(self):
+        """Test streaming all todo lists gives the full rendered list."""
+        TodoList.objects.create(user=self.user, label='Other')
+
+        res = self.client.get(TODO_LIST_URL, {'stream': '1'})
+
+        todo_lists = TodoList.objects.filter(user=self.user).order_by('-id')
+        expected = JSONRenderer().render(
+            TodoListSerializer(todo_lists, many=True).data
+        )
+        self.assertEqual(b''.join(res.streaming_content), expected)
+
+    def test_stream_empty_list(self):
+        """Test streaming no rows gives an empty JSON array."""
+        todo_list = TodoList.objects.create(user=self.user, label='Empty')
+
+        res = self.client.get(tasks_url(todo_list.id), {'stream': 'true'})
+
+        self.assertEqual(b''.join(res.streaming_content), b'[]')
+
+    def test_stream_not_modified(self):
+        """Test a streamed list honours If-None-Match."""
+        url = tasks_url(self.todo_list.id)
+        res = self.client.get(url, {'stream': 'true'})
+
+        again = self.client.get(
+            url,
+            {'stream': 'true'},
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_rows_rendered_in_chunks(self):
+        """Test rows are read through an iterator and rendered in chunks."""
+        rows = Task.objects.order_by('-id').values(
+            *task_values_serializer.value_names
+        )
+
+        with patch.object(
+            type(rows),
+            'iterator',
+            autospec=True,
+            side_effect=lambda qs, chunk_size: iter(list(qs)),
+        ) as patched_iterator:
+            parts = list(iter_json_array(rows, task_values_serializer, 2))
+
+        patched_iterator.assert_called_once_with(rows, chunk_size=2)
+        # '[', three chunks of at most two rows, ']'
+        self.assertEqual(len(parts), 5)
+        self.assertEqual(
+            b''.join(parts),
+            JSONRenderer().render(task_values_serializer.many(rows)),
+        )
@@ -0,0 +1,342 @@
+"""
+Test the delta sync feed of the todo API
+"""
+import itertools
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+    Tombstone,
+)
+from core.routers import ReplicaRouter
+
+
+SYNC_URL = reverse('sync')
+STALE_REPLICA = 'stale_replica'
+
+
+def todo_list_url(todo_list_id):
+    """Create and return a todo list detail URL."""
+    return reverse('todo:todo-list-detail', args=[todo_list_id])
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def task_url(todo_list_id, task_id):
+    """Create and return a task detail URL."""
+    return reverse('todo:task-detail', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class PublicSyncApiTests(TestCase):
+    """Test unauthenticated sync requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to sync."""
+        res = APIClient().get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateSyncApiTests(TestCase):
+    """Test authenticated sync requests."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.task = Task.objects.create(todo_list=self.todo_list, name='Milk')
+
+    def sync(self, since=None, **params):
+        """Return the sync response data for the token since."""
+        if since is not None:
+            params['since'] = since
+        res = self.client.get(SYNC_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_full_sync(self):
+        """Test a sync without a token returns every list and task."""
+        data = self.sync()
+
+        self.assertEqual(
+            [todo_list['id'] for todo_list in data['todo_lists']],
+            [self.todo_list.id],
+        )
+        self.assertEqual(data['tasks'][0]['id'], self.task.id)
+        self.assertEqual(data['tasks'][0]['todo_list'], self.todo_list.id)
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_no_changes(self):
+        """Test syncing again without changes returns nothing."""
+        token = self.sync()['next']
+
+        data = self.sync(token)
+
+        self.assertEqual(data['todo_lists'], [])
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['next'], token)
+
+    def test_changes_since_token(self):
+        """Test created and updated rows after the token are returned."""
+        other = TodoList.objects.create(user=self.user, label='Other')
+        token = self.sync()['next']
+
+        self.client.put(
+            task_url(self.todo_list.id, self.task.id),
+            {'name': 'Oat milk'},
+        )
+        self.client.post(
+            tasks_url(other.id),
+            [{'name': 'Bread'}, {'name': 'Butter'}],
+            format='json',
+        )
+        data = self.sync(token)
+
+        self.assertEqual(
+            [task['name'] for task in data['tasks']],
+            ['Oat milk', 'Bread', 'Butter'],
+        )
+        # Both lists were touched by their task changes.
+        self.assertEqual(
+            [todo_list['id'] for todo_list in data['todo_lists']],
+            [self.todo_list.id, other.id],
+        )
+        self.assertGreater(int(data['next']), int(token))
+
+    def test_deletions_since_token(self):
+        """Test deleted lists and tasks are returned as tombstones."""
+        other = TodoList.objects.create(user=self.user, label='Other')
+        tasks = Task.objects.bulk_create(
+            Task(todo_list=self.todo_list, name=f'Task {i}') for i in range(2)
+        )
+        token = self.sync()['next']
+
+        self.client.delete(task_url(self.todo_list.id, self.task.id))
+        self.client.delete(
+            tasks_url(self.todo_list.id),
+            {'ids': [task.id for task in tasks]},
+            format='json',
+        )
+        self.client.delete(todo_list_url(other.id))
+        data = self.sync(token)
+
+        self.assertCountEqual(data['deleted'], [
+            {'type': 'task', 'id': self.task.id},
+            *({'type': 'task', 'id': task.id} for task in tasks),
+            {'type': 'todo_list', 'id': other.id},
+        ])
+
+    def test_full_sync_skips_tombstones(self):
+        """Test a full sync does not return earlier deletions."""
+        self.task.delete()
+
+        data = self.sync()
+
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['deleted'], [])
+
+    def test_pages(self):
+        """Test paging returns every change once, even within one write."""
+        self.client.post(
+            tasks_url(self.todo_list.id),
+            [{'name': f'Task {i}'} for i in range(5)],
+            format='json',
+        )
+        Task.objects.get(name='Task 3').delete()
+
+        token, ids, deleted = None, [], []
+        while True:
+            data = self.sync(token, limit=2)
+            self.assertLessEqual(
+                len(data['todo_lists']) + len(data['tasks'])
+                + len(data['deleted']),
+                2,
+            )
+            ids += [task['id'] for task in data['tasks']]
+            deleted += data['deleted']
+            token = data['next']
+            if not data['has_more']:
+                break
+
+        self.assertEqual(
+            sorted(ids),
+            sorted(Task.objects.values_list('id', flat=True)),
+        )
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync(token)['tasks'], [])
+
+    def test_sync_limited_to_user(self):
+        """Test changes of other users are not returned."""
+        other = TodoList.objects.create(user=create_user('o@example.com'))
+        Task.objects.create(todo_list=other, name='Bread').delete()
+
+        data = self.sync('0')
+
+        self.assertEqual(
+            [todo_list['id'] for todo_list in data['todo_lists']],
+            [self.todo_list.id],
+        )
+        self.assertEqual(
+            [task['id'] for task in data['tasks']],
+            [self.task.id],
+        )
+        self.assertEqual(data['deleted'], [])
+
+    def test_imported_tasks_synced(self):
+        """Test tasks written by the import command are returned."""
+        token = self.sync()['next']
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'tasks.ndjson'
+            path.write_text(
+                '{"email": "test@example.com", "todo_list": "Imported", '
+                '"name": "Oat milk"}\n'
+            )
+            call_command('import_tasks', str(path), stdout=StringIO())
+
+        data = self.sync(token)
+
+        self.assertEqual(
+            [todo_list['label'] for todo_list in data['todo_lists']],
+            ['Imported'],
+        )
+        self.assertEqual(
+            [task['name'] for task in data['tasks']],
+            ['Oat milk'],
+        )
+
+    def test_invalid_token(self):
+        """Test a malformed token gives 400."""
+        res = self.client.get(SYNC_URL, {'since': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_token(self):
+        """Test a token older than purged tombstones gives 410."""
+        token = self.sync()['next']
+        self.task.delete()
+        Tombstone.objects.update(deleted_at=self.task.created_at - timedelta(
+            days=31,
+        ))
+        call_command('purge_tombstones', stdout=StringIO())
+
+        res = self.client.get(SYNC_URL, {'since': token})
+
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+        self.assertEqual(self.sync()['tasks'], [])
+
+
+class SyncReplicaTests(TransactionTestCase):
+    """Test syncs with replicas at different points of the replication."""
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Add a replica lagging behind the primary for these tests only.
+
+        It is a test database of its own, which the tests leave empty. The
+        test runner sets up the databases of every test class before any
+        runs, so the alias cannot be declared on the class.
+        """
+        default = connections.settings[DEFAULT_DB_ALIAS]
+        connections.settings[STALE_REPLICA] = {
+            **default,
+            'TEST': {
+                **default['TEST'],
+                'MIRROR': None,
+                'NAME': None if 'sqlite' in default['ENGINE']
+                else f"{default['NAME']}_stale",
+            },
+        }
+        old_name = default['NAME']
+        connections[STALE_REPLICA].creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False,
+        )
+        cls.addClassCleanup(cls.remove_stale_replica, old_name)
+        cls.databases = {DEFAULT_DB_ALIAS, STALE_REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def remove_stale_replica(cls, old_name):
+        """Drop the lagging replica and forget its alias."""
+        connections[STALE_REPLICA].creation.destroy_test_db(
+            old_name,
+            verbosity=0,
+        )
+        del connections[STALE_REPLICA]
+        del connections.settings[STALE_REPLICA]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.task = Task.objects.create(todo_list=self.todo_list, name='Milk')
+
+    def sync(self, *aliases, **params):
+        """Return the sync data, reads going to aliases in turn."""
+        aliases = itertools.cycle(aliases)
+        with patch.object(
+            ReplicaRouter,
+            'db_for_read',
+            lambda router, model, **hints: next(aliases),
+        ):
+            res = self.client.get(SYNC_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_fresh_counter_not_mixed_with_stale_sources(self):
+        """Test changes are not skipped when replicas lag differently."""
+        data = self.sync(DEFAULT_DB_ALIAS, STALE_REPLICA)
+
+        self.assertEqual(
+            [todo_list['id'] for todo_list in data['todo_lists']],
+            [self.todo_list.id],
+        )
+        self.assertEqual(
+            [task['id'] for task in data['tasks']],
+            [self.task.id],
+        )
+
+    def test_stale_sync_caught_up(self):
+        """Test a sync read from a lagging replica misses nothing later."""
+        data = self.sync(STALE_REPLICA, DEFAULT_DB_ALIAS)
+
+        self.assertEqual(data['todo_lists'], [])
+        self.assertEqual(data['tasks'], [])
+
+        data = self.sync(DEFAULT_DB_ALIAS, since=data['next'])
+
+        self.assertEqual(len(data['todo_lists']), 1)
+        self.assertEqual(
+            [task['id'] for task in data['tasks']],
+            [self.task.id],
+        )
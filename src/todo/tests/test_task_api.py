@@ -0,0 +1,243 @@
+"""
+Test for the task endpoints of the todo API
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def create_user(email='test@example.com', password='password123', **params):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password, **params)
+
+
+class CreateTaskAPITests(TestCase):
+    """Test creating tasks one at a time and in bulk."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.url = tasks_url(self.todo_list.id)
+
+    def test_create_task(self):
+        """Test creating a single task in the todo list."""
+        payload = {'name': 'Shopping', 'deadline': timezone.now()}
+
+        res = self.client.post(self.url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        task = Task.objects.get(id=res.data['id'])
+        self.assertEqual(task.todo_list, self.todo_list)
+        self.assertEqual(task.name, payload['name'])
+
+    def test_bulk_create_tasks(self):
+        """Test a JSON array creates every task."""
+        payload = [{'name': f'Task {i}'} for i in range(3)]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        tasks = Task.objects.filter(todo_list=self.todo_list).order_by('id')
+        self.assertEqual(
+            [task.name for task in tasks],
+            [item['name'] for item in payload],
+        )
+        self.assertEqual([item['id'] for item in res.data],
+                         [task.id for task in tasks])
+
+    @patch('todo.serializers.TaskListSerializer.batch_size', 2)
+    def test_bulk_create_batches_inserts(self):
+        """Test tasks are inserted in batches, not one by one."""
+        payload = [{'name': f'Task {i}'} for i in range(5)]
+
+        # list lookup, change number, first position, 3 batched INSERTs,
+        # todo list touch, savepoint pair.
+        with self.assertNumQueries(9):
+            res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Task.objects.filter(todo_list=self.todo_list).count(), 5
+        )
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """Test an invalid item rejects the batch with per item errors."""
+        payload = [{'name': 'Valid'}, {'content': 'No name'}]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('name', res.data[1])
+        self.assertFalse(Task.objects.exists())
+
+    @patch('todo.views.MAX_BULK_TASKS', 2)
+    def test_bulk_create_limited(self):
+        """Test arrays larger than the maximum are rejected."""
+        payload = [{'name': f'Task {i}'} for i in range(3)]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_create_other_user_list_not_found(self):
+        """Test tasks cannot be added to another user's todo list."""
+        other_list = TodoList.objects.create(
+            user=create_user(email='other@example.com'),
+            label='List',
+        )
+
+        res = self.client.post(
+            tasks_url(other_list.id),
+            [{'name': 'Task'}],
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Task.objects.exists())
+
+
+class BulkChangeTaskAPITests(TestCase):
+    """Test updating and deleting many tasks at once."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.url = tasks_url(self.todo_list.id)
+        self.open_tasks = [
+            Task.objects.create(todo_list=self.todo_list, name=f'Open {i}')
+            for i in range(3)
+        ]
+        self.done_task = Task.objects.create(
+            todo_list=self.todo_list,
+            name='Done',
+            completed=True,
+        )
+
+    def test_complete_tasks_by_ids(self):
+        """Test marking tasks selected by id as completed."""
+        ids = [task.id for task in self.open_tasks[:2]]
+        before = timezone.now()
+
+        # lookup, savepoint, change number, update of tasks already and not
+        # yet completed, todo list touch, release.
+        with self.assertNumQueries(7):
+            res = self.client.patch(
+                self.url,
+                {'ids': ids, 'completed': True},
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'count': 2})
+        for task in Task.objects.filter(id__in=ids):
+            self.assertTrue(task.completed)
+            self.assertGreaterEqual(task.updated_at, before)
+        self.open_tasks[2].refresh_from_db()
+        self.assertFalse(self.open_tasks[2].completed)
+
+    def test_update_tasks_by_filter(self):
+        """Test updating every task matching a filter."""
+        res = self.client.patch(
+            self.url,
+            {'filter': {'completed': False}, 'completed': True},
+            format='json',
+        )
+
+        self.assertEqual(res.data, {'count': 3})
+        self.assertFalse(
+            Task.objects.filter(todo_list=self.todo_list, completed=False)
+            .exists()
+        )
+
+    def test_update_ignores_other_lists(self):
+        """Test ids of tasks in other users' lists are not touched."""
+        other_list = TodoList.objects.create(
+            user=create_user(email='other@example.com'),
+            label='List',
+        )
+        other_task = Task.objects.create(todo_list=other_list, name='Task')
+
+        res = self.client.patch(
+            self.url,
+            {'ids': [other_task.id], 'completed': True},
+            format='json',
+        )
+
+        self.assertEqual(res.data, {'count': 0})
+        other_task.refresh_from_db()
+        self.assertFalse(other_task.completed)
+
+    def test_update_requires_selection(self):
+        """Test updating without ids or filter is rejected."""
+        res = self.client.patch(self.url, {'completed': True}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_requires_values(self):
+        """Test updating without any values is rejected."""
+        res = self.client.patch(
+            self.url,
+            {'ids': [self.done_task.id]},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_clear_completed_tasks(self):
+        """Test deleting completed tasks in one statement."""
+        # lookup, savepoint, change number, ids and tombstones of the tasks,
+        # delete of completed and open tasks, todo list touch, release.
+        with self.assertNumQueries(9):
+            res = self.client.delete(
+                self.url,
+                {'filter': {'completed': True}},
+                format='json',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'count': 1})
+        self.assertFalse(Task.objects.filter(id=self.done_task.id).exists())
+        self.assertEqual(
+            Task.objects.filter(todo_list=self.todo_list).count(), 3
+        )
+
+    def test_delete_tasks_by_ids(self):
+        """Test deleting tasks selected by id."""
+        ids = [task.id for task in self.open_tasks]
+
+        res = self.client.delete(self.url, {'ids': ids}, format='json')
+
+        self.assertEqual(res.data, {'count': 3})
+        self.assertFalse(Task.objects.filter(id__in=ids).exists())
+
+    def test_delete_requires_selection(self):
+        """Test deleting without ids or filter is rejected."""
+        res = self.client.delete(self.url, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            Task.objects.filter(todo_list=self.todo_list).count(), 4
+        )
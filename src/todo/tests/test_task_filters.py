@@ -0,0 +1,249 @@
+"""
+Test filtering and ordering the tasks of a todo list
+"""
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class TaskFilterApiTests(TestCase):
+    """Test the filters and orderings of the task list endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        self.url = tasks_url(self.todo_list.id)
+        self.now = timezone.now()
+
+    def create_task(self, name='Task', **params):
+        """Create and return a task of the todo list."""
+        return Task.objects.create(
+            todo_list=self.todo_list,
+            name=name,
+            **params,
+        )
+
+    def get_ids(self, params):
+        """Return the ids of the first page of tasks for params."""
+        res = self.client.get(self.url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in res.data['results']]
+
+    def collect_ids(self, params):
+        """Follow `next` links for params and return all ids in order."""
+        res = self.client.get(self.url, params)
+        ids = [task['id'] for task in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids.extend(task['id'] for task in res.data['results'])
+        return ids
+
+    def test_filter_completed(self):
+        """Test filtering tasks by completed."""
+        done = self.create_task(completed=True)
+        open_task = self.create_task()
+
+        self.assertEqual(self.get_ids({'completed': 'true'}), [done.id])
+        self.assertEqual(self.get_ids({'completed': 'false'}), [open_task.id])
+
+    def test_filter_overdue(self):
+        """Test filtering open tasks whose deadline has passed."""
+        overdue = self.create_task(deadline=self.now - timedelta(hours=1))
+        done = self.create_task(
+            completed=True,
+            deadline=self.now - timedelta(hours=1),
+        )
+        later = self.create_task(deadline=self.now + timedelta(hours=1))
+        no_deadline = self.create_task()
+
+        self.assertEqual(self.get_ids({'overdue': 'true'}), [overdue.id])
+        self.assertEqual(
+            self.get_ids({'overdue': 'false'}),
+            [no_deadline.id, later.id, done.id],
+        )
+
+    def test_filter_deadline_range(self):
+        """Test filtering tasks due within a range."""
+        self.create_task(deadline=self.now - timedelta(days=1))
+        inside = self.create_task(deadline=self.now)
+        self.create_task(deadline=self.now + timedelta(days=1))
+        self.create_task()
+
+        ids = self.get_ids({
+            'deadline_after': self.now.isoformat(),
+            'deadline_before': (self.now + timedelta(hours=1)).isoformat(),
+        })
+
+        self.assertEqual(ids, [inside.id])
+
+    def test_filter_created_and_updated_since(self):
+        """Test filtering tasks created or updated since a time."""
+        old = self.create_task()
+        Task.objects.filter(id=old.id).update(
+            created_at=self.now - timedelta(days=2),
+            updated_at=self.now - timedelta(days=2),
+        )
+        changed = self.create_task()
+        Task.objects.filter(id=changed.id).update(
+            created_at=self.now - timedelta(days=2),
+        )
+        new = self.create_task()
+        since = (self.now - timedelta(days=1)).isoformat()
+
+        self.assertEqual(self.get_ids({'created_since': since}), [new.id])
+        self.assertEqual(
+            self.get_ids({'updated_since': since}),
+            [new.id, changed.id],
+        )
+
+    def test_filters_combine(self):
+        """Test several filters select the tasks matching all of them."""
+        match = self.create_task(deadline=self.now + timedelta(hours=1))
+        self.create_task(
+            completed=True,
+            deadline=self.now + timedelta(hours=1),
+        )
+        self.create_task(deadline=self.now + timedelta(days=2))
+
+        ids = self.get_ids({
+            'completed': 'false',
+            'deadline_before': (self.now + timedelta(days=1)).isoformat(),
+        })
+
+        self.assertEqual(ids, [match.id])
+
+    def test_invalid_filter_rejected(self):
+        """Test an invalid filter value gives 400."""
+        res = self.client.get(self.url, {'deadline_after': 'yesterday'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ordering_rejected(self):
+        """Test ordering by a field without an index gives 400."""
+        res = self.client.get(self.url, {'ordering': 'content'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_order_by_name(self):
+        """Test ordering tasks by name, ties broken by id."""
+        b = self.create_task('b')
+        a1 = self.create_task('a')
+        a2 = self.create_task('a')
+
+        self.assertEqual(
+            self.get_ids({'ordering': 'name'}),
+            [a1.id, a2.id, b.id],
+        )
+        self.assertEqual(
+            self.get_ids({'ordering': '-name'}),
+            [b.id, a2.id, a1.id],
+        )
+
+    def test_deadline_ordering_paginated(self):
+        """Test paging by deadline with ties and missing deadlines."""
+        tomorrow = self.now + timedelta(days=1)
+        tasks = [
+            self.create_task(deadline=tomorrow),
+            self.create_task(),
+            self.create_task(deadline=self.now),
+            self.create_task(deadline=tomorrow),
+            self.create_task(),
+            self.create_task(deadline=tomorrow),
+        ]
+        expected = [
+            tasks[2].id, tasks[0].id, tasks[3].id, tasks[5].id,
+            tasks[1].id, tasks[4].id,
+        ]
+
+        ascending = self.collect_ids({'ordering': 'deadline', 'limit': 2})
+        descending = self.collect_ids({'ordering': '-deadline', 'limit': 2})
+
+        self.assertEqual(ascending, expected)
+        self.assertEqual(descending, expected[::-1])
+
+    def test_ordering_previous_link(self):
+        """Test the previous link of an ordered page gives the prior page."""
+        for index in range(5):
+            self.create_task(deadline=self.now + timedelta(hours=index % 2))
+        first = self.client.get(self.url, {'ordering': 'deadline', 'limit': 2})
+        second = self.client.get(first.data['next'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+
+    def test_cursor_of_other_ordering_rejected(self):
+        """Test a cursor reused with another ordering gives 404."""
+        for index in range(3):
+            self.create_task(f't{index}')
+        res = self.client.get(self.url, {'ordering': 'name', 'limit': 1})
+        cursor = parse_qs(urlparse(res.data['next']).query)['cursor'][0]
+
+        for ordering in ('deadline', '-created_at'):
+            res = self.client.get(
+                self.url,
+                {'ordering': ordering, 'limit': 1, 'cursor': cursor},
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_ordering_applies_to_stream(self):
+        """Test a streamed task list follows the ordering."""
+        later = self.create_task(deadline=self.now + timedelta(hours=1))
+        sooner = self.create_task(deadline=self.now)
+
+        res = self.client.get(self.url, {'ordering': 'deadline', 'stream': 1})
+        body = b''.join(res.streaming_content).decode()
+
+        self.assertLess(body.index(f'"id":{sooner.id}'),
+                        body.index(f'"id":{later.id}'))
+
+    def test_overdue_never_not_modified(self):
+        """Test the overdue filter is not revalidated, it changes with time."""
+        self.create_task(deadline=self.now + timedelta(hours=1))
+        res = self.client.get(self.url, {'overdue': 'true'})
+
+        again = self.client.get(
+            self.url,
+            {'overdue': 'true'},
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_filter_query_count(self):
+        """Test a filtered, ordered page takes as many queries as any."""
+        self.create_task(deadline=self.now)
+
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {
+                'completed': 'false',
+                'deadline_after': (self.now - timedelta(days=1)).isoformat(),
+                'ordering': '-deadline',
+            })
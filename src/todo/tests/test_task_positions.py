@@ -0,0 +1,195 @@
+"""
+Test the manual order of the tasks of a todo list
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import (
+    TodoList,
+    Task,
+)
+from core.positions import REBALANCE_LENGTH
+
+
+def tasks_url(todo_list_id):
+    """Create and return a tasks URL for the todo list."""
+    return reverse('todo:tasks', args=[todo_list_id])
+
+
+def move_url(todo_list_id, task_id):
+    """Create and return the move URL of a task."""
+    return reverse('todo:task-move', args=[todo_list_id, task_id])
+
+
+def create_user(email='test@example.com', password='password123'):
+    """Create and return a new user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class TaskPositionApiTests(TestCase):
+    """Test moving tasks and listing them in their manual order."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(user=self.user)
+        self.todo_list = TodoList.objects.create(user=self.user, label='List')
+        res = self.client.post(
+            tasks_url(self.todo_list.id),
+            [{'name': f'Task {i}'} for i in range(4)],
+            format='json',
+        )
+        self.ids = [task['id'] for task in res.data]
+
+    def get_order(self, **params):
+        """Return the ids of the tasks in their manual order."""
+        res = self.client.get(
+            tasks_url(self.todo_list.id),
+            {'ordering': 'position', **params},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        ids = [task['id'] for task in res.data['results']]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            ids += [task['id'] for task in res.data['results']]
+        return ids
+
+    def move(self, task_id, after):
+        """Move the task after the task after and return the response."""
+        return self.client.post(
+            move_url(self.todo_list.id, task_id),
+            {'after': after},
+            format='json',
+        )
+
+    def test_new_tasks_first(self):
+        """Test new tasks go on top, as in the default order."""
+        res = self.client.post(tasks_url(self.todo_list.id), {'name': 'New'})
+
+        self.assertEqual(
+            self.get_order(),
+            [res.data['id'], *reversed(self.ids)],
+        )
+        self.assertEqual(self.get_order(limit=2), self.get_order())
+
+    def test_move_task(self):
+        """Test moving a task writes its position only."""
+        positions = dict(Task.objects.values_list('id', 'position'))
+
+        res = self.move(self.ids[3], self.ids[1])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_order(),
+            [self.ids[2], self.ids[1], self.ids[3], self.ids[0]],
+        )
+        task = Task.objects.get(id=self.ids[3])
+        self.assertEqual(res.data['position'], task.position)
+        positions[task.id] = task.position
+        self.assertEqual(
+            dict(Task.objects.values_list('id', 'position')),
+            positions,
+        )
+
+    def test_move_task_first_and_last(self):
+        """Test moving a task to either end of the list."""
+        self.move(self.ids[0], None)
+        self.move(self.ids[3], self.ids[1])
+
+        self.assertEqual(
+            self.get_order(),
+            [self.ids[0], self.ids[2], self.ids[1], self.ids[3]],
+        )
+
+    def test_move_queries(self):
+        """Test a move reads its neighbours and writes two rows."""
+        # task, change number, after task, next task, task and list UPDATE,
+        # savepoint pair.
+        with self.assertNumQueries(8):
+            self.move(self.ids[3], self.ids[1])
+
+    def test_move_changes_etag(self):
+        """Test a move touches the list."""
+        res = self.client.get(tasks_url(self.todo_list.id))
+
+        self.move(self.ids[3], self.ids[1])
+        again = self.client.get(
+            tasks_url(self.todo_list.id),
+            HTTP_IF_NONE_MATCH=res['ETag'],
+        )
+
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_move_between_equal_positions(self):
+        """Test neighbours with equal positions get the list rebalanced."""
+        Task.objects.filter(id__in=self.ids[1:3]).update(position='i5')
+
+        self.move(self.ids[0], self.ids[1])
+
+        self.assertEqual(
+            self.get_order(),
+            [self.ids[3], self.ids[1], self.ids[0], self.ids[2]],
+        )
+        positions = list(Task.objects.values_list('position', flat=True))
+        self.assertEqual(len(set(positions)), 4)
+
+    def test_long_positions_flag_rebalance(self):
+        """Test moving into the same gap flags the list for a rebalance."""
+        for _ in range(REBALANCE_LENGTH * 4):
+            self.move(self.ids[0], self.ids[3])
+            self.move(self.ids[1], self.ids[3])
+
+        self.todo_list.refresh_from_db()
+        self.assertTrue(self.todo_list.needs_rebalance)
+        order = self.get_order()
+
+        self.todo_list.rebalance_positions()
+
+        self.assertEqual(self.get_order(), order)
+        self.assertLessEqual(
+            max(len(key) for key in Task.objects.values_list(
+                'position', flat=True,
+            )),
+            2,
+        )
+        self.todo_list.refresh_from_db()
+        self.assertFalse(self.todo_list.needs_rebalance)
+
+    def test_move_after_itself(self):
+        """Test moving a task after itself gives 400."""
+        res = self.move(self.ids[0], self.ids[0])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('after', res.data)
+
+    def test_move_after_task_of_other_list(self):
+        """Test moving a task after a task of another list gives 400."""
+        other = Task.objects.create(
+            todo_list=TodoList.objects.create(user=self.user),
+            name='Other',
+        )
+
+        res = self.move(self.ids[0], other.id)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('after', res.data)
+        self.assertEqual(self.get_order(), self.ids[::-1])
+
+    def test_move_task_of_other_user(self):
+        """Test tasks of other users are not found."""
+        other_list = TodoList.objects.create(user=create_user('o@e.com'))
+        other = Task.objects.create(todo_list=other_list, name='Other')
+
+        res = self.client.post(
+            move_url(other_list.id, other.id),
+            {'after': None},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
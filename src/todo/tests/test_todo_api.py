@@ -1,7 +1,10 @@
 """
 Test for the Todo API
 """
-from django.test import TestCase
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -74,7 +77,7 @@ class PrivateTodoAPITests(TestCase):
         todo_lists = TodoList.objects.all().order_by('-id')
         serializer = TodoListSerializer(todo_lists, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_todo_list_limited_to_user(self):
         """Test list of todo lists is limited to authenticated user."""
@@ -87,7 +90,7 @@ class PrivateTodoAPITests(TestCase):
         todo_lists = TodoList.objects.filter(user=self.user).order_by('-id')
         serializer = TodoListSerializer(todo_lists, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_create_todo_list(self):
         """Test creating a todo list"""
@@ -108,10 +111,12 @@ class PrivateTodoAPITests(TestCase):
         res = self.client.get(url)
 
         serializer = TodoListDetailSerializer(todo_list)
-        task_serializer = TaskSerializer(task)
+        task_data = dict(TaskSerializer(task).data)
+        # Lists of tasks leave their contents out unless asked for.
+        del task_data['content']
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-        self.assertIn(task_serializer.data, serializer.data['tasks'])
+        self.assertEqual(res.data['label'], serializer.data['label'])
+        self.assertEqual(res.data['tasks'], [task_data])
 
     def test_update_todo_list(self):
         """Test updating a todo list."""
@@ -149,3 +154,51 @@ class PrivateTodoAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(TodoList.objects.filter(id=todo_list.id).exists())
         self.assertTrue(Task.objects.filter(id=task.id).exists())
+
+    @override_settings(TODO_LIST_DELETE_BATCH_SIZE=2)
+    def test_delete_large_todo_list(self):
+        """Test a list too large for one batch is hidden until purged."""
+        todo_list = create_todo_lsit(user=self.user)
+        for i in range(3):
+            create_task(todo_list=todo_list, name=f'Task {i}')
+        todo_list.touch(tasks=3)
+
+        res = self.client.delete(detail_url(todo_list_id=todo_list.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self.client.get(detail_url(todo_list.id)).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(self.client.get(TODO_LIST_URL).data['results'], [])
+        self.assertEqual(Task.objects.filter(todo_list=todo_list).count(), 1)
+
+        call_command('purge_todo_lists', stdout=StringIO())
+
+        self.assertFalse(TodoList.all_objects.filter(id=todo_list.id).exists())
+        self.assertFalse(Task.objects.filter(todo_list=todo_list).exists())
+
+    @override_settings(TODO_LIST_DELETE_BATCH_SIZE=2)
+    def test_delete_todo_list_drifted_count(self):
+        """Test a request deletes one batch even if the count is too low."""
+        todo_list = create_todo_lsit(user=self.user)
+        # Tasks created directly leave the counter at 0, as drift would.
+        for i in range(5):
+            create_task(todo_list=todo_list, name=f'Task {i}')
+
+        res = self.client.delete(detail_url(todo_list_id=todo_list.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Task.objects.filter(todo_list=todo_list).count(), 3)
+        self.assertTrue(TodoList.all_objects.filter(id=todo_list.id).exists())
+
+    @override_settings(TODO_LIST_DELETE_BATCH_SIZE=2)
+    def test_delete_todo_list_within_batch(self):
+        """Test a list whose tasks fit in a batch is deleted at once."""
+        todo_list = create_todo_lsit(user=self.user)
+        create_task(todo_list=todo_list, name='Task')
+
+        res = self.client.delete(detail_url(todo_list_id=todo_list.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(TodoList.all_objects.filter(id=todo_list.id).exists())
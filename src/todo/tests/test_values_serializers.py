@@ -0,0 +1,103 @@
+"""
+Test the fast read path serializers match the model serializers
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import (
+    TodoList,
+    Task,
+)
+
+from todo.serializers import (
+    TaskSerializer,
+    TodoListSerializer,
+    TodoListDetailSerializer,
+    task_values_serializer,
+    todo_list_values_serializer,
+    todo_list_detail_values_serializer,
+)
+
+
+def render(data):
+    """Return data rendered as the API would."""
+    return JSONRenderer().render(data)
+
+
+class ValuesSerializerParityTests(TestCase):
+    """Test ValuesSerializer output is byte identical."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+        )
+        self.todo_list = TodoList.objects.create(user=self.user, label='Lïst')
+        deadline = datetime(
+            2023, 8, 19, 9, 3, 4, 123456,
+            tzinfo=dt_timezone.utc,
+        )
+        Task.objects.create(todo_list=self.todo_list, name='Plain')
+        Task.objects.create(
+            todo_list=self.todo_list,
+            name='Full "quoted" ✓',
+            content='Line 1\nLine 2',
+            completed=True,
+            deadline=deadline,
+        )
+        Task.objects.create(
+            todo_list=self.todo_list,
+            name='Whole seconds',
+            content='',
+            deadline=deadline.replace(microsecond=0) + timedelta(days=400),
+        )
+
+    def test_task_parity(self):
+        """Test tasks render the same as TaskSerializer."""
+        tasks = Task.objects.order_by('-id')
+
+        expected = render(TaskSerializer(tasks, many=True).data)
+        actual = render(task_values_serializer.many(
+            tasks.values(*task_values_serializer.value_names)
+        ))
+
+        self.assertEqual(actual, expected)
+
+    def test_todo_list_parity(self):
+        """Test todo lists render the same as TodoListSerializer."""
+        todo_lists = TodoList.objects.order_by('-id')
+
+        expected = render(TodoListSerializer(todo_lists, many=True).data)
+        actual = render(todo_list_values_serializer.many(
+            todo_lists.values(*todo_list_values_serializer.value_names)
+        ))
+
+        self.assertEqual(actual, expected)
+
+    def test_todo_list_detail_endpoint_parity(self):
+        """Test the detail endpoint renders as TodoListDetailSerializer."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse('todo:todo-list-detail', args=[self.todo_list.id])
+
+        res = client.get(url, {
+            'task_fields': ','.join(TaskSerializer.Meta.fields),
+        })
+
+        todo_list = TodoList.objects.get(id=self.todo_list.id)
+        data = TodoListDetailSerializer(todo_list).data
+        data['tasks'] = sorted(data['tasks'], key=lambda t: -t['id'])
+        self.assertEqual(res.content, render(data))
+
+    def test_detail_skips_nested_fields(self):
+        """Test nested serializers are left out of the plain fields."""
+        self.assertNotIn(
+            'tasks',
+            todo_list_detail_values_serializer.value_names,
+        )
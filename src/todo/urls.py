@@ -11,6 +11,9 @@ app_name = 'todo'
 
 urlpatterns = [
     path('', views.TodoListsView.as_view(), name='todo-lists'),
+    path('stats', views.StatsView.as_view(), name='stats'),
+    path('search', views.TaskSearchView.as_view(), name='search'),
+    path('export', views.ExportView.as_view(), name='export'),
     path(
         '<int:pk>',
         views.TodoListDetailView.as_view(),
@@ -22,4 +25,9 @@ urlpatterns = [
         views.TaskDetailView.as_view(),
         name='task-detail'
     ),
+    path(
+        '<int:todo_list_id>/tasks/<int:pk>/move',
+        views.TaskMoveView.as_view(),
+        name='task-move'
+    ),
 ]
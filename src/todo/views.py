@@ -1,38 +1,152 @@
 """
 Views for the todo API
 """
-from rest_framework import authentication, permissions, status
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from rest_framework import permissions, serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.generics import get_object_or_404
 
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import (
+    extend_schema,
+    inline_serializer,
+    OpenApiParameter,
+)
 
+from core.authentication import CachedTokenAuthentication
 from core.models import (
     TodoList,
     Task,
 )
+from todo.cache import ConditionalGet, todo_list_scope, user_scope
+from todo.conditional import make_etag, not_modified, set_validators
+from todo.export import get_export_rows, iter_export
+from todo.fieldsets import fields_parameter, select_fields
+from todo.pagination import TodoCursorPagination, order_by
+from todo.renderers import CSVRenderer, NDJSONRenderer
+from todo.search import search_tasks
+from todo.stats import STATS_CACHE_TIMEOUT, get_task_stats
+from todo.streaming import is_stream_requested, stream_json_array
+from todo.sync import get_changes
 from todo.serializers import (
     TodoListSerializer,
     TodoListDetailSerializer,
-    TaskSerializer
+    TaskSerializer,
+    TaskSelectionSerializer,
+    TaskMoveSerializer,
+    TaskBulkUpdateSerializer,
+    ExportQuerySerializer,
+    TaskQuerySerializer,
+    TaskSearchQuerySerializer,
+    TaskSearchResultSerializer,
+    StatsSerializer,
+    SyncQuerySerializer,
+    SyncSerializer,
+    task_values_serializer,
+    task_search_values_serializer,
+    todo_list_values_serializer,
+    todo_list_detail_values_serializer,
+)
+
+
+MAX_BULK_TASKS = 5000
+
+# Task contents are unbounded, so lists leave them out unless asked for.
+TASK_LIST_FIELDS = [
+    name for name in TaskSerializer.Meta.fields if name != 'content'
+]
+
+TASK_SEARCH_FIELDS = [
+    name for name in TaskSearchResultSerializer.Meta.fields
+    if name != 'content'
+]
+
+BULK_COUNT_RESPONSE = inline_serializer(
+    'BulkCountResponse',
+    fields={'count': serializers.IntegerField()},
 )
 
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        'cursor',
+        str,
+        description='Opaque cursor taken from the `next`/`previous` link.',
+    ),
+    OpenApiParameter(
+        'limit',
+        int,
+        description='Number of results per page (capped at %d).' % (
+            TodoCursorPagination.max_page_size
+        ),
+    ),
+]
+
+LIST_PARAMETERS = PAGINATION_PARAMETERS + [
+    OpenApiParameter(
+        'stream',
+        bool,
+        description='Stream every result as one JSON array, unpaginated.',
+    ),
+]
+
 
 class TodoListsView(APIView):
     """API for listing & creating todo lists."""
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TodoListSerializer
+    pagination_class = TodoCursorPagination
 
-    @extend_schema(responses={200: TodoListSerializer(many=True)})
+    @extend_schema(
+        parameters=LIST_PARAMETERS + [
+            fields_parameter(todo_list_values_serializer),
+        ],
+        responses={200: TodoListSerializer(many=True)},
+    )
     def get(self, request, format=None):
         """Retrieve todo lists for authenticated user."""
-        todo_lists = TodoList.objects.filter(
-            user=request.user
-        ).order_by('-id')
-        serializer = TodoListSerializer(todo_lists, many=True)
-        return Response(serializer.data)
+        fields = select_fields(request, todo_list_values_serializer)
+        stream = is_stream_requested(request)
+        conditional = ConditionalGet(
+            request,
+            None if stream else user_scope(request.user.pk),
+        )
+        response = conditional.lookup()
+        if response is not None:
+            return response
+
+        todo_lists = TodoList.objects.filter(user=request.user)
+
+        # Deleting a list lowers the count but not the newest updated_at,
+        # so only an ETag (no Last-Modified) is safe for the collection.
+        stats = todo_lists.aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('id'),
+        )
+        response = conditional.not_modified(make_etag(
+            request.get_full_path(),
+            stats['last_modified'],
+            stats['count'],
+        ))
+        if response is not None:
+            return response
+
+        rows = fields.values(todo_lists, 'id')
+        if stream:
+            return conditional.respond(
+                stream_json_array(rows.order_by('-id'), fields)
+            )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return conditional.respond(
+            paginator.get_paginated_response(fields.many(page))
+        )
 
     @extend_schema(
         responses={
@@ -56,28 +170,229 @@ class TodoListsView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class StatsView(APIView):
+    """API for the task statistics of the user's todo lists."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = StatsSerializer
+
+    @extend_schema(responses={200: StatsSerializer})
+    def get(self, request, format=None):
+        """
+        Count open, completed, overdue and due soon tasks of the user.
+
+        Task changes touch their list, which invalidates the cached stats;
+        they are cached briefly since overdue tasks also change with time.
+        """
+        conditional = ConditionalGet(request, user_scope(request.user.pk))
+        response = conditional.lookup()
+        if response is not None:
+            return response
+
+        data = get_task_stats(request.user, timezone.now())
+        response = conditional.not_modified(
+            make_etag(request.get_full_path(), data)
+        )
+        if response is not None:
+            return response
+
+        return conditional.respond(
+            Response(data),
+            timeout=STATS_CACHE_TIMEOUT,
+        )
+
+
+class TaskSearchView(APIView):
+    """API for searching the tasks of the user."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = TaskSearchResultSerializer
+
+    @extend_schema(
+        parameters=[
+            TaskSearchQuerySerializer,
+            fields_parameter(
+                task_search_values_serializer,
+                TASK_SEARCH_FIELDS,
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                'TaskSearchResponse',
+                fields={'results': TaskSearchResultSerializer(many=True)},
+            ),
+            400: Response,
+            501: Response,
+        },
+    )
+    def get(self, request, format=None):
+        """Search the names and contents of all tasks, best match first."""
+        query = TaskSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = select_fields(
+            request,
+            task_search_values_serializer,
+            TASK_SEARCH_FIELDS,
+        )
+
+        rows = fields.values(search_tasks(
+            request.user,
+            query.validated_data['q'],
+        ))
+        rows = rows[:query.validated_data['limit']]
+        return Response({'results': fields.many(rows)})
+
+
+class SyncView(APIView):
+    """API for the changes to the user's todo lists and tasks."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SyncSerializer
+
+    @extend_schema(
+        parameters=[SyncQuerySerializer],
+        responses={200: SyncSerializer, 400: Response, 410: Response},
+    )
+    def get(self, request, format=None):
+        """
+        Return the todo lists and tasks changed and deleted since a token.
+
+        Without `since` every todo list and task is returned. Pass `next`
+        as `since` to get the changes that follow, right away while
+        `has_more` is true. A todo list deletion implies its tasks'. A
+        token older than the tombstone retention gets 410 Gone, and the
+        client has to sync again without `since`.
+        """
+        query = SyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        return Response(get_changes(
+            request.user,
+            query.validated_data.get('since'),
+            query.validated_data['limit'],
+        ))
+
+
+class ExportView(APIView):
+    """API for exporting all todo lists and tasks of the user."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+
+    @extend_schema(
+        parameters=[
+            ExportQuerySerializer,
+            OpenApiParameter(
+                'format',
+                str,
+                enum=['ndjson', 'csv'],
+                description='Export format, NDJSON unless given.',
+            ),
+        ],
+        responses={
+            (200, 'application/x-ndjson'): str,
+            (200, 'text/csv'): str,
+        },
+    )
+    def get(self, request, format=None):
+        """
+        Stream the todo lists and tasks of the authenticated user.
+
+        NDJSON emits a `todo_list` record followed by its `task` records;
+        CSV emits one row per task, and one for each list without tasks.
+        Pass the `X-Export-Started-At` header of a previous export as
+        `since` to only fetch what changed since.
+        """
+        query = ExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        started_at = timezone.now()
+        rows = get_export_rows(
+            request.user,
+            since=query.validated_data.get('since'),
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            iter_export(rows, renderer),
+            content_type=renderer.media_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="todo-export.{renderer.format}"'
+        )
+        response['X-Export-Started-At'] = started_at.isoformat()
+        return response
+
+
 class TodoListDetailView(APIView):
     """API for get, update and delete a todo list."""
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TodoListDetailSerializer
 
-    def get_object(self, pk):
+    def get_object(self, pk, with_tasks=True):
         """Retrieve todo list object by ID."""
-        todo_list = get_object_or_404(TodoList, pk=pk, user=self.request.user)
+        queryset = TodoList.objects.all()
+        if with_tasks:
+            queryset = queryset.prefetch_related(
+                Prefetch('task_set', queryset=Task.objects.order_by('-id'))
+            )
+        todo_list = get_object_or_404(queryset, pk=pk, user=self.request.user)
         return todo_list
 
     @extend_schema(
+        parameters=[
+            fields_parameter(todo_list_detail_values_serializer),
+            fields_parameter(
+                task_values_serializer,
+                TASK_LIST_FIELDS,
+                name='task_fields',
+            ),
+        ],
         responses={
             201: TodoListDetailSerializer,
             404: Response
         },
     )
     def get(self, request, pk, format=None):
-        """Retrieve todo list object detail."""
-        todo_list = self.get_object(pk=pk)
-        serializer = TodoListDetailSerializer(todo_list)
-        return Response(serializer.data)
+        """
+        Retrieve todo list object detail.
+
+        `fields` selects the fields of the list, `task_fields` those of its
+        tasks; the tasks are not read at all when `fields` leaves them out.
+        """
+        fields = select_fields(request, todo_list_detail_values_serializer)
+        task_fields = select_fields(
+            request,
+            task_values_serializer,
+            TASK_LIST_FIELDS,
+            name='task_fields',
+        )
+        conditional = ConditionalGet(request, todo_list_scope(pk))
+        response = conditional.lookup()
+        if response is not None:
+            return response
+
+        todo_list = get_object_or_404(
+            fields.values(TodoList.objects, 'updated_at'),
+            pk=pk,
+            user=request.user,
+        )
+        last_modified = todo_list['updated_at']
+
+        # Task changes touch the list, so its updated_at covers the tasks.
+        response = conditional.not_modified(
+            make_etag(request.get_full_path(), last_modified),
+            last_modified,
+        )
+        if response is not None:
+            return response
+
+        data = fields.one(todo_list)
+        if 'tasks' in fields.field_names:
+            data['tasks'] = task_fields.many(task_fields.values(
+                Task.objects.filter(todo_list_id=pk).order_by('-id')
+            ))
+        return conditional.respond(Response(data))
 
     @extend_schema(
         responses={
@@ -110,47 +425,111 @@ class TodoListDetailView(APIView):
         },
     )
     def delete(self, request, pk, format=None):
-        """Delete a todo list in database."""
-        todo_list = self.get_object(pk=pk)
-        todo_list.delete()
+        """
+        Delete a todo list in database.
+
+        The list is hidden at once. One batch of its tasks is deleted right
+        away, and the list with it if that was all; the purge_todo_lists
+        command deletes the rest.
+        """
+        todo_list = self.get_object(pk=pk, with_tasks=False)
+        todo_list.hide()
+        todo_list.purge(settings.TODO_LIST_DELETE_BATCH_SIZE, max_batches=1)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class TasksView(APIView):
-    """API for get and create a task for the todo list."""
-    authentication_classes = [authentication.TokenAuthentication]
+    """API for listing, creating and bulk changing tasks of a todo list."""
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TaskSerializer
+    pagination_class = TodoCursorPagination
 
     def get_todo_list(self, pk):
         """Retrieve todo list object by ID."""
         todo_list = get_object_or_404(TodoList, pk=pk, user=self.request.user)
         return todo_list
 
-    @extend_schema(responses={200: TaskSerializer(many=True)})
+    @extend_schema(
+        parameters=LIST_PARAMETERS + [
+            TaskQuerySerializer,
+            fields_parameter(task_values_serializer, TASK_LIST_FIELDS),
+        ],
+        responses={200: TaskSerializer(many=True)},
+    )
     def get(self, request, todo_list_id, format=None):
-        """Retrieve list of tasks for the todo list."""
+        """
+        Retrieve list of tasks for the todo list.
+
+        The filters combine with each other, the ordering and pagination.
+        """
         todo_list = self.get_todo_list(pk=todo_list_id)
-        tasks = Task.objects.filter(todo_list=todo_list).order_by('-id')
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        query = TaskQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = select_fields(
+            request,
+            task_values_serializer,
+            TASK_LIST_FIELDS,
+        )
+
+        # Task changes touch the list, so its updated_at covers the tasks.
+        # Overdue tasks also change with time, so those are never current.
+        now = timezone.now()
+        last_modified = todo_list.updated_at
+        etag = make_etag(
+            request.get_full_path(),
+            last_modified,
+            now if query.is_time_dependent() else None,
+        )
+        if not query.is_time_dependent():
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+
+        tasks = query.filter_queryset(
+            Task.objects.filter(todo_list=todo_list),
+            now,
+        )
+        ordering = query.get_ordering()
+        rows = fields.values(tasks, *(name.lstrip('-') for name in ordering))
+        if is_stream_requested(request):
+            response = stream_json_array(order_by(rows, ordering), fields)
+            return set_validators(response, etag, last_modified)
+
+        paginator = self.pagination_class()
+        paginator.ordering = ordering
+        page = paginator.paginate_queryset(rows, request, view=self)
+        response = paginator.get_paginated_response(fields.many(page))
+        return set_validators(response, etag, last_modified)
 
     @extend_schema(
+        request=TaskSerializer,
         responses={
             201: TaskSerializer,
             400: Response
         },
     )
     def post(self, request, todo_list_id, format=None):
-        """Create a task for the todo list."""
+        """
+        Create a task for the todo list.
+
+        A JSON array creates all of its tasks at once; if any item is
+        invalid nothing is created and the errors are returned per item.
+        """
         todo_list = self.get_todo_list(pk=todo_list_id)
 
-        given_data = request.data
-        given_data['todo_list'] = todo_list
-        serializer = TaskSerializer(
-            data=given_data,
-            context={"request": request}
-        )
+        if isinstance(request.data, list):
+            serializer = TaskSerializer(
+                data=request.data,
+                many=True,
+                max_length=MAX_BULK_TASKS,
+                context={"request": request}
+            )
+        else:
+            serializer = TaskSerializer(
+                data=request.data,
+                context={"request": request}
+            )
 
         if not serializer.is_valid():
             return Response(
@@ -158,31 +537,95 @@ class TasksView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer.save()
+        with transaction.atomic():
+            tasks = serializer.save(todo_list=todo_list)
+            if not isinstance(tasks, list):
+                tasks = [tasks]
+            todo_list.touch(
+                tasks=len(tasks),
+                completed=sum(task.completed for task in tasks),
+                change_seq=tasks[0].change_seq if tasks else None,
+            )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        request=TaskBulkUpdateSerializer,
+        responses={
+            200: BULK_COUNT_RESPONSE,
+            400: Response
+        },
+    )
+    def patch(self, request, todo_list_id, format=None):
+        """Update the selected tasks of the todo list in one statement."""
+        todo_list = self.get_todo_list(pk=todo_list_id)
+        serializer = TaskBulkUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = serializer.filter_queryset(
+            Task.objects.filter(todo_list=todo_list)
+        )
+        with transaction.atomic():
+            count = todo_list.update_tasks(tasks, **serializer.get_values())
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=TaskSelectionSerializer,
+        responses={
+            200: BULK_COUNT_RESPONSE,
+            400: Response
+        },
+    )
+    def delete(self, request, todo_list_id, format=None):
+        """Delete the selected tasks of the todo list in one statement."""
+        todo_list = self.get_todo_list(pk=todo_list_id)
+        serializer = TaskSelectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tasks = serializer.filter_queryset(
+            Task.objects.filter(todo_list=todo_list)
+        )
+        with transaction.atomic():
+            count = todo_list.delete_tasks(tasks)
+        return Response({'count': count}, status=status.HTTP_200_OK)
+
 
 class TaskDetailView(APIView):
     """API for get, update and delete a task."""
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TaskSerializer
 
     def get_object(self, todo_list_id, pk):
-        """Retrieve task object by ID"""
-        todo_list = get_object_or_404(
-            TodoList,
-            pk=todo_list_id,
-            user=self.request.user
+        """Retrieve task object by ID, checking ownership in one query."""
+        task = get_object_or_404(
+            Task.objects.select_related('todo_list'),
+            pk=pk,
+            todo_list_id=todo_list_id,
+            todo_list__user=self.request.user,
+            todo_list__deleted_at=None,
         )
-        task = get_object_or_404(Task, pk=pk, todo_list=todo_list)
         return task
 
+    @extend_schema(parameters=[fields_parameter(task_values_serializer)])
     def get(self, request, todo_list_id, pk, format=None):
         """Retrieve a task in todo list."""
-        task = self.get_object(todo_list_id, pk)
-        serializer = TaskSerializer(task)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = select_fields(request, task_values_serializer)
+        task = get_object_or_404(
+            fields.values(Task.objects),
+            pk=pk,
+            todo_list_id=todo_list_id,
+            todo_list__user=request.user,
+            todo_list__deleted_at=None,
+        )
+        return Response(fields.one(task), status=status.HTTP_200_OK)
 
     def put(self, request, todo_list_id, pk, format=None):
         """Update a task in todo list."""
@@ -199,11 +642,75 @@ class TaskDetailView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        serializer.save()
+        completed = task.completed
+        with transaction.atomic():
+            serializer.save()
+            task.todo_list.touch(
+                completed=task.completed - completed,
+                change_seq=task.change_seq,
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, todo_list_id, pk, format=None):
         """Delete a task in todo list."""
         task = self.get_object(todo_list_id, pk)
-        task.delete()
+        with transaction.atomic():
+            task.delete()
+            task.todo_list.touch(
+                tasks=-1,
+                completed=-task.completed,
+                change_seq=task.change_seq,
+            )
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskMoveView(APIView):
+    """API for moving a task within its todo list."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = TaskMoveSerializer
+
+    @extend_schema(
+        request=TaskMoveSerializer,
+        responses={
+            200: TaskSerializer,
+            400: Response,
+            404: Response
+        },
+    )
+    def post(self, request, todo_list_id, pk, format=None):
+        """
+        Move a task right after another task of the list, or first.
+
+        Only the moved task is written. List the tasks with
+        `ordering=position` to get the manual order.
+        """
+        task = get_object_or_404(
+            Task.objects.select_related('todo_list'),
+            pk=pk,
+            todo_list_id=todo_list_id,
+            todo_list__user=request.user,
+            todo_list__deleted_at=None,
+        )
+        serializer = TaskMoveSerializer(
+            data=request.data,
+            context={'task': task},
+        )
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            with transaction.atomic():
+                task.todo_list.move_task(
+                    task,
+                    serializer.validated_data['after'],
+                )
+        except Task.DoesNotExist:
+            return Response(
+                {'after': ['No such task in the todo list.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(TaskSerializer(task).data, status=status.HTTP_200_OK)
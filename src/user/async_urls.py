@@ -0,0 +1,15 @@
+"""
+URL mappings for the user API served by async views
+"""
+from django.urls import path
+
+from user import async_views, views
+
+
+app_name = 'user'
+
+urlpatterns = [
+    path('create/', async_views.CreateUserView.as_view(), name='create'),
+    path('token/', async_views.CreateTokenView.as_view(), name='token'),
+    path('me/', views.ManageUserView.as_view(), name='me'),
+]
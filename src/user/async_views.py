@@ -0,0 +1,75 @@
+"""
+Async views for the user API
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from rest_framework import exceptions, status
+from rest_framework.authtoken.models import Token
+from rest_framework.settings import api_settings
+
+from core.passwords import get_hashing_pool
+from todo.async_views import AsyncAPIView
+from user.serializers import (
+    UserSerializer,
+    CredentialsSerializer,
+)
+
+
+async def aauthenticate(email, password):
+    """
+    Return the active user of email and password, or None.
+
+    Async counterpart of ModelBackend.authenticate, which Django 4.2 lacks:
+    the password is checked, and rehashed if outdated, in the password
+    hashing pool rather than on the event loop.
+    """
+    User = get_user_model()
+    try:
+        user = await User._default_manager.aget(
+            **{User.USERNAME_FIELD: email}
+        )
+    except User.DoesNotExist:
+        # Hash anyway, as ModelBackend does, so unknown emails are not
+        # told apart by a faster response.
+        await get_hashing_pool().arun(make_password, password)
+        return None
+    if await user.acheck_password(password) and user.is_active:
+        return user
+    return None
+
+
+class CreateUserView(AsyncAPIView):
+    """Create a new user in the system."""
+    authentication = None
+
+    async def post(self, request, format=None):
+        """Create a user, hashing the password off the event loop."""
+        serializer = UserSerializer(data=request.data)
+        # The unique email validator queries the database.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        user = await get_user_model().objects.acreate_user(
+            **serializer.validated_data
+        )
+        return self.render(UserSerializer(user).data, status.HTTP_201_CREATED)
+
+
+class CreateTokenView(AsyncAPIView):
+    """Create a new auth token for user."""
+    authentication = None
+
+    async def post(self, request, format=None):
+        """Return the token of the user, checking the password off the loop."""
+        serializer = CredentialsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = await aauthenticate(**serializer.validated_data)
+        if user is None:
+            raise exceptions.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    serializer.error_messages['authorization'],
+                ],
+            }, code='authorization')
+
+        token, _ = await Token.objects.aget_or_create(user=user)
+        return self.render({'token': token.key})
@@ -5,7 +5,7 @@ from django.contrib.auth import (
     get_user_model,
     authenticate
 )
-from django.utils.translation import gettext as _
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 
@@ -33,13 +33,22 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class AuthTokenSerializer(serializers.Serializer):
-    """Serializer for the user auth token."""
+class CredentialsSerializer(serializers.Serializer):
+    """Serializer for the email and password of a user."""
     email = serializers.EmailField()
     password = serializers.CharField(
         style={'input_type': 'password'},
         trim_whitespace=False,
     )
+    default_error_messages = {
+        'authorization': _(
+            'Unable to authenticate with provided credentials.'
+        ),
+    }
+
+
+class AuthTokenSerializer(CredentialsSerializer):
+    """Serializer for the user auth token."""
 
     def validate(self, attrs):
         """Validate and authenticate the user."""
@@ -51,8 +60,7 @@ class AuthTokenSerializer(serializers.Serializer):
             password=password
         )
         if not user:
-            msg = _('Unable to authenticate with provided credentials.')
-            raise serializers.ValidationError(msg, code='authorization')
+            self.fail('authorization')
 
         attrs['user'] = user
         return attrs
@@ -0,0 +1,142 @@
+"""
+Test the async views of the user API
+"""
+import json
+import threading
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework import status
+
+from core.passwords import get_hashing_pool
+
+
+CREATE_USER_URL = reverse('user:create')
+TOKEN_URL = reverse('user:token')
+
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+SCRYPT = 'django.contrib.auth.hashers.ScryptPasswordHasher'
+
+
+@override_settings(ROOT_URLCONF='todo.tests.async_urls')
+class AsyncUserApiTests(TestCase):
+    """Test signup and login served by async views."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@example.com',
+            'password123',
+            name='Test Name',
+        )
+
+    async def test_create_user_success(self):
+        """Test creating a user is successful."""
+        payload = {
+            'email': 'new@example.com',
+            'password': 'password123',
+            'name': 'New Name',
+        }
+        res = await self.async_client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            json.loads(res.content),
+            {'email': 'new@example.com', 'name': 'New Name'},
+        )
+        user = await get_user_model().objects.aget(email=payload['email'])
+        self.assertTrue(await user.acheck_password(payload['password']))
+
+    async def test_user_with_email_exists_error(self):
+        """Test error returned if user with email exists."""
+        payload = {
+            'email': 'test@example.com',
+            'password': 'password123',
+            'name': 'Test Name',
+        }
+        res = await self.async_client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', json.loads(res.content))
+
+    async def test_create_token_for_user(self):
+        """Test the token is created and then returned again."""
+        payload = {'email': 'test@example.com', 'password': 'password123'}
+        res = await self.async_client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        token = await Token.objects.aget(user=self.user)
+        self.assertEqual(json.loads(res.content), {'token': token.key})
+
+        res = await self.async_client.post(TOKEN_URL, payload)
+
+        self.assertEqual(json.loads(res.content), {'token': token.key})
+
+    async def test_create_token_bad_credentials(self):
+        """Test wrong passwords and unknown emails get the sync error."""
+        for payload in (
+            {'email': 'test@example.com', 'password': 'invalid password'},
+            {'email': 'other@example.com', 'password': 'password123'},
+        ):
+            res = await self.async_client.post(TOKEN_URL, payload)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(json.loads(res.content), {
+                'non_field_errors': [
+                    'Unable to authenticate with provided credentials.',
+                ],
+            })
+
+    async def test_create_token_blank_password(self):
+        """Test posting a blank password returns an error."""
+        payload = {'email': 'test@example.com', 'password': ''}
+        res = await self.async_client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', json.loads(res.content))
+
+    async def test_create_token_inactive_user(self):
+        """Test inactive users get no token."""
+        self.user.is_active = False
+        await self.user.asave(update_fields=['is_active'])
+
+        payload = {'email': 'test@example.com', 'password': 'password123'}
+        res = await self.async_client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2])
+    async def test_rehash_on_login(self):
+        """Test logging in rehashes the password with the first hasher."""
+        payload = {'email': 'test@example.com', 'password': 'password123'}
+        res = await self.async_client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        await self.user.arefresh_from_db()
+        self.assertEqual(
+            identify_hasher(self.user.password).algorithm,
+            'scrypt',
+        )
+
+    @override_settings(
+        PASSWORD_HASHING_POOL={'MAX_WORKERS': 1, 'MAX_PENDING': 0},
+    )
+    async def test_hashing_pool_busy(self):
+        """Test logins are turned away while the pool is full."""
+        release = threading.Event()
+        busy = get_hashing_pool().submit(release.wait)
+        try:
+            payload = {'email': 'test@example.com', 'password': 'password123'}
+            res = await self.async_client.post(TOKEN_URL, payload)
+        finally:
+            release.set()
+            busy.result()
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(
+            json.loads(res.content)['detail'],
+            'Too many logins in progress, try again shortly.',
+        )
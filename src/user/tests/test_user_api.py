@@ -1,8 +1,9 @@
 """
 Test for the user API.
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -104,6 +105,20 @@ class PublicUserApiTest(TestCase):
         self.assertNotIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_create_token_rehashes_password(self):
+        """Test logging in moves the password to the first hasher."""
+        user = create_user(email='test@example.com', password='password123')
+        payload = {'email': 'test@example.com', 'password': 'password123'}
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm, 'scrypt')
+
     def test_retrieve_user_unauthorized(self):
         """Test authentication is required for users."""
         res = self.client.get(ME_URL)